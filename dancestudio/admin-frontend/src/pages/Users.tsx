@@ -113,7 +113,7 @@ const UsersPage = () => {
         <Typography variant="h6">Выдать абонемент вручную</Typography>
         <Stack spacing={1} maxWidth={480}>
           <TextField
-            label="Поиск по ФИО"
+            label="Поиск по ФИО, телефону или Telegram ID"
             value={search}
             onChange={(event) => setSearch(event.target.value)}
             helperText="Введите минимум 2 символа"
@@ -1,4 +1,3 @@
-from typing import Annotated
 import secrets
 from typing import Annotated
 
@@ -8,8 +7,8 @@ from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 from ..config import get_settings
 from ..db.session import get_db
-from ..db.models import AdminUser
 from ..core.security import ALGORITHM
+from ..services.admin import AdminPrincipal, get_principal
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
@@ -18,7 +17,9 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 def get_current_admin(
     token: Annotated[str, Depends(oauth2_scheme)],
     db: Annotated[Session, Depends(get_db)],
-) -> AdminUser:
+) -> AdminPrincipal:
+    """Resolve the admin from the token, reading the database only on a cache miss."""
+
     settings = get_settings()
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -31,14 +32,23 @@ def get_current_admin(
     user_id = payload.get("sub")
     if user_id is None:
         raise credentials_exception
-    user = db.get(AdminUser, int(user_id))
-    if user is None:
+    try:
+        admin_id = int(user_id)
+    except ValueError as exc:
+        raise credentials_exception from exc
+    principal = get_principal(db, admin_id)
+    if principal is None or not principal.is_active:
+        raise credentials_exception
+    # Tokens issued before versioning carry no ``ver`` claim and count as 0.
+    if payload.get("ver", 0) != principal.token_version:
         raise credentials_exception
-    return user
+    return principal
 
 
 def require_roles(*roles: str):
-    def dependency(user: Annotated[AdminUser, Depends(get_current_admin)]) -> AdminUser:
+    def dependency(
+        user: Annotated[AdminPrincipal, Depends(get_current_admin)],
+    ) -> AdminPrincipal:
         if user.role not in roles:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
         return user
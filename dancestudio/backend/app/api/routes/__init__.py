@@ -9,6 +9,7 @@ from . import (
     misc,
     bot,
     settings,
+    export,
 )
 
 __all__ = [
@@ -22,4 +23,5 @@ __all__ = [
     "misc",
     "bot",
     "settings",
+    "export",
 ]
@@ -7,6 +7,7 @@ from ...core import security
 from ...db.session import get_db
 from ...db import models
 from ...config import get_settings
+from ...services import admin as admin_service
 from .. import deps
 
 
@@ -27,10 +28,15 @@ def login(
     admin = db.query(models.AdminUser).filter_by(login=form_data.username).first()
     if not admin or not security.verify_password(form_data.password, admin.password_hash):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid credentials")
+    if admin.is_active is False:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Account disabled"
+        )
     settings = get_settings()
     expires_delta = timedelta(minutes=settings.jwt_expire_min)
     token = security.create_access_token(
-        {"sub": str(admin.id), "role": admin.role}, expires_delta
+        {"sub": str(admin.id), "role": admin.role, "ver": admin.token_version or 0},
+        expires_delta,
     )
     admin.last_login_at = datetime.utcnow()
     db.commit()
@@ -41,3 +47,56 @@ def login(
 def me(current=Depends(deps.get_current_admin)):
     admin = current
     return {"id": admin.id, "login": admin.login, "role": admin.role}
+
+
+def _admin_or_404(db: Session, admin_id: int) -> models.AdminUser:
+    admin = db.get(models.AdminUser, admin_id)
+    if not admin:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Admin not found"
+        )
+    return admin
+
+
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+def logout_all(
+    db: Session = Depends(get_db),
+    current: deps.AdminPrincipal = Depends(deps.get_current_admin),
+):
+    admin_service.revoke_tokens(db, _admin_or_404(db, current.id))
+
+
+@router.post("/admins/{admin_id}/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+def logout_admin_everywhere(
+    admin_id: int,
+    db: Session = Depends(get_db),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin")),
+):
+    admin_service.revoke_tokens(db, _admin_or_404(db, admin_id))
+
+
+@router.post("/admins/{admin_id}/deactivate")
+def deactivate_admin(
+    admin_id: int,
+    db: Session = Depends(get_db),
+    current: deps.AdminPrincipal = Depends(deps.require_roles("admin")),
+):
+    if admin_id == current.id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot deactivate your own account",
+        )
+    admin = _admin_or_404(db, admin_id)
+    admin_service.set_active(db, admin, False)
+    return {"id": admin.id, "login": admin.login, "is_active": admin.is_active}
+
+
+@router.post("/admins/{admin_id}/activate")
+def activate_admin(
+    admin_id: int,
+    db: Session = Depends(get_db),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin")),
+):
+    admin = _admin_or_404(db, admin_id)
+    admin_service.set_active(db, admin, True)
+    return {"id": admin.id, "login": admin.login, "is_active": admin.is_active}
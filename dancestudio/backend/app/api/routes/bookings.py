@@ -1,12 +1,11 @@
-from datetime import datetime, timedelta, timezone
+from datetime import date
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func
 from sqlalchemy.orm import Session, selectinload
 from ...api import deps
 from ...db.session import get_db
 from ...db import models, schemas
-from ...services import booking_service
+from ...services import booking_service, rollup_service, stats_service
 
 router = APIRouter(prefix="/bookings", tags=["bookings"])
 
@@ -16,7 +15,7 @@ def list_bookings(
     slot_id: int | None = None,
     user_id: int | None = None,
     db: Session = Depends(get_db),
-    _: models.AdminUser = Depends(deps.require_roles("admin", "manager", "viewer")),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin", "manager", "viewer")),
 ):
     query = (
         db.query(models.Booking)
@@ -36,7 +35,7 @@ def list_bookings(
 def create_booking(
     payload: schemas.BookingCreate,
     db: Session = Depends(get_db),
-    _: models.AdminUser = Depends(deps.require_roles("admin", "manager")),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin", "manager")),
 ):
     user = db.get(models.User, payload.user_id)
     slot = db.get(models.ClassSlot, payload.class_slot_id)
@@ -56,7 +55,7 @@ def cancel_booking(
     booking_id: int,
     payload: schemas.BookingCancel,
     db: Session = Depends(get_db),
-    admin: models.AdminUser = Depends(deps.require_roles("admin", "manager")),
+    admin: deps.AdminPrincipal = Depends(deps.require_roles("admin", "manager")),
 ):
     booking = db.get(models.Booking, booking_id)
     if not booking:
@@ -70,62 +69,33 @@ def cancel_booking(
 
 
 @router.get("/stats")
-def booking_stats(db: Session = Depends(get_db), _: models.AdminUser = Depends(deps.require_roles("admin", "manager"))):
-    now = datetime.now(timezone.utc)
-    today_start = datetime(now.year, now.month, now.day, tzinfo=timezone.utc)
-    today_end = today_start + timedelta(days=1)
+def booking_stats(
+    db: Session = Depends(get_db),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin", "manager")),
+):
+    # Past days come from aggregates kept fresh by the scheduler.
+    return stats_service.booking_stats(db)
 
-    total = db.query(models.Booking).count()
-    confirmed = (
-        db.query(models.Booking)
-        .filter(models.Booking.status == models.BookingStatus.confirmed)
-        .count()
-    )
-    bookings_today = (
-        db.query(models.Booking)
-        .join(models.ClassSlot)
-        .filter(
-            models.Booking.status.in_(
-                [models.BookingStatus.confirmed, models.BookingStatus.reserved]
-            )
-        )
-        .filter(models.ClassSlot.starts_at >= today_start)
-        .filter(models.ClassSlot.starts_at < today_end)
-        .count()
-    )
-    completed_total = (
-        db.query(models.Booking)
-        .join(models.ClassSlot)
-        .filter(models.ClassSlot.starts_at < now)
-        .filter(
-            models.Booking.status.in_(
-                [models.BookingStatus.attended, models.BookingStatus.no_show]
-            )
+
+@router.get("/stats/directions", response_model=schemas.DirectionStatsReport)
+def direction_stats(
+    date_from: date,
+    date_to: date,
+    direction_id: int | None = None,
+    include_days: bool = True,
+    db: Session = Depends(get_db),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin", "manager")),
+):
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from must not be after date_to",
         )
-        .count()
-    )
-    attended_count = (
-        db.query(models.Booking)
-        .join(models.ClassSlot)
-        .filter(models.ClassSlot.starts_at < now)
-        .filter(models.Booking.status == models.BookingStatus.attended)
-        .count()
-    )
-    attendance_rate = (
-        (attended_count / completed_total) * 100 if completed_total else 0.0
+    # Rollups are kept fresh by the scheduler; the report only reads them.
+    return rollup_service.direction_report(
+        db,
+        date_from,
+        date_to,
+        direction_id=direction_id,
+        include_days=include_days,
     )
-    week_start = now - timedelta(days=7)
-    weekly_revenue = db.scalar(
-        db.query(func.coalesce(func.sum(models.Payment.amount), 0))
-        .filter(models.Payment.status == models.PaymentStatus.paid)
-        .filter(models.Payment.created_at >= week_start)
-    )
-    weekly_revenue = float(weekly_revenue or 0)
-
-    return {
-        "total": total,
-        "confirmed": confirmed,
-        "bookings_today": bookings_today,
-        "attendance_rate": attendance_rate,
-        "weekly_revenue": weekly_revenue,
-    }
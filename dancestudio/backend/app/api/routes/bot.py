@@ -1,18 +1,21 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Annotated
+from typing import Annotated, Any, Callable, Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from pydantic import BaseModel
-from sqlalchemy import and_, or_
-from sqlalchemy.orm import Session, selectinload
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session, aliased, contains_eager, selectinload
 
 from ...api import deps
 from ...core.constants import RESERVATION_PAYMENT_TIMEOUT
 from ...db import models, schemas
 from ...db.session import get_db
-from ...services import booking_service, payment_service, settings_service
+from ...services import booking_service, payment_service, settings_service, user_service
+from ...services.payments.gateway import PaymentGatewayError
 
 router = APIRouter(prefix="/bot", tags=["bot"])
 
@@ -82,30 +85,39 @@ class BotPaymentResponse(BaseModel):
     currency: str | None = None
 
 
+class BotBatchCall(BaseModel):
+    op: Literal["sync_user", "bookings", "subscriptions"]
+    args: dict[str, Any] = Field(default_factory=dict)
+
+
+class BotBatchRequest(BaseModel):
+    calls: list[BotBatchCall] = Field(min_length=1, max_length=10)
+
+
+class BotBatchResult(BaseModel):
+    status: int
+    body: Any = None
+
+
+class _TgIdArgs(BaseModel):
+    tg_id: int
+
+
 def _sync_user(db: Session, payload: SyncUserRequest) -> models.User:
-    user = db.query(models.User).filter_by(tg_id=payload.tg_id).first()
-    created = False
-    if not user:
-        user = models.User(tg_id=payload.tg_id)
-        db.add(user)
-        created = True
-    if payload.full_name is not None:
-        user.full_name = payload.full_name
-    if payload.age is not None:
-        user.age = payload.age
-    if payload.phone is not None:
-        user.phone = payload.phone
-    if created or payload.full_name is not None or payload.phone is not None or payload.age is not None:
-        db.commit()
-        db.refresh(user)
-    return user
+    return user_service.sync_user(
+        db,
+        payload.tg_id,
+        full_name=payload.full_name,
+        age=payload.age,
+        phone=payload.phone,
+    )
 
 
 def _latest_payment(db: Session, booking: models.Booking) -> models.Payment | None:
     return (
         db.query(models.Payment)
-        .filter_by(class_slot_id=booking.class_slot_id, user_id=booking.user_id)
-        .order_by(models.Payment.created_at.desc())
+        .filter_by(booking_id=booking.id)
+        .order_by(models.Payment.id.desc())
         .first()
     )
 
@@ -190,6 +202,7 @@ def get_addresses(
             url=str(request.url_for("media", path=item.file_path)),
             media_type=item.media_type.value,
             filename=item.file_name,
+            version=settings_service.media_version(item),
         )
         for item in media_items
     ]
@@ -202,18 +215,44 @@ def list_user_bookings(
     db: Annotated[Session, Depends(get_db)],
     _: Annotated[None, Depends(deps.verify_bot_token)],
 ) -> list[BotBookingResponse]:
-    user = db.query(models.User).filter_by(tg_id=tg_id).first()
-    if not user:
+    user_id = user_service.resolve_user_id(db, tg_id)
+    if user_id is None:
         return []
     now = datetime.now(timezone.utc)
     cutoff = now - RESERVATION_PAYMENT_TIMEOUT
-    upcoming = (
-        db.query(models.Booking)
+    # Latest payment per booking, ranked in the same statement that loads
+    # the bookings instead of one query per booking.
+    ranked_payments = (
+        db.query(
+            models.Payment.id.label("payment_id"),
+            models.Payment.booking_id.label("booking_id"),
+            func.row_number()
+            .over(
+                partition_by=models.Payment.booking_id,
+                order_by=models.Payment.id.desc(),
+            )
+            .label("position"),
+        )
+        .filter(models.Payment.user_id == user_id)
+        .filter(models.Payment.booking_id.isnot(None))
+        .subquery()
+    )
+    latest_payment = aliased(models.Payment)
+    rows = (
+        db.query(models.Booking, latest_payment)
+        .join(models.Booking.slot)
+        .outerjoin(
+            ranked_payments,
+            and_(
+                ranked_payments.c.booking_id == models.Booking.id,
+                ranked_payments.c.position == 1,
+            ),
+        )
+        .outerjoin(latest_payment, latest_payment.id == ranked_payments.c.payment_id)
         .options(
-            selectinload(models.Booking.slot).selectinload(models.ClassSlot.direction)
+            contains_eager(models.Booking.slot).joinedload(models.ClassSlot.direction)
         )
-        .join(models.ClassSlot)
-        .filter(models.Booking.user_id == user.id)
+        .filter(models.Booking.user_id == user_id)
         .filter(models.ClassSlot.starts_at >= now)
         .filter(
             or_(
@@ -228,8 +267,7 @@ def list_user_bookings(
         .all()
     )
     results: list[BotBookingResponse] = []
-    for booking in upcoming:
-        payment = _latest_payment(db, booking)
+    for booking, payment in rows:
         payment_url = None
         if (
             payment
@@ -253,14 +291,14 @@ def list_user_subscriptions(
     db: Annotated[Session, Depends(get_db)],
     _: Annotated[None, Depends(deps.verify_bot_token)],
 ) -> list[BotSubscription]:
-    user = db.query(models.User).filter_by(tg_id=tg_id).first()
-    if not user:
+    user_id = user_service.resolve_user_id(db, tg_id)
+    if user_id is None:
         return []
     now = datetime.now(timezone.utc)
     subscriptions = (
         db.query(models.Subscription)
         .options(selectinload(models.Subscription.product))
-        .filter(models.Subscription.user_id == user.id)
+        .filter(models.Subscription.user_id == user_id)
         .filter(models.Subscription.status == models.SubscriptionStatus.active)
         .filter(models.Subscription.valid_to >= now)
         .order_by(models.Subscription.valid_to)
@@ -292,12 +330,9 @@ def list_user_subscriptions(
     return results
 
 
-@router.post("/bookings", response_model=BotBookingResponse)
-def create_booking(
-    payload: BotBookingRequest,
-    db: Annotated[Session, Depends(get_db)],
-    _: Annotated[None, Depends(deps.verify_bot_token)],
-) -> BotBookingResponse:
+def _reserve_slot(
+    db: Session, payload: BotBookingRequest
+) -> tuple[models.User, models.Booking, models.Payment | None, float]:
     user = _sync_user(db, payload)
     slot = db.get(models.ClassSlot, payload.slot_id)
     if not slot:
@@ -309,25 +344,51 @@ def create_booking(
             status_code=status.HTTP_409_CONFLICT,
             detail=str(exc),
         ) from exc
+    payment = None
+    if booking.status != models.BookingStatus.reserved:
+        payment = _latest_payment(db, booking)
+        if db.in_transaction():
+            db.commit()
+    # A reserved booking stays uncommitted: payment creation commits it
+    # together with the pending payment.
+    return user, booking, payment, float(slot.price_single_visit or 0)
+
+
+def _payment_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_502_BAD_GATEWAY,
+        detail="Payment provider unavailable",
+    )
+
+
+@router.post("/bookings", response_model=BotBookingResponse)
+async def create_booking(
+    payload: BotBookingRequest,
+    db: Annotated[Session, Depends(get_db)],
+    _: Annotated[None, Depends(deps.verify_bot_token)],
+) -> BotBookingResponse:
+    user, booking, payment, amount = await run_in_threadpool(
+        _reserve_slot, db, payload
+    )
     payment_url: str | None = None
-    payment = _latest_payment(db, booking)
     if booking.status == models.BookingStatus.reserved:
-        amount = float(slot.price_single_visit or 0)
-        payment, gateway_response = payment_service.create_payment(
-            db,
-            user,
-            amount=amount,
-            purpose=models.PaymentPurpose.single_visit,
-            slot=slot,
-        )
+        try:
+            payment, gateway_response = await payment_service.create_payment_async(
+                db,
+                user,
+                amount=amount,
+                purpose=models.PaymentPurpose.single_visit,
+                booking=booking,
+            )
+        except PaymentGatewayError as exc:
+            raise _payment_unavailable() from exc
         payment_url = payment.confirmation_url or (
             gateway_response.get("confirmation_url")
             or gateway_response.get("return_url")
         )
-    if db.in_transaction():
-        db.commit()
-    db.refresh(booking)
-    return _serialize_booking(booking, payment=payment, payment_url=payment_url)
+    return await run_in_threadpool(
+        _serialize_booking, booking, payment=payment, payment_url=payment_url
+    )
 
 
 @router.post("/bookings/{booking_id}/cancel", response_model=BotBookingResponse)
@@ -337,23 +398,20 @@ def cancel_booking(
     db: Annotated[Session, Depends(get_db)],
     _: Annotated[None, Depends(deps.verify_bot_token)],
 ) -> BotBookingResponse:
-    user = db.query(models.User).filter_by(tg_id=payload.tg_id).first()
-    if not user:
+    user_id = user_service.resolve_user_id(db, payload.tg_id)
+    if user_id is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Booking not found")
     booking = db.get(models.Booking, booking_id)
-    if not booking or booking.user_id != user.id:
+    if not booking or booking.user_id != user_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Booking not found")
-    booking = booking_service.cancel_booking(db, booking, actor=f"bot:{user.tg_id}")
+    booking = booking_service.cancel_booking(db, booking, actor=f"bot:{payload.tg_id}")
     payment = _latest_payment(db, booking)
     return _serialize_booking(booking, payment=payment)
 
 
-@router.post("/payments/subscription", response_model=BotPaymentResponse)
-def purchase_subscription(
-    payload: BotSubscriptionPurchaseRequest,
-    db: Annotated[Session, Depends(get_db)],
-    _: Annotated[None, Depends(deps.verify_bot_token)],
-) -> BotPaymentResponse:
+def _load_subscription_product(
+    db: Session, payload: BotSubscriptionPurchaseRequest
+) -> tuple[models.User, models.Product, float]:
     user = _sync_user(db, payload)
     product = db.get(models.Product, payload.product_id)
     if not product or not product.is_active:
@@ -363,14 +421,10 @@ def purchase_subscription(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Product is not a subscription",
         )
-    payment, gateway_response = payment_service.create_payment(
-        db,
-        user,
-        amount=float(product.price),
-        purpose=models.PaymentPurpose.subscription,
-        product=product,
-    )
-    payment_url = gateway_response.get("confirmation_url") or gateway_response.get("return_url")
+    return user, product, float(product.price)
+
+
+def _payment_response(payment: models.Payment, payment_url: str | None) -> BotPaymentResponse:
     status_value = (
         payment.status.value if hasattr(payment.status, "value") else str(payment.status)
     )
@@ -386,3 +440,66 @@ def purchase_subscription(
         amount=float(payment.amount),
         currency=payment.currency,
     )
+
+
+@router.post("/payments/subscription", response_model=BotPaymentResponse)
+async def purchase_subscription(
+    payload: BotSubscriptionPurchaseRequest,
+    db: Annotated[Session, Depends(get_db)],
+    _: Annotated[None, Depends(deps.verify_bot_token)],
+) -> BotPaymentResponse:
+    user, product, amount = await run_in_threadpool(
+        _load_subscription_product, db, payload
+    )
+    try:
+        payment, gateway_response = await payment_service.create_payment_async(
+            db,
+            user,
+            amount=amount,
+            purpose=models.PaymentPurpose.subscription,
+            product=product,
+        )
+    except PaymentGatewayError as exc:
+        raise _payment_unavailable() from exc
+    payment_url = gateway_response.get("confirmation_url") or gateway_response.get("return_url")
+    return await run_in_threadpool(_payment_response, payment, payment_url)
+
+
+_BATCH_OPERATIONS: dict[str, Callable[[Session, dict[str, Any]], Any]] = {
+    "sync_user": lambda db, args: sync_user(SyncUserRequest(**args), db, None),
+    "bookings": lambda db, args: list_user_bookings(_TgIdArgs(**args).tg_id, db, None),
+    "subscriptions": lambda db, args: list_user_subscriptions(
+        _TgIdArgs(**args).tg_id, db, None
+    ),
+}
+
+
+@router.post("/batch", response_model=list[BotBatchResult])
+def batch(
+    payload: BotBatchRequest,
+    db: Annotated[Session, Depends(get_db)],
+    _: Annotated[None, Depends(deps.verify_bot_token)],
+) -> list[BotBatchResult]:
+    """Run several bot calls in one round trip and one database session.
+
+    Calls run in order; a failing call does not stop the following ones and is
+    reported with its HTTP status instead of a body.
+    """
+
+    results: list[BotBatchResult] = []
+    for call in payload.calls:
+        try:
+            body = _BATCH_OPERATIONS[call.op](db, call.args)
+        except ValidationError as exc:
+            results.append(
+                BotBatchResult(
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    body={"detail": jsonable_encoder(exc.errors(include_url=False))},
+                )
+            )
+            continue
+        except HTTPException as exc:
+            results.append(BotBatchResult(status=exc.status_code, body={"detail": exc.detail}))
+            continue
+        results.append(BotBatchResult(status=status.HTTP_200_OK, body=jsonable_encoder(body)))
+    return results
@@ -22,7 +22,7 @@ def list_directions(
 def create_direction(
     payload: schemas.DirectionCreate,
     db: Session = Depends(get_db),
-    _: models.AdminUser = Depends(deps.require_roles("admin", "manager")),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin", "manager")),
 ):
     direction = models.Direction(**payload.model_dump())
     db.add(direction)
@@ -36,7 +36,7 @@ def update_direction(
     direction_id: int,
     payload: schemas.DirectionUpdate,
     db: Session = Depends(get_db),
-    _: models.AdminUser = Depends(deps.require_roles("admin", "manager")),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin", "manager")),
 ):
     direction = db.get(models.Direction, direction_id)
     if not direction:
@@ -52,7 +52,7 @@ def update_direction(
 def delete_direction(
     direction_id: int,
     db: Session = Depends(get_db),
-    _: models.AdminUser = Depends(deps.require_roles("admin")),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin")),
 ):
     direction = db.get(models.Direction, direction_id)
     if not direction:
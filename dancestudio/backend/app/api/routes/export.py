@@ -0,0 +1,49 @@
+from datetime import date
+from typing import Iterator, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from ...api import deps
+from ...db.session import get_db
+from ...services import export_service
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+@router.get("/{dataset}")
+def export_dataset(
+    dataset: Literal["bookings", "payments", "users"],
+    format: Literal["csv", "ndjson", "parquet"] = "csv",
+    date_from: date | None = None,
+    date_to: date | None = None,
+    status_filter: str | None = Query(None, alias="status"),
+    db: Session = Depends(get_db),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin", "manager")),
+):
+    filters = export_service.ExportFilters(date_from, date_to, status_filter)
+    # The request session is closed once the endpoint returns, before the body
+    # is streamed, so the export reads through its own session.
+    stream_db = Session(bind=db.get_bind())
+    try:
+        chunks = export_service.stream_export(stream_db, dataset, format, filters)
+    except export_service.ExportError as exc:
+        stream_db.close()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    def body() -> Iterator[bytes]:
+        try:
+            yield from chunks
+        finally:
+            stream_db.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=export_service.media_type(format),
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{export_service.filename(dataset, format)}"'
+            )
+        },
+    )
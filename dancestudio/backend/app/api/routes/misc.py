@@ -1,6 +1,13 @@
-from fastapi import APIRouter, Depends
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Response,
+    status,
+)
 from ...api import deps
-from ...db import models
+from ...config import get_settings
 from ...services import google_sheets
 
 router = APIRouter(tags=["misc"])
@@ -11,10 +18,23 @@ def health_check():
     return {"status": "ok"}
 
 
-@router.post("/export/google-sheets")
+@router.post("/export/google-sheets", status_code=status.HTTP_202_ACCEPTED)
 def export_google_sheets(
     payload: dict,
-    _: models.AdminUser = Depends(deps.require_roles("admin", "manager")),
+    background_tasks: BackgroundTasks,
+    response: Response,
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin", "manager")),
 ):
-    result = google_sheets.export_to_sheets(payload)
-    return {"message": result}
+    settings = get_settings()
+    if not settings.google_sheets_enabled:
+        response.status_code = status.HTTP_200_OK
+        return {"message": "Google Sheets integration disabled", "datasets": []}
+    try:
+        datasets, full = google_sheets.parse_export_request(payload)
+        client = google_sheets.get_sheets_client(settings)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except google_sheets.SheetsConfigError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    background_tasks.add_task(google_sheets.run_export, client, datasets, full)
+    return {"message": "Google Sheets export queued", "datasets": datasets}
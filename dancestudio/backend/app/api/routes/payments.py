@@ -1,4 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from ...api import deps
 from ...db.session import get_db
@@ -6,6 +10,7 @@ from ...db import models, schemas
 from ...services import payment_service
 from ...services.payments import gateway
 from ...config import get_settings
+from ...workers import payment_events
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
@@ -13,52 +18,91 @@ router = APIRouter(prefix="/payments", tags=["payments"])
 @router.get("", response_model=list[schemas.Payment])
 def list_payments(
     db: Session = Depends(get_db),
-    _: models.AdminUser = Depends(deps.require_roles("admin", "manager")),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin", "manager")),
 ):
     return db.query(models.Payment).all()
 
 
+def _load_payment_targets(db: Session, payload: schemas.PaymentCreate):
+    user = db.get(models.User, payload.user_id)
+    product = db.get(models.Product, payload.product_id) if payload.product_id else None
+    slot = db.get(models.ClassSlot, payload.class_slot_id) if payload.class_slot_id else None
+    booking = None
+    if payload.booking_id:
+        booking = db.get(models.Booking, payload.booking_id)
+    elif slot and user:
+        # A user has at most one booking per slot; that is the one being paid for.
+        booking = (
+            db.query(models.Booking)
+            .filter_by(user_id=user.id, class_slot_id=slot.id)
+            .one_or_none()
+        )
+    return user, product, slot, booking
+
+
 @router.post("/create", response_model=schemas.Payment)
-def create_payment_endpoint(
+async def create_payment_endpoint(
     payload: schemas.PaymentCreate,
     db: Session = Depends(get_db),
-    _: models.AdminUser = Depends(deps.require_roles("admin", "manager")),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin", "manager")),
 ):
-    user = db.get(models.User, payload.user_id)
+    user, product, slot, booking = await run_in_threadpool(
+        _load_payment_targets, db, payload
+    )
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    product = db.get(models.Product, payload.product_id) if payload.product_id else None
-    slot = db.get(models.ClassSlot, payload.class_slot_id) if payload.class_slot_id else None
-    payment, _ = payment_service.create_payment(
-        db,
-        user,
-        amount=payload.amount,
-        purpose=models.PaymentPurpose(payload.purpose),
-        product=product,
-        slot=slot,
-    )
-    return payment
+    if payload.booking_id and (booking is None or booking.user_id != user.id):
+        raise HTTPException(status_code=404, detail="Booking not found")
+    try:
+        payment, _ = await payment_service.create_payment_async(
+            db,
+            user,
+            amount=payload.amount,
+            purpose=models.PaymentPurpose(payload.purpose),
+            product=product,
+            slot=slot,
+            booking=booking,
+        )
+    except gateway.PaymentGatewayError as exc:
+        raise HTTPException(status_code=502, detail=str(exc)) from exc
+    return await run_in_threadpool(schemas.Payment.model_validate, payment)
+
+
+def _webhook_authorized(
+    gateway_client: gateway.BasePaymentGateway, body: bytes, request: Request
+) -> bool:
+    # The bot relays Telegram payment confirmations with its API token.
+    bot_token = get_settings().bot_api_token
+    relayed_token = request.headers.get("X-Bot-Token")
+    if bot_token and relayed_token and secrets.compare_digest(relayed_token, bot_token):
+        return True
+    client_host = request.client.host if request.client else None
+    return gateway_client.verify_webhook(body, request.headers, client_host)
 
 
 @router.post("/webhook")
-def payments_webhook(payload: dict, db: Session = Depends(get_db)):
+async def payments_webhook(request: Request, db: Session = Depends(get_db)):
+    """Verify and store the notification; the payment is updated in the background."""
+
     settings = get_settings()
     gateway_client = gateway.get_gateway(settings)
-    parsed = gateway_client.parse_webhook(payload)
-    order_id = parsed.get("order_id")
-    if not order_id:
+    body = await request.body()
+    if not _webhook_authorized(gateway_client, body, request):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    try:
+        payload = json.loads(body)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid webhook") from exc
+    parsed = gateway_client.parse_webhook(payload) if isinstance(payload, dict) else {}
+    if not parsed.get("order_id"):
         raise HTTPException(status_code=400, detail="Invalid webhook")
-    payment = db.query(models.Payment).filter_by(order_id=order_id).first()
-    if not payment:
-        raise HTTPException(status_code=404, detail="Payment not found")
-    status_map = {
-        "pending": models.PaymentStatus.pending,
-        "succeeded": models.PaymentStatus.paid,
-        "paid": models.PaymentStatus.paid,
-        "canceled": models.PaymentStatus.canceled,
-        "refunded": models.PaymentStatus.refunded,
-        "failed": models.PaymentStatus.failed,
-    }
-    status_value = status_map.get(parsed.get("status"), models.PaymentStatus.failed)
-    payment_service.apply_payment(db, payment, status_value)
+    created = await run_in_threadpool(
+        payment_service.enqueue_webhook_event,
+        db,
+        settings.payment_provider,
+        parsed,
+        payload,
+    )
+    if created:
+        payment_events.notify()
     return {"status": "ok"}
@@ -16,7 +16,7 @@ def list_products(db: Session = Depends(get_db)):
 def create_product(
     payload: schemas.ProductCreate,
     db: Session = Depends(get_db),
-    _: models.AdminUser = Depends(deps.require_roles("admin")),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin")),
 ):
     product = models.Product(**payload.model_dump())
     db.add(product)
@@ -30,7 +30,7 @@ def update_product(
     product_id: int,
     payload: schemas.ProductUpdate,
     db: Session = Depends(get_db),
-    _: models.AdminUser = Depends(deps.require_roles("admin")),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin")),
 ):
     product = db.get(models.Product, product_id)
     if not product:
@@ -46,7 +46,7 @@ def update_product(
 def delete_product(
     product_id: int,
     db: Session = Depends(get_db),
-    _: models.AdminUser = Depends(deps.require_roles("admin")),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin")),
 ):
     product = db.get(models.Product, product_id)
     if not product:
@@ -22,6 +22,7 @@ def _media_response(request: Request, asset: models.SettingMedia) -> schemas.Set
         url=str(url),
         media_type=asset.media_type.value,
         filename=asset.file_name,
+        version=settings_service.media_version(asset),
     )
 
 
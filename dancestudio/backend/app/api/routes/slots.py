@@ -1,15 +1,26 @@
-from datetime import datetime
+from datetime import date, datetime
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 from ...api import deps
 from ...db.session import get_db
 from ...db import models, schemas
-from ...services import schedule_service
+from ...services import rollup_service, schedule_service, stats_service
 
 router = APIRouter(prefix="/slots", tags=["slots"])
 
 
+def _stats_key(slot: models.ClassSlot) -> tuple[date, int]:
+    return stats_service.utc_day(slot.starts_at), slot.direction_id
+
+
+def _refresh_stats(db: Session, keys: set[tuple[date, int]]) -> None:
+    # Moving, canceling or deleting a slot leaves its bookings untouched, so
+    # the incremental refresh would not notice; recompute the affected keys.
+    stats_service.refresh_days(db, {day for day, _ in keys})
+    rollup_service.refresh_keys(db, keys)
+
+
 @router.get("", response_model=list[schemas.ClassSlot])
 def list_slots(
     from_dt: datetime | None = None,
@@ -75,7 +86,7 @@ def list_slots(
 def create_slot(
     payload: schemas.ClassSlotCreate,
     db: Session = Depends(get_db),
-    _: models.AdminUser = Depends(deps.require_roles("admin", "manager")),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin", "manager")),
 ):
     slot = models.ClassSlot(**payload.model_dump())
     db.add(slot)
@@ -89,15 +100,17 @@ def update_slot(
     slot_id: int,
     payload: schemas.ClassSlotUpdate,
     db: Session = Depends(get_db),
-    _: models.AdminUser = Depends(deps.require_roles("admin", "manager")),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin", "manager")),
 ):
     slot = db.get(models.ClassSlot, slot_id)
     if not slot:
         raise HTTPException(status_code=404, detail="Slot not found")
+    previous_key = _stats_key(slot)
     for key, value in payload.model_dump(exclude_unset=True).items():
         setattr(slot, key, value)
     db.commit()
     db.refresh(slot)
+    _refresh_stats(db, {previous_key, _stats_key(slot)})
     return slot
 
 
@@ -105,7 +118,7 @@ def update_slot(
 def cancel_slot(
     slot_id: int,
     db: Session = Depends(get_db),
-    admin: models.AdminUser = Depends(deps.require_roles("admin", "manager")),
+    admin: deps.AdminPrincipal = Depends(deps.require_roles("admin", "manager")),
 ):
     slot = db.get(models.ClassSlot, slot_id)
     if not slot:
@@ -116,6 +129,7 @@ def cancel_slot(
         actor=admin.login,
         actor_id=admin.id,
     )
+    _refresh_stats(db, {_stats_key(slot)})
     return slot
 
 
@@ -123,11 +137,13 @@ def cancel_slot(
 def delete_slot(
     slot_id: int,
     db: Session = Depends(get_db),
-    _: models.AdminUser = Depends(deps.require_roles("admin")),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin")),
 ):
     slot = db.get(models.ClassSlot, slot_id)
     if not slot:
         raise HTTPException(status_code=404, detail="Slot not found")
+    key = _stats_key(slot)
     db.delete(slot)
     db.commit()
+    _refresh_stats(db, {key})
     return {"status": "deleted"}
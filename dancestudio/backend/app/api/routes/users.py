@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from ...api import deps
 from ...db.session import get_db
 from ...db import models, schemas
-from ...services import subscription_service
+from ...services import subscription_service, user_service
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -11,34 +11,26 @@ router = APIRouter(prefix="/users", tags=["users"])
 @router.get("", response_model=list[schemas.User])
 def list_users(
     db: Session = Depends(get_db),
-    _: models.AdminUser = Depends(deps.require_roles("admin", "manager", "viewer")),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin", "manager", "viewer")),
 ):
     return db.query(models.User).all()
 
 
 @router.get("/search", response_model=list[schemas.User])
 def search_users(
-    q: str = Query(..., min_length=2, description="Часть ФИО"),
+    q: str = Query(..., min_length=2, description="Часть ФИО, телефон или Telegram ID"),
     limit: int = Query(10, ge=1, le=50),
     db: Session = Depends(get_db),
-    _: models.AdminUser = Depends(deps.require_roles("admin", "manager", "viewer")),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin", "manager", "viewer")),
 ):
-    pattern = f"%{q.strip()}%"
-    results = (
-        db.query(models.User)
-        .filter(models.User.full_name.ilike(pattern))
-        .order_by(models.User.full_name.asc())
-        .limit(limit)
-        .all()
-    )
-    return results
+    return user_service.search_users(db, q, limit=limit)
 
 
 @router.get("/{user_id}", response_model=schemas.User)
 def get_user(
     user_id: int,
     db: Session = Depends(get_db),
-    _: models.AdminUser = Depends(deps.require_roles("admin", "manager", "viewer")),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin", "manager", "viewer")),
 ):
     user = db.get(models.User, user_id)
     if not user:
@@ -51,7 +43,7 @@ def update_user(
     user_id: int,
     payload: schemas.UserUpdate,
     db: Session = Depends(get_db),
-    _: models.AdminUser = Depends(deps.require_roles("admin", "manager")),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin", "manager")),
 ):
     user = db.get(models.User, user_id)
     if not user:
@@ -68,7 +60,7 @@ def grant_manual_subscription(
     user_id: int,
     payload: schemas.ManualSubscriptionGrant,
     db: Session = Depends(get_db),
-    _: models.AdminUser = Depends(deps.require_roles("admin", "manager")),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin", "manager")),
 ):
     user = db.get(models.User, user_id)
     if not user:
@@ -80,3 +72,17 @@ def grant_manual_subscription(
         validity_days=payload.validity_days,
     )
     return schemas.Subscription.model_validate(subscription)
+
+
+@router.get("/{user_id}/credits", response_model=list[schemas.ClassCredit])
+def list_class_credits(
+    user_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    _: deps.AdminPrincipal = Depends(deps.require_roles("admin", "manager", "viewer")),
+):
+    """History of class balance changes across the user's subscriptions."""
+
+    if not db.get(models.User, user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    return subscription_service.credit_history(db, user_id, limit=limit)
@@ -15,6 +15,10 @@ class Settings(BaseModel):
 
     redis_host: str = Field(default="localhost", alias="REDIS_HOST")
     redis_port: int = Field(default=6379, alias="REDIS_PORT")
+    cache_events_enabled: bool = Field(default=False, alias="CACHE_EVENTS_ENABLED")
+    cache_events_channel: str = Field(
+        default="dancestudio:catalogue", alias="CACHE_EVENTS_CHANNEL"
+    )
 
     jwt_secret: str = Field(default="secret", alias="JWT_SECRET")
     jwt_expire_min: int = Field(default=43200, alias="JWT_EXPIRE_MIN")
@@ -27,8 +31,23 @@ class Settings(BaseModel):
     payment_return_url: str = Field(default="http://localhost", alias="PAYMENT_RETURN_URL")
     payment_currency: str = Field(default="RUB", alias="PAYMENT_CURRENCY")
     payment_webhook_secret: str = Field(default="", alias="PAYMENT_WEBHOOK_SECRET")
+    payment_webhook_allowed_ips: str = Field(default="", alias="PAYMENT_WEBHOOK_ALLOWED_IPS")
     payment_api_key: str = Field(default="", alias="PAYMENT_API_KEY")
     payment_api_secret: str = Field(default="", alias="PAYMENT_API_SECRET")
+    payment_api_url: str = Field(
+        default="https://api.yookassa.ru/v3", alias="PAYMENT_API_URL"
+    )
+    payment_timeout: float = Field(default=10.0, alias="PAYMENT_TIMEOUT")
+    payment_max_retries: int = Field(default=2, alias="PAYMENT_MAX_RETRIES")
+    payment_reconcile_after_minutes: int = Field(
+        default=10, alias="PAYMENT_RECONCILE_AFTER_MINUTES"
+    )
+    payment_reconcile_concurrency: int = Field(
+        default=5, alias="PAYMENT_RECONCILE_CONCURRENCY"
+    )
+
+    scheduler_enabled: bool = Field(default=False, alias="SCHEDULER_ENABLED")
+    scheduler_legacy_jobs: str = Field(default="", alias="SCHEDULER_LEGACY_JOBS")
 
     default_admin_login: str = Field(default="admin", alias="DEFAULT_ADMIN_LOGIN")
     default_admin_password: str = Field(default="admin123", alias="DEFAULT_ADMIN_PASSWORD")
@@ -37,6 +56,12 @@ class Settings(BaseModel):
     google_service_account_json_path: str = Field(
         default="", alias="GOOGLE_SERVICE_ACCOUNT_JSON_PATH"
     )
+    google_sheets_spreadsheet_id: str = Field(
+        default="", alias="GOOGLE_SHEETS_SPREADSHEET_ID"
+    )
+    google_sheets_client: str = Field(default="google", alias="GOOGLE_SHEETS_CLIENT")
+    google_sheets_batch_size: int = Field(default=500, alias="GOOGLE_SHEETS_BATCH_SIZE")
+    google_sheets_max_retries: int = Field(default=5, alias="GOOGLE_SHEETS_MAX_RETRIES")
 
     class Config:
         populate_by_name = True
@@ -0,0 +1,53 @@
+"""Add booking daily statistics and change timestamps
+
+Revision ID: 0007_booking_daily_stats
+Revises: 0006_setting_media_manual
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0007_booking_daily_stats"
+down_revision = "0006_setting_media_manual"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "bookings",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=True,
+        ),
+    )
+    op.create_index("ix_bookings_updated_at", "bookings", ["updated_at"])
+    op.create_index("ix_payments_updated_at", "payments", ["updated_at"])
+
+    op.create_table(
+        "booking_daily_stats",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("bookings_total", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("bookings_confirmed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("bookings_active", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("attended", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("no_show", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("revenue", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.Column(
+            "refreshed_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=True,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("booking_daily_stats")
+    op.drop_index("ix_payments_updated_at", table_name="payments")
+    op.drop_index("ix_bookings_updated_at", table_name="bookings")
+    op.drop_column("bookings", "updated_at")
@@ -0,0 +1,51 @@
+"""Add per-direction daily rollups
+
+Revision ID: 0008_direction_daily_rollups
+Revises: 0007_booking_daily_stats
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0008_direction_daily_rollups"
+down_revision = "0007_booking_daily_stats"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "direction_daily_rollups",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("direction_id", sa.Integer(), primary_key=True),
+        sa.Column("slots", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("capacity", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("bookings_total", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("seats_taken", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("attended", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("no_show", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("canceled", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("late_cancel", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("revenue", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.Column(
+            "refreshed_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=True,
+        ),
+        sa.ForeignKeyConstraint(["direction_id"], ["directions.id"], ondelete="CASCADE"),
+    )
+    op.create_index(
+        "ix_direction_daily_rollups_direction_day",
+        "direction_daily_rollups",
+        ["direction_id", "day"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_direction_daily_rollups_direction_day", table_name="direction_daily_rollups"
+    )
+    op.drop_table("direction_daily_rollups")
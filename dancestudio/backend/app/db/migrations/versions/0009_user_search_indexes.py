@@ -0,0 +1,70 @@
+"""Add trigram and phone indexes for user search
+
+Revision ID: 0009_user_search_indexes
+Revises: 0008_direction_daily_rollups
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0009_user_search_indexes"
+down_revision = "0008_direction_daily_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    is_postgres = bind.dialect.name == "postgresql"
+
+    op.add_column("users", sa.Column("phone_normalized", sa.String(length=32), nullable=True))
+    if is_postgres:
+        op.execute(
+            """
+            UPDATE users
+            SET phone_normalized = CASE
+                WHEN regexp_replace(phone, '\\D', '', 'g') ~ '^8[0-9]{10}$'
+                    THEN '7' || substr(regexp_replace(phone, '\\D', '', 'g'), 2)
+                ELSE NULLIF(regexp_replace(phone, '\\D', '', 'g'), '')
+            END
+            WHERE phone IS NOT NULL
+            """
+        )
+    else:
+        users = sa.table(
+            "users",
+            sa.column("id", sa.Integer),
+            sa.column("phone", sa.String),
+            sa.column("phone_normalized", sa.String),
+        )
+        rows = bind.execute(sa.select(users.c.id, users.c.phone).where(users.c.phone.isnot(None)))
+        for user_id, phone in rows.fetchall():
+            digits = "".join(char for char in phone if char.isdigit())
+            if len(digits) == 11 and digits.startswith("8"):
+                digits = "7" + digits[1:]
+            bind.execute(
+                users.update()
+                .where(users.c.id == user_id)
+                .values(phone_normalized=digits or None)
+            )
+    op.create_index("ix_users_phone_normalized", "users", ["phone_normalized"])
+
+    if is_postgres:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            "ix_users_full_name_trgm",
+            "users",
+            ["full_name"],
+            postgresql_using="gin",
+            postgresql_ops={"full_name": "gin_trgm_ops"},
+        )
+    else:
+        op.create_index("ix_users_full_name_trgm", "users", ["full_name"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_full_name_trgm", table_name="users")
+    op.drop_index("ix_users_phone_normalized", table_name="users")
+    op.drop_column("users", "phone_normalized")
@@ -0,0 +1,31 @@
+"""Add admin activity flag and token version
+
+Revision ID: 0010_admin_token_version
+Revises: 0009_user_search_indexes
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0010_admin_token_version"
+down_revision = "0009_user_search_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "admin_users",
+        sa.Column("is_active", sa.Boolean(), nullable=False, server_default=sa.true()),
+    )
+    op.add_column(
+        "admin_users",
+        sa.Column("token_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("admin_users", "token_version")
+    op.drop_column("admin_users", "is_active")
@@ -0,0 +1,48 @@
+"""Add payment webhook event queue
+
+Revision ID: 0011_payment_events
+Revises: 0010_admin_token_version
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0011_payment_events"
+down_revision = "0010_admin_token_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "payment_events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("provider", sa.String(length=32), nullable=False),
+        sa.Column("event_id", sa.String(length=255), nullable=False),
+        sa.Column("order_id", sa.String(length=64), nullable=False),
+        sa.Column("status", sa.String(length=32), nullable=True),
+        sa.Column("provider_payment_id", sa.String(length=128), nullable=True),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column(
+            "received_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=True,
+        ),
+        sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("error", sa.String(length=255), nullable=True),
+        sa.UniqueConstraint("provider", "event_id", name="uq_payment_events_provider_event"),
+    )
+    op.create_index(
+        "ix_payment_events_unprocessed",
+        "payment_events",
+        ["id"],
+        postgresql_where=sa.text("processed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_payment_events_unprocessed", table_name="payment_events")
+    op.drop_table("payment_events")
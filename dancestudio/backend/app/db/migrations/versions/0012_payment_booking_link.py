@@ -0,0 +1,46 @@
+"""Link payments to the booking they pay for
+
+Revision ID: 0012_payment_booking_link
+Revises: 0011_payment_events
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0012_payment_booking_link"
+down_revision = "0011_payment_events"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("payments", sa.Column("booking_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "fk_payments_booking_id",
+        "payments",
+        "bookings",
+        ["booking_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+    # A user holds at most one booking per slot (uq_booking_user_slot).
+    op.execute(
+        """
+        UPDATE payments
+        SET booking_id = (
+            SELECT bookings.id FROM bookings
+            WHERE bookings.class_slot_id = payments.class_slot_id
+              AND bookings.user_id = payments.user_id
+        )
+        WHERE class_slot_id IS NOT NULL
+        """
+    )
+    op.create_index("ix_payments_booking_id", "payments", ["booking_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_payments_booking_id", table_name="payments")
+    op.drop_constraint("fk_payments_booking_id", "payments", type_="foreignkey")
+    op.drop_column("payments", "booking_id")
@@ -0,0 +1,60 @@
+"""Add class credit ledger for subscriptions
+
+Revision ID: 0013_class_credit_ledger
+Revises: 0012_payment_booking_link
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0013_class_credit_ledger"
+down_revision = "0012_payment_booking_link"
+branch_labels = None
+depends_on = None
+
+class_credit_kind = sa.Enum("grant", "consume", "refund", "expire", name="classcreditkind")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "class_credits",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("subscription_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("kind", class_credit_kind, nullable=False),
+        sa.Column("delta", sa.Integer(), nullable=False),
+        sa.Column("balance_after", sa.Integer(), nullable=False),
+        sa.Column("booking_id", sa.Integer(), nullable=True),
+        sa.Column("reason", sa.String(length=255), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=True,
+        ),
+        sa.ForeignKeyConstraint(["subscription_id"], ["subscriptions.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["booking_id"], ["bookings.id"], ondelete="SET NULL"),
+    )
+    op.create_index("ix_class_credits_user_id_id", "class_credits", ["user_id", "id"])
+    op.create_index(
+        "ix_class_credits_subscription_id_id", "class_credits", ["subscription_id", "id"]
+    )
+    # Existing balances become the opening entry of each subscription.
+    op.execute(
+        """
+        INSERT INTO class_credits (subscription_id, user_id, kind, delta, balance_after, reason)
+        SELECT id, user_id, 'grant', COALESCE(remaining_classes, 0),
+               COALESCE(remaining_classes, 0), 'opening balance'
+        FROM subscriptions
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_class_credits_subscription_id_id", table_name="class_credits")
+    op.drop_index("ix_class_credits_user_id_id", table_name="class_credits")
+    op.drop_table("class_credits")
+    op.execute("DROP TYPE IF EXISTS classcreditkind")
@@ -4,9 +4,13 @@ from .class_slot import ClassSlot, SlotStatus
 from .booking import Booking, BookingStatus, BookingSource
 from .product import Product, ProductType
 from .subscription import Subscription, SubscriptionStatus
+from .class_credit import ClassCredit, ClassCreditKind
 from .payment import Payment, PaymentStatus, PaymentPurpose, PaymentProvider
+from .payment_event import PaymentEvent
 from .waitlist import Waitlist, WaitlistStatus
 from .admin_user import AdminUser, AdminRole
 from .audit_log import AuditLog, ActorType
 from .setting import Setting
 from .setting_media import SettingMedia, SettingMediaType
+from .booking_daily_stats import BookingDailyStats
+from .direction_daily_rollup import DirectionDailyRollup
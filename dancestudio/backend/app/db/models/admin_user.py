@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum as PyEnum
-from sqlalchemy import DateTime, Enum, Integer, String, func
+from sqlalchemy import Boolean, DateTime, Enum, Integer, String, func, true
 from sqlalchemy.orm import Mapped, mapped_column
 from ..session import Base
 
@@ -18,5 +18,8 @@ class AdminUser(Base):
     login: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
     password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
     role: Mapped[AdminRole] = mapped_column(Enum(AdminRole), default=AdminRole.viewer)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, server_default=true())
+    # Bumped to revoke every token issued before; tokens carry it as ``ver``.
+    token_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     last_login_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
@@ -31,6 +31,9 @@ class Booking(Base):
     status: Mapped[BookingStatus] = mapped_column(Enum(BookingStatus), default=BookingStatus.reserved)
     source: Mapped[BookingSource] = mapped_column(Enum(BookingSource), default=BookingSource.bot)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True
+    )
     canceled_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     canceled_by: Mapped[str | None] = mapped_column(String(64))
     cancellation_reason: Mapped[str | None] = mapped_column(String(255))
@@ -0,0 +1,23 @@
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Integer, Numeric, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..session import Base
+
+
+class BookingDailyStats(Base):
+    """Pre-aggregated booking counters per UTC day of the class."""
+
+    __tablename__ = "booking_daily_stats"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    bookings_total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    bookings_confirmed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    bookings_active: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    attended: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    no_show: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    revenue: Mapped[float] = mapped_column(Numeric(12, 2), default=0, nullable=False)
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
@@ -0,0 +1,46 @@
+from datetime import datetime
+from enum import Enum as PyEnum
+
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from ..session import Base
+
+
+class ClassCreditKind(str, PyEnum):
+    grant = "grant"
+    consume = "consume"
+    refund = "refund"
+    expire = "expire"
+
+
+class ClassCredit(Base):
+    """Append-only record of a change to a subscription's class balance.
+
+    ``Subscription.remaining_classes`` caches the running total; ``balance_after``
+    is its value right after this entry.
+    """
+
+    __tablename__ = "class_credits"
+    __table_args__ = (
+        Index("ix_class_credits_user_id_id", "user_id", "id"),
+        Index("ix_class_credits_subscription_id_id", "subscription_id", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    subscription_id: Mapped[int] = mapped_column(
+        ForeignKey("subscriptions.id", ondelete="CASCADE")
+    )
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    kind: Mapped[ClassCreditKind] = mapped_column(Enum(ClassCreditKind))
+    delta: Mapped[int] = mapped_column(Integer)
+    balance_after: Mapped[int] = mapped_column(Integer)
+    booking_id: Mapped[int | None] = mapped_column(
+        ForeignKey("bookings.id", ondelete="SET NULL")
+    )
+    reason: Mapped[str | None] = mapped_column(String(255))
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    subscription = relationship("Subscription")
@@ -0,0 +1,32 @@
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, Numeric, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..session import Base
+
+
+class DirectionDailyRollup(Base):
+    """Pre-aggregated class, attendance and revenue figures per direction and UTC day."""
+
+    __tablename__ = "direction_daily_rollups"
+    __table_args__ = (
+        Index("ix_direction_daily_rollups_direction_day", "direction_id", "day"),
+    )
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    direction_id: Mapped[int] = mapped_column(
+        ForeignKey("directions.id", ondelete="CASCADE"), primary_key=True
+    )
+    slots: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    capacity: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    bookings_total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    seats_taken: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    attended: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    no_show: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    canceled: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    late_cancel: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    revenue: Mapped[float] = mapped_column(Numeric(12, 2), default=0, nullable=False)
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
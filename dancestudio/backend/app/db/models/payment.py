@@ -45,6 +45,9 @@ class Payment(Base):
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
     product_id: Mapped[int | None] = mapped_column(ForeignKey("products.id"))
     class_slot_id: Mapped[int | None] = mapped_column(ForeignKey("class_slots.id"))
+    booking_id: Mapped[int | None] = mapped_column(
+        ForeignKey("bookings.id", ondelete="SET NULL"), index=True
+    )
     amount: Mapped[float] = mapped_column(Numeric(10, 2))
     currency: Mapped[str] = mapped_column(CHAR(3), default="RUB")
     provider: Mapped[PaymentProvider] = mapped_column(Enum(PaymentProvider))
@@ -54,8 +57,11 @@ class Payment(Base):
     status: Mapped[PaymentStatus] = mapped_column(Enum(PaymentStatus), default=PaymentStatus.pending)
     purpose: Mapped[PaymentPurpose] = mapped_column(Enum(PaymentPurpose))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True
+    )
 
     user = relationship("User")
     product = relationship("Product")
     slot = relationship("ClassSlot")
+    booking = relationship("Booking")
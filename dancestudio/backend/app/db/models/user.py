@@ -1,18 +1,40 @@
+import re
 from datetime import datetime
 from sqlalchemy import BigInteger, DateTime, Integer, String, func
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, validates
 from ..session import Base
 
+_NON_DIGITS = re.compile(r"\D+")
+
+
+def normalize_phone(value: str | None) -> str | None:
+    """Reduce a phone number to digits, treating a leading 8 as the +7 prefix."""
+
+    if not value:
+        return None
+    digits = _NON_DIGITS.sub("", value)
+    if len(digits) == 11 and digits.startswith("8"):
+        digits = "7" + digits[1:]
+    return digits or None
+
 
 class User(Base):
     __tablename__ = "users"
+    # The pg_trgm index on full_name needs the extension and is created by
+    # migration 0009 only, so create_all keeps working on a plain database.
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     tg_id: Mapped[int] = mapped_column(BigInteger, unique=True, nullable=False)
     full_name: Mapped[str | None] = mapped_column(String(255))
     age: Mapped[int | None] = mapped_column(Integer)
     phone: Mapped[str | None] = mapped_column(String(32))
+    phone_normalized: Mapped[str | None] = mapped_column(String(32), index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+
+    @validates("phone")
+    def _sync_phone_normalized(self, _key: str, value: str | None) -> str | None:
+        self.phone_normalized = normalize_phone(value)
+        return value
@@ -5,4 +5,5 @@ from .booking import Booking, BookingCreate, BookingCancel
 from .payment import Payment, PaymentCreate, PaymentWebhook
 from .user import User, UserUpdate
 from .setting import StudioAddresses, StudioAddressesUpdate, SettingMedia
-from .subscription import ManualSubscriptionGrant, Subscription
+from .subscription import ClassCredit, ManualSubscriptionGrant, Subscription
+from .report import DirectionStats, DirectionStatsReport
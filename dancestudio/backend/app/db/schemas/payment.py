@@ -9,6 +9,7 @@ class PaymentBase(BaseModel):
     purpose: str
     product_id: int | None = None
     class_slot_id: int | None = None
+    booking_id: int | None = None
 
 
 class PaymentCreate(PaymentBase):
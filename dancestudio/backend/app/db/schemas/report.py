@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from datetime import date
+
+from pydantic import BaseModel, Field
+
+
+class DirectionStats(BaseModel):
+    direction_id: int
+    direction_name: str
+    day: date | None = None
+    slots: int
+    capacity: int
+    bookings_total: int
+    seats_taken: int
+    attended: int
+    no_show: int
+    canceled: int
+    late_cancel: int
+    revenue: float
+    fill_rate: float
+    no_show_rate: float
+
+
+class DirectionStatsReport(BaseModel):
+    date_from: date
+    date_to: date
+    days: list[DirectionStats] = Field(default_factory=list)
+    totals: list[DirectionStats] = Field(default_factory=list)
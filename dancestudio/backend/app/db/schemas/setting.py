@@ -8,6 +8,7 @@ class SettingMedia(BaseModel):
     url: str
     media_type: str
     filename: str
+    version: str | None = None
 
 
 class StudioAddresses(BaseModel):
@@ -26,3 +26,17 @@ class Subscription(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ClassCredit(BaseModel):
+    id: int
+    subscription_id: int
+    kind: str
+    delta: int
+    balance_after: int
+    booking_id: int | None = None
+    reason: str | None = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
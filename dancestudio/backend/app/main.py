@@ -12,15 +12,21 @@ from .api.routes import (
     misc,
     bot,
     settings,
+    export,
 )
 from .db.session import Base, engine, SessionLocal
 from .config import get_settings
+from .services import cache_events
 from .services.admin import ensure_admin_exists
+from .services.payments import http as payment_http
 from .services.storage import BASE_MEDIA_DIR, ensure_media_directory
+from .workers import payment_events, scheduler
 
 
 app = FastAPI(title="DanceStudioBot API", version="1.0.0")
 
+cache_events.install(SessionLocal)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -39,6 +45,7 @@ app.include_router(users.router, prefix="/api/v1")
 app.include_router(misc.router, prefix="/api/v1")
 app.include_router(bot.router, prefix="/api/v1")
 app.include_router(settings.router, prefix="/api/v1")
+app.include_router(export.router, prefix="/api/v1")
 
 ensure_media_directory()
 app.mount("/media", StaticFiles(directory=BASE_MEDIA_DIR), name="media")
@@ -50,3 +57,13 @@ async def startup_event() -> None:
     settings = get_settings()
     with SessionLocal() as session:
         ensure_admin_exists(session, settings.default_admin_login, settings.default_admin_password)
+    payment_events.start()
+    if settings.scheduler_enabled:
+        scheduler.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    scheduler.stop()
+    await payment_events.stop()
+    await payment_http.aclose_all()
@@ -1,18 +1,26 @@
 from . import (
     booking_service,
+    export_service,
     payment_service,
     schedule_service,
     google_sheets,
     settings_service,
     subscription_service,
     notification_service,
+    rollup_service,
+    stats_service,
+    user_service,
 )
 __all__ = [
     "booking_service",
+    "export_service",
     "payment_service",
     "schedule_service",
     "google_sheets",
     "settings_service",
     "subscription_service",
     "notification_service",
+    "rollup_service",
+    "stats_service",
+    "user_service",
 ]
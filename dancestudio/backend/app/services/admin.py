@@ -1,4 +1,9 @@
 import logging
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
 from ..core import security
@@ -6,6 +11,77 @@ from ..db import models
 
 logger = logging.getLogger(__name__)
 
+_PRINCIPAL_TTL = 60.0
+_PRINCIPAL_CACHE_LIMIT = 1_000
+
+
+@dataclass(frozen=True)
+class AdminPrincipal:
+    """What request authorisation needs to know about an admin."""
+
+    id: int
+    login: str
+    role: models.AdminRole
+    is_active: bool
+    token_version: int
+
+
+# admin id -> (cached_at, principal). Writes through the ORM invalidate
+# entries immediately in this process; other workers see changes once the
+# TTL expires.
+_principals: dict[int, tuple[float, AdminPrincipal]] = {}
+
+
+def clear_principal_cache() -> None:
+    _principals.clear()
+
+
+def invalidate_principal(admin_id: int) -> None:
+    _principals.pop(admin_id, None)
+
+
+def get_principal(db: Session, admin_id: int) -> AdminPrincipal | None:
+    entry = _principals.get(admin_id)
+    if entry is not None and time.monotonic() - entry[0] <= _PRINCIPAL_TTL:
+        return entry[1]
+    admin = db.get(models.AdminUser, admin_id)
+    if admin is None:
+        _principals.pop(admin_id, None)
+        return None
+    principal = AdminPrincipal(
+        id=admin.id,
+        login=admin.login,
+        role=admin.role,
+        is_active=admin.is_active is not False,
+        token_version=admin.token_version or 0,
+    )
+    if len(_principals) >= _PRINCIPAL_CACHE_LIMIT:
+        _principals.clear()
+    _principals[admin_id] = (time.monotonic(), principal)
+    return principal
+
+
+def revoke_tokens(db: Session, admin: models.AdminUser) -> None:
+    """Invalidate every token issued to ``admin`` so far."""
+
+    admin.token_version = (admin.token_version or 0) + 1
+    db.commit()
+
+
+def set_active(db: Session, admin: models.AdminUser, active: bool) -> None:
+    admin.is_active = active
+    if not active:
+        admin.token_version = (admin.token_version or 0) + 1
+    db.commit()
+
+
+def _invalidate_on_write(_mapper: Any, _connection: Any, admin: models.AdminUser) -> None:
+    invalidate_principal(admin.id)
+
+
+event.listen(models.AdminUser, "after_update", _invalidate_on_write)
+event.listen(models.AdminUser, "after_delete", _invalidate_on_write)
+
 
 def ensure_admin_exists(session: Session, login: str, password: str) -> None:
     admin = session.query(models.AdminUser).filter_by(login=login).first()
@@ -17,6 +93,9 @@ def ensure_admin_exists(session: Session, login: str, password: str) -> None:
         if admin.role != models.AdminRole.admin:
             admin.role = models.AdminRole.admin
             updated = True
+        if admin.is_active is False:
+            admin.is_active = True
+            updated = True
         if updated:
             session.commit()
             logger.info("Updated default admin user '%s'", login)
@@ -6,9 +6,10 @@ from sqlalchemy.orm import Session
 
 from ..db import models
 from ..db.models.booking import BookingSource, BookingStatus
+from ..db.models.class_credit import ClassCreditKind
 from ..db.models.class_slot import SlotStatus
 from ..db.models.subscription import SubscriptionStatus
-from .subscription_service import grant_class_credit
+from .subscription_service import change_balance, grant_class_credit
 
 
 class BookingError(Exception):
@@ -95,8 +96,17 @@ def book_class(db: Session, user: models.User, slot: models.ClassSlot) -> models
                 .scalars()
                 .first()
             )
+            consumed = None
             if locked_slot.allow_subscription and subscription:
-                subscription.remaining_classes -= 1
+                db.flush()
+                consumed = change_balance(
+                    db,
+                    subscription,
+                    ClassCreditKind.consume,
+                    -1,
+                    booking_id=booking.id,
+                )
+            if consumed is not None:
                 booking.status = BookingStatus.confirmed
             else:
                 booking.status = BookingStatus.reserved
@@ -134,8 +144,7 @@ def cancel_booking(db: Session, booking: models.Booking, actor: str) -> models.B
     else:
         paid_payment_exists = (
             db.query(models.Payment)
-            .filter(models.Payment.class_slot_id == booking.class_slot_id)
-            .filter(models.Payment.user_id == booking.user_id)
+            .filter(models.Payment.booking_id == booking.id)
             .filter(models.Payment.status == models.PaymentStatus.paid)
             .first()
             is not None
@@ -147,6 +156,7 @@ def cancel_booking(db: Session, booking: models.Booking, actor: str) -> models.B
             db,
             user_id=booking.user_id,
             slot_direction_id=slot.direction_id,
+            booking_id=booking.id,
         )
     booking.status = BookingStatus.canceled
     booking.canceled_at = now
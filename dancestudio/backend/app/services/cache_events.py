@@ -0,0 +1,176 @@
+"""Publish catalogue change events so the bot can invalidate its caches.
+
+Changes to directions, products, slots and bookings (which change seat
+availability) are collected while a session flushes and published to a Redis
+channel once the transaction commits. Rolled back changes are never published.
+Delivery happens on a background thread fed by a bounded queue, so a slow or
+unreachable Redis never delays the request that committed.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import threading
+import weakref
+from typing import Any, Callable, Iterable
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..db import models
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "cache_events_pending"
+
+Publisher = Callable[[list[dict[str, Any]]], None]
+
+QUEUE_SIZE = 1000
+
+_publisher: Publisher | None = None
+_queue: queue.Queue[list[dict[str, Any]]] = queue.Queue(maxsize=QUEUE_SIZE)
+_worker: threading.Thread | None = None
+_worker_lock = threading.Lock()
+_installed: weakref.WeakSet[Any] = weakref.WeakSet()
+
+
+def _slot_direction_id(session: Session, booking: models.Booking) -> int | None:
+    slot = inspect(booking).attrs.slot.loaded_value
+    if isinstance(slot, models.ClassSlot):
+        return slot.direction_id
+    key = inspect(models.ClassSlot).identity_key_from_primary_key(
+        (booking.class_slot_id,)
+    )
+    slot = session.identity_map.get(key)
+    return slot.direction_id if isinstance(slot, models.ClassSlot) else None
+
+
+def _describe(session: Session, obj: object) -> dict[str, Any] | None:
+    if isinstance(obj, models.Direction):
+        return {"kind": "directions", "id": obj.id}
+    if isinstance(obj, models.Product):
+        return {"kind": "products", "id": obj.id}
+    if isinstance(obj, models.ClassSlot):
+        return {"kind": "slots", "id": obj.id, "direction_id": obj.direction_id}
+    if isinstance(obj, models.Booking):
+        return {
+            "kind": "slots",
+            "id": obj.class_slot_id,
+            "direction_id": _slot_direction_id(session, obj),
+        }
+    return None
+
+
+def _collect(session: Session, objects: Iterable[object]) -> None:
+    pending: list[dict[str, Any]] = session.info.setdefault(_PENDING_KEY, [])
+    for obj in objects:
+        description = _describe(session, obj)
+        if description is not None and description not in pending:
+            pending.append(description)
+
+
+def _after_flush(session: Session, flush_context: Any) -> None:
+    dirty = [obj for obj in session.dirty if session.is_modified(obj)]
+    _collect(session, [*session.new, *dirty, *session.deleted])
+
+
+def _after_commit(session: Session) -> None:
+    events = session.info.pop(_PENDING_KEY, None)
+    if events:
+        publish(events)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _redis_publisher() -> Publisher | None:
+    settings = get_settings()
+    if not settings.cache_events_enabled:
+        return None
+    try:
+        import redis
+    except ImportError:  # pragma: no cover - depends on the environment
+        logger.warning("redis is not installed, cache invalidation events are disabled")
+        return None
+    client = redis.Redis(
+        host=settings.redis_host,
+        port=settings.redis_port,
+        socket_connect_timeout=0.5,
+        socket_timeout=0.5,
+    )
+    channel = settings.cache_events_channel
+
+    def publish_to_redis(events: list[dict[str, Any]]) -> None:
+        client.publish(channel, json.dumps(events))
+
+    return publish_to_redis
+
+
+def set_publisher(publisher: Publisher | None) -> None:
+    """Replace the transport used to deliver events (``None`` restores Redis)."""
+
+    global _publisher
+    _publisher = publisher
+
+
+def _deliver(events: list[dict[str, Any]]) -> None:
+    global _publisher
+    if _publisher is None:
+        _publisher = _redis_publisher() or (lambda events: None)
+    try:
+        _publisher(events)
+    except Exception:  # pragma: no cover - the bot falls back to cache TTLs
+        logger.exception("Failed to publish cache invalidation events")
+
+
+def _drain() -> None:
+    while True:
+        events = _queue.get()
+        try:
+            _deliver(events)
+        finally:
+            _queue.task_done()
+
+
+def _ensure_worker() -> None:
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_drain, name="cache-events", daemon=True)
+            _worker.start()
+
+
+def publish(events: list[dict[str, Any]]) -> None:
+    """Queue ``events`` for delivery; never blocks, drops them when the queue is full."""
+
+    _ensure_worker()
+    try:
+        _queue.put_nowait(events)
+    except queue.Full:
+        logger.warning("Cache event queue is full, dropping %d events", len(events))
+
+
+def flush() -> None:
+    """Wait until every queued event has been handed to the publisher."""
+
+    _queue.join()
+
+
+def install(target: Any = Session) -> None:
+    """Attach the event collectors to a session class or ``sessionmaker``."""
+
+    # ``event.contains`` is keyed by ``id(target)`` and can report a listener
+    # for a new sessionmaker that reuses the address of a collected one.
+    if target in _installed:
+        return
+    _installed.add(target)
+    event.listen(target, "after_flush", _after_flush)
+    event.listen(target, "after_commit", _after_commit)
+    event.listen(target, "after_rollback", _after_rollback)
+
+
+__all__ = ["flush", "install", "publish", "set_publisher"]
@@ -0,0 +1,344 @@
+"""Streaming export of bookings, payments and users.
+
+Rows are read with ``yield_per`` (a server-side cursor on PostgreSQL) and
+encoded chunk by chunk, so memory stays flat regardless of the table size and
+the first bytes are available as soon as the first chunk is read.
+
+Usage::
+
+    python -m app.services.export_service bookings --format csv \
+        --from 2024-01-01 --to 2024-12-31 --status attended -o bookings.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from enum import Enum
+from typing import Any, Callable, Iterable, Iterator
+
+from sqlalchemy import Select, select
+from sqlalchemy.sql import sqltypes
+from sqlalchemy.orm import Session
+
+from ..db import models
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class ExportError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ExportFilters:
+    date_from: date | None = None
+    date_to: date | None = None
+    status: str | None = None
+    changed_since: datetime | None = None
+
+
+@dataclass(frozen=True)
+class _Dataset:
+    build: Callable[[], Select]
+    date_column: Any
+    changed_column: Any
+    status_column: Any | None = None
+    status_enum: type[Enum] | None = None
+
+
+def _bookings() -> Select:
+    return (
+        select(
+            models.Booking.id,
+            models.Booking.user_id,
+            models.User.tg_id.label("user_tg_id"),
+            models.User.full_name.label("user_full_name"),
+            models.Booking.class_slot_id,
+            models.Direction.name.label("direction"),
+            models.ClassSlot.starts_at,
+            models.Booking.status,
+            models.Booking.source,
+            models.Booking.created_at,
+            models.Booking.canceled_at,
+            models.Booking.cancellation_reason,
+        )
+        .join(models.User, models.User.id == models.Booking.user_id)
+        .join(models.ClassSlot, models.ClassSlot.id == models.Booking.class_slot_id)
+        .join(models.Direction, models.Direction.id == models.ClassSlot.direction_id)
+        .order_by(models.Booking.id)
+    )
+
+
+def _payments() -> Select:
+    return select(
+        models.Payment.id,
+        models.Payment.user_id,
+        models.Payment.order_id,
+        models.Payment.purpose,
+        models.Payment.status,
+        models.Payment.provider,
+        models.Payment.amount,
+        models.Payment.currency,
+        models.Payment.product_id,
+        models.Payment.class_slot_id,
+        models.Payment.booking_id,
+        models.Payment.created_at,
+        models.Payment.updated_at,
+    ).order_by(models.Payment.id)
+
+
+def _users() -> Select:
+    return select(
+        models.User.id,
+        models.User.tg_id,
+        models.User.full_name,
+        models.User.age,
+        models.User.phone,
+        models.User.created_at,
+    ).order_by(models.User.id)
+
+
+DATASETS: dict[str, _Dataset] = {
+    "bookings": _Dataset(
+        _bookings,
+        models.ClassSlot.starts_at,
+        models.Booking.updated_at,
+        models.Booking.status,
+        models.BookingStatus,
+    ),
+    "payments": _Dataset(
+        _payments,
+        models.Payment.created_at,
+        models.Payment.updated_at,
+        models.Payment.status,
+        models.PaymentStatus,
+    ),
+    "users": _Dataset(_users, models.User.created_at, models.User.updated_at),
+}
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def media_type(fmt: str) -> str:
+    return FORMATS[fmt][0]
+
+
+def filename(dataset: str, fmt: str) -> str:
+    return f"{dataset}.{FORMATS[fmt][1]}"
+
+
+def build_query(dataset: str, filters: ExportFilters) -> Select:
+    """Validate ``filters`` for ``dataset`` and return the export statement."""
+
+    spec = DATASETS.get(dataset)
+    if spec is None:
+        raise ExportError(f"Unknown dataset: {dataset}")
+    if filters.date_from and filters.date_to and filters.date_from > filters.date_to:
+        raise ExportError("date_from must not be later than date_to")
+    statement = spec.build()
+    if filters.date_from:
+        start = datetime.combine(filters.date_from, time.min, tzinfo=timezone.utc)
+        statement = statement.where(spec.date_column >= start)
+    if filters.date_to:
+        end = datetime.combine(filters.date_to + timedelta(days=1), time.min, tzinfo=timezone.utc)
+        statement = statement.where(spec.date_column < end)
+    if filters.changed_since:
+        statement = statement.where(spec.changed_column >= filters.changed_since)
+    if filters.status:
+        if spec.status_column is None or spec.status_enum is None:
+            raise ExportError(f"{dataset} cannot be filtered by status")
+        try:
+            status = spec.status_enum(filters.status)
+        except ValueError as exc:
+            raise ExportError(f"Unknown status: {filters.status}") from exc
+        statement = statement.where(spec.status_column == status)
+    return statement
+
+
+Rows = list[tuple[Any, ...]]
+
+
+def iter_chunks(
+    db: Session, statement: Select, *, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Rows]:
+    result = db.execute(statement.execution_options(yield_per=chunk_size))
+    for partition in result.partitions():
+        yield [tuple(row) for row in partition]
+
+
+def column_names(statement: Select) -> list[str]:
+    return [column.name for column in statement.selected_columns]
+
+
+def plain_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _encode_csv(statement: Select, chunks: Iterable[Rows]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(column_names(statement))
+    for rows in chunks:
+        writer.writerows([plain_value(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _encode_ndjson(statement: Select, chunks: Iterable[Rows]) -> Iterator[bytes]:
+    columns = column_names(statement)
+    for rows in chunks:
+        lines = (
+            json.dumps(
+                {column: plain_value(value) for column, value in zip(columns, row)},
+                ensure_ascii=False,
+                default=str,
+            )
+            for row in rows
+        )
+        yield "".join(f"{line}\n" for line in lines).encode("utf-8")
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose accumulated bytes are handed out in pieces."""
+
+    def __init__(self) -> None:
+        self._parts: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        chunk = bytes(data)
+        self._parts.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _pyarrow() -> tuple[Any, Any]:
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ExportError("Parquet export requires pyarrow to be installed") from exc
+    return pyarrow, pyarrow.parquet
+
+
+def _arrow_type(pa: Any, column_type: Any) -> Any:
+    if isinstance(column_type, sqltypes.Integer):
+        return pa.int64()
+    if isinstance(column_type, sqltypes.Numeric):
+        return pa.decimal128(column_type.precision or 12, column_type.scale or 2)
+    if isinstance(column_type, sqltypes.DateTime):
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(column_type, sqltypes.Date):
+        return pa.date32()
+    return pa.string()
+
+
+def _encode_parquet(statement: Select, chunks: Iterable[Rows]) -> Iterator[bytes]:
+    pa, pq = _pyarrow()
+    schema = pa.schema(
+        [(column.name, _arrow_type(pa, column.type)) for column in statement.selected_columns]
+    )
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for rows in chunks:
+            table = pa.table(
+                [
+                    [value.value if isinstance(value, Enum) else value for value in values]
+                    for values in zip(*rows)
+                ],
+                schema=schema,
+            )
+            # Each chunk becomes a row group and is flushed to the client.
+            writer.write_table(table)
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+_ENCODERS = {"csv": _encode_csv, "ndjson": _encode_ndjson, "parquet": _encode_parquet}
+
+
+def stream_export(
+    db: Session,
+    dataset: str,
+    fmt: str,
+    filters: ExportFilters | None = None,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Return an iterator over the encoded export of ``dataset``.
+
+    Filters and the format are validated before the iterator is returned, so
+    callers can report :class:`ExportError` before streaming starts.
+    """
+
+    if fmt not in _ENCODERS:
+        raise ExportError(f"Unknown format: {fmt}")
+    if fmt == "parquet":
+        _pyarrow()
+    statement = build_query(dataset, filters or ExportFilters())
+    return _ENCODERS[fmt](statement, iter_chunks(db, statement, chunk_size=chunk_size))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Выгрузка данных студии")
+    parser.add_argument("dataset", choices=sorted(DATASETS))
+    parser.add_argument("--format", dest="fmt", choices=sorted(FORMATS), default="csv")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat)
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat)
+    parser.add_argument("--status")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("-o", "--output", help="Файл для записи (по умолчанию stdout)")
+    args = parser.parse_args(argv)
+
+    from ..db.session import SessionLocal
+
+    filters = ExportFilters(args.date_from, args.date_to, args.status)
+    with SessionLocal() as session:
+        try:
+            chunks = stream_export(
+                session, args.dataset, args.fmt, filters, chunk_size=args.chunk_size
+            )
+            if args.output:
+                with open(args.output, "wb") as output:
+                    for chunk in chunks:
+                        output.write(chunk)
+            else:
+                for chunk in chunks:
+                    sys.stdout.buffer.write(chunk)
+                sys.stdout.buffer.flush()
+        except ExportError as exc:
+            parser.error(str(exc))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,360 @@
-from ..config import get_settings
+"""Incremental export of bookings, payments and users to Google Sheets.
 
+Each dataset goes to the worksheet of the same name, with the row id in the
+first column. A sync reads the id column once, rewrites rows already present
+with ``values.batchUpdate`` and appends new ones with ``values.append``, a
+batch of rows per call. Only rows changed since the dataset's watermark are
+sent, and quota errors are retried with exponential backoff.
+"""
 
-def export_to_sheets(payload: dict) -> str:
+from __future__ import annotations
+
+import logging
+import random
+import re
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable, Iterable
+
+from sqlalchemy.orm import Session
+
+from ..config import Settings, get_settings
+from ..db.session import SessionLocal
+from . import export_service
+from .stats_service import WATERMARK_OVERLAP, read_watermark, write_watermark
+
+logger = logging.getLogger(__name__)
+
+DATASETS = ("bookings", "payments", "users")
+WATERMARK_KEY_PREFIX = "google_sheets_watermark:"
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+_BASE_DELAY = 1.0
+_MAX_DELAY = 64.0
+
+Rows = list[list[Any]]
+
+
+class SheetsApiError(Exception):
+    def __init__(self, status: int, message: str = "") -> None:
+        super().__init__(message or f"Sheets API error {status}")
+        self.status = status
+
+
+class SheetsConfigError(RuntimeError):
+    """The configured Sheets client cannot be used in this environment."""
+
+
+class BaseSheetsClient(ABC):
+    @abstractmethod
+    def get_values(self, range_: str) -> Rows:
+        raise NotImplementedError
+
+    @abstractmethod
+    def append(self, range_: str, rows: Rows) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def batch_update(self, data: list[tuple[str, Rows]]) -> None:
+        raise NotImplementedError
+
+
+class GoogleSheetsClient(BaseSheetsClient):
+    """Client for the Sheets v4 API authorised with a service account."""
+
+    _SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+
+    def __init__(self, spreadsheet_id: str, service_account_path: str) -> None:
+        try:
+            from google.oauth2 import service_account
+            from googleapiclient.discovery import build
+        except ImportError as exc:  # pragma: no cover - depends on the environment
+            raise SheetsConfigError(
+                "google-api-python-client and google-auth are required"
+                " for Google Sheets"
+            ) from exc
+        credentials = service_account.Credentials.from_service_account_file(
+            service_account_path, scopes=self._SCOPES
+        )
+        service = build("sheets", "v4", credentials=credentials, cache_discovery=False)
+        self._values = service.spreadsheets().values()
+        self._spreadsheet_id = spreadsheet_id
+
+    def _execute(self, request: Any) -> dict[str, Any]:  # pragma: no cover - network
+        from googleapiclient.errors import HttpError
+
+        try:
+            return request.execute()
+        except HttpError as exc:
+            raise SheetsApiError(int(exc.resp.status), str(exc)) from exc
+
+    def get_values(self, range_: str) -> Rows:  # pragma: no cover - network
+        response = self._execute(
+            self._values.get(spreadsheetId=self._spreadsheet_id, range=range_)
+        )
+        return response.get("values", [])
+
+    def append(self, range_: str, rows: Rows) -> None:  # pragma: no cover - network
+        self._execute(
+            self._values.append(
+                spreadsheetId=self._spreadsheet_id,
+                range=range_,
+                valueInputOption="RAW",
+                insertDataOption="INSERT_ROWS",
+                body={"values": rows},
+            )
+        )
+
+    def batch_update(self, data: list[tuple[str, Rows]]) -> None:  # pragma: no cover
+        self._execute(
+            self._values.batchUpdate(
+                spreadsheetId=self._spreadsheet_id,
+                body={
+                    "valueInputOption": "RAW",
+                    "data": [
+                        {"range": range_, "values": rows} for range_, rows in data
+                    ],
+                },
+            )
+        )
+
+
+_CELL = re.compile(r"([A-Z]+)(\d+)?")
+
+
+class LocalSheetsClient(BaseSheetsClient):
+    """In-memory spreadsheet for tests and local development."""
+
+    def __init__(self) -> None:
+        self.sheets: dict[str, Rows] = {}
+        self.calls: list[str] = []
+
+    @staticmethod
+    def _split(range_: str) -> tuple[str, str]:
+        sheet, _, cells = range_.partition("!")
+        return sheet, cells
+
+    def get_values(self, range_: str) -> Rows:
+        self.calls.append("get")
+        sheet, cells = self._split(range_)
+        rows = self.sheets.get(sheet, [])
+        if cells.startswith("A:A"):
+            return [row[:1] for row in rows]
+        return [list(row) for row in rows]
+
+    def append(self, range_: str, rows: Rows) -> None:
+        self.calls.append("append")
+        sheet, _ = self._split(range_)
+        self.sheets.setdefault(sheet, []).extend(list(row) for row in rows)
+
+    def batch_update(self, data: list[tuple[str, Rows]]) -> None:
+        self.calls.append("batch_update")
+        for range_, rows in data:
+            sheet, cells = self._split(range_)
+            match = _CELL.match(cells)
+            start = int(match.group(2)) - 1 if match and match.group(2) else 0
+            target = self.sheets.setdefault(sheet, [])
+            for offset, row in enumerate(rows):
+                while len(target) <= start + offset:
+                    target.append([])
+                target[start + offset] = list(row)
+
+
+LOCAL_CLIENT_ENVS = {"dev", "test"}
+_local_client: LocalSheetsClient | None = None
+
+
+def get_sheets_client(settings: Settings) -> BaseSheetsClient:
+    """Build the client selected by ``GOOGLE_SHEETS_CLIENT``.
+
+    Misconfiguration raises ``SheetsConfigError`` instead of falling back to
+    the in-memory client: a sync into memory would still move the watermarks,
+    and the rows would never reach the real spreadsheet.
+    """
+
+    if settings.google_sheets_client == "local":
+        if settings.env not in LOCAL_CLIENT_ENVS:
+            raise SheetsConfigError(
+                f"GOOGLE_SHEETS_CLIENT=local is not allowed with ENV={settings.env}"
+            )
+        global _local_client
+        if _local_client is None:
+            _local_client = LocalSheetsClient()
+        return _local_client
+    if settings.google_sheets_client == "google":
+        if not (
+            settings.google_sheets_spreadsheet_id
+            and settings.google_service_account_json_path
+        ):
+            raise SheetsConfigError(
+                "GOOGLE_SHEETS_SPREADSHEET_ID and GOOGLE_SERVICE_ACCOUNT_JSON_PATH"
+                " must be set"
+            )
+        return GoogleSheetsClient(
+            settings.google_sheets_spreadsheet_id,
+            settings.google_service_account_json_path,
+        )
+    raise SheetsConfigError(
+        f"Unsupported Google Sheets client {settings.google_sheets_client}"
+    )
+
+
+@dataclass
+class SheetSyncResult:
+    appended: int = 0
+    updated: int = 0
+    api_calls: int = 0
+
+
+class _RetryingApi:
+    def __init__(
+        self,
+        client: BaseSheetsClient,
+        result: SheetSyncResult,
+        *,
+        max_retries: int,
+        sleep: Callable[[float], None],
+    ) -> None:
+        self._client = client
+        self._result = result
+        self._max_retries = max_retries
+        self._sleep = sleep
+
+    def __call__(self, method: str, *args: Any) -> Any:
+        for attempt in range(self._max_retries + 1):
+            self._result.api_calls += 1
+            try:
+                return getattr(self._client, method)(*args)
+            except SheetsApiError as exc:
+                if exc.status not in RETRYABLE_STATUSES or attempt == self._max_retries:
+                    raise
+                delay = min(_MAX_DELAY, _BASE_DELAY * 2**attempt) + random.uniform(0, 1)
+                logger.warning(
+                    "Sheets API quota or server error, retrying",
+                    extra={"status": exc.status, "delay": round(delay, 2)},
+                )
+                self._sleep(delay)
+
+
+def _cell(value: Any) -> Any:
+    value = export_service.plain_value(value)
+    if value is None:
+        return ""
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _watermark_key(dataset: str) -> str:
+    return f"{WATERMARK_KEY_PREFIX}{dataset}"
+
+
+def sync_dataset(
+    db: Session,
+    client: BaseSheetsClient,
+    dataset: str,
+    *,
+    full: bool = False,
+    batch_size: int = 500,
+    max_retries: int = 5,
+    sleep: Callable[[float], None] = time.sleep,
+) -> SheetSyncResult:
+    """Send rows of ``dataset`` changed since the last sync to its worksheet."""
+
+    result = SheetSyncResult()
+    api = _RetryingApi(client, result, max_retries=max_retries, sleep=sleep)
+    started_at = datetime.now(timezone.utc)
+    key = _watermark_key(dataset)
+    watermark = None if full else read_watermark(db, key)
+    since = watermark - WATERMARK_OVERLAP if watermark else None
+    statement = export_service.build_query(
+        dataset, export_service.ExportFilters(changed_since=since)
+    )
+
+    existing = api("get_values", f"{dataset}!A:A")
+    # Sheet rows are 1-based and the first one holds the header.
+    positions = {
+        str(row[0]): index + 1 for index, row in enumerate(existing) if row and index
+    }
+    if not existing:
+        api("append", f"{dataset}!A1", [export_service.column_names(statement)])
+
+    appends: Rows = []
+    updates: list[tuple[str, Rows]] = []
+
+    def flush(force: bool = False) -> None:
+        nonlocal appends, updates
+        if appends and (force or len(appends) >= batch_size):
+            api("append", f"{dataset}!A1", appends)
+            result.appended += len(appends)
+            appends = []
+        if updates and (force or len(updates) >= batch_size):
+            api("batch_update", updates)
+            result.updated += len(updates)
+            updates = []
+
+    for rows in export_service.iter_chunks(db, statement, chunk_size=batch_size):
+        for row in rows:
+            values = [_cell(value) for value in row]
+            position = positions.get(str(values[0]))
+            if position is None:
+                appends.append(values)
+            else:
+                updates.append((f"{dataset}!A{position}", [values]))
+        flush()
+    flush(force=True)
+
+    write_watermark(db, started_at, key)
+    db.commit()
+    return result
+
+
+def sync_to_sheets(
+    db: Session,
+    client: BaseSheetsClient | None = None,
+    *,
+    datasets: Iterable[str] = DATASETS,
+    full: bool = False,
+    sleep: Callable[[float], None] = time.sleep,
+) -> dict[str, SheetSyncResult]:
     settings = get_settings()
-    if not settings.google_sheets_enabled:
-        return "Google Sheets integration disabled"
-    # Заглушка: в реальной реализации использовался бы Google API client
-    return f"Exported {len(payload.get('rows', []))} rows to Google Sheets"
+    client = client or get_sheets_client(settings)
+    results: dict[str, SheetSyncResult] = {}
+    for dataset in datasets:
+        results[dataset] = sync_dataset(
+            db,
+            client,
+            dataset,
+            full=full,
+            batch_size=settings.google_sheets_batch_size,
+            max_retries=settings.google_sheets_max_retries,
+            sleep=sleep,
+        )
+        logger.info(
+            "Synced dataset to Google Sheets",
+            extra={"dataset": dataset, **asdict(results[dataset])},
+        )
+    return results
+
+
+def parse_export_request(payload: dict) -> tuple[list[str], bool]:
+    datasets = list(payload.get("datasets") or DATASETS)
+    unknown = [name for name in datasets if name not in DATASETS]
+    if unknown:
+        raise ValueError(f"Unknown datasets: {', '.join(unknown)}")
+    return datasets, bool(payload.get("full"))
+
+
+def run_export(client: BaseSheetsClient, datasets: list[str], full: bool) -> None:
+    """Sync ``datasets`` in a session of its own; runs after the response."""
+
+    with SessionLocal() as db:
+        try:
+            results = sync_to_sheets(db, client, datasets=datasets, full=full)
+        except SheetsApiError:
+            logger.exception("Google Sheets export failed")
+            return
+    total = sum(item.appended + item.updated for item in results.values())
+    logger.info("Exported rows to Google Sheets", extra={"rows": total})
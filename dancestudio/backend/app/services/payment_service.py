@@ -1,74 +1,166 @@
+import asyncio
+import logging
 import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
+import anyio.to_thread
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from ..config import get_settings
 from ..db import models
+from . import subscription_service
 from .payments import gateway
 
+logger = logging.getLogger(__name__)
 
-def create_payment(
+PROVIDER_STATUSES = {
+    "pending": models.PaymentStatus.pending,
+    "succeeded": models.PaymentStatus.paid,
+    "paid": models.PaymentStatus.paid,
+    "canceled": models.PaymentStatus.canceled,
+    "refunded": models.PaymentStatus.refunded,
+    "failed": models.PaymentStatus.failed,
+}
+EVENT_BATCH_SIZE = 100
+RECONCILE_BATCH_SIZE = 200
+# How long the provider honours an idempotence key (YooKassa: 24 hours).
+RESUBMIT_WINDOW = timedelta(hours=24)
+
+
+def _prepare_payment(
     db: Session,
     user: models.User,
     amount: float,
     purpose: models.PaymentPurpose,
-    product: models.Product | None = None,
-    slot: models.ClassSlot | None = None,
+    product: models.Product | None,
+    slot: models.ClassSlot | None,
+    booking: models.Booking | None,
 ) -> tuple[models.Payment, dict[str, Any]]:
-    order_id = str(uuid.uuid4())
+    """Persist the pending payment before the provider is called.
+
+    The commit also covers whatever the caller staged in the same session
+    (the reserved booking), so both land in one transaction. A pending row
+    without ``provider_payment_id`` is the outbox record for a request that
+    may not have reached the provider yet. Returns the payment and the
+    arguments for the gateway call, read before the commit.
+    """
+
     settings = get_settings()
-    currency = (settings.payment_currency or "RUB").upper()
+    if booking is not None:
+        slot_id: int | None = booking.class_slot_id
+    else:
+        slot_id = slot.id if slot else None
     payment = models.Payment(
         user_id=user.id,
         product_id=product.id if product else None,
-        class_slot_id=slot.id if slot else None,
+        class_slot_id=slot_id,
+        booking=booking,
         amount=amount,
-        currency=currency,
+        currency=(settings.payment_currency or "RUB").upper(),
         provider=models.PaymentProvider(settings.payment_provider),
-        order_id=order_id,
+        order_id=str(uuid.uuid4()),
         purpose=purpose,
     )
     db.add(payment)
+    gateway_args = {
+        "order_id": payment.order_id,
+        "amount": amount,
+        "currency": payment.currency,
+        "user_id": user.id,
+    }
     db.commit()
-    db.refresh(payment)
+    return payment, gateway_args
+
+
+async def _register_with_gateway(
+    order_id: str, amount: float, currency: str, user_id: int
+) -> dict[str, Any]:
+    settings = get_settings()
     gateway_client = gateway.get_gateway(settings)
-    gateway_response = gateway_client.create_payment(
+    return await gateway_client.create_payment(
         order_id=order_id,
         amount=amount,
         currency=currency,
         description=f"Dance class payment #{order_id}",
         return_url=settings.payment_return_url,
-        metadata={"user_id": user.id},
+        metadata={"user_id": user_id},
     )
+
+
+def _finalize_payment(
+    db: Session, payment: models.Payment, gateway_response: dict[str, Any]
+) -> models.Payment:
+    """Record the provider's answer (and the stub's instant payment) in one commit."""
+
     confirmation_url = (
         gateway_response.get("confirmation_url")
         or gateway_response.get("return_url")
     )
-    if confirmation_url:
-        payment.confirmation_url = confirmation_url
+    provider_payment_id = gateway_response.get("provider_payment_id")
+    if confirmation_url or provider_payment_id:
+        payment.confirmation_url = confirmation_url or payment.confirmation_url
+        payment.provider_payment_id = provider_payment_id or payment.provider_payment_id
+    if get_settings().payment_provider == "stub":
+        apply_payment(db, payment, models.PaymentStatus.paid, commit=False)
+    if db.dirty or db.new:
         db.commit()
-        db.refresh(payment)
-    if settings.payment_provider == "stub":
-        payment = apply_payment(db, payment, models.PaymentStatus.paid)
+    return payment
+
+
+def _fail_payment(db: Session, payment: models.Payment) -> None:
+    payment.status = models.PaymentStatus.failed
+    payment.updated_at = datetime.now(timezone.utc)
+    db.commit()
+
+
+async def create_payment_async(
+    db: Session,
+    user: models.User,
+    amount: float,
+    purpose: models.PaymentPurpose,
+    product: models.Product | None = None,
+    slot: models.ClassSlot | None = None,
+    booking: models.Booking | None = None,
+) -> tuple[models.Payment, dict[str, Any]]:
+    """Create a payment without blocking the event loop.
+
+    Database work runs in the threadpool; only the provider call is awaited on
+    the loop. Raises :class:`PaymentGatewayError` (after marking the payment
+    failed) if the provider cannot register it.
+    """
+
+    payment, gateway_args = await anyio.to_thread.run_sync(
+        _prepare_payment, db, user, amount, purpose, product, slot, booking
+    )
+    try:
+        gateway_response = await _register_with_gateway(**gateway_args)
+    except gateway.PaymentGatewayError:
+        await anyio.to_thread.run_sync(_fail_payment, db, payment)
+        raise
+    payment = await anyio.to_thread.run_sync(
+        _finalize_payment, db, payment, gateway_response
+    )
     return payment, gateway_response
 
 
-def apply_payment(db: Session, payment: models.Payment, status: models.PaymentStatus) -> models.Payment:
+def apply_payment(
+    db: Session,
+    payment: models.Payment,
+    status: models.PaymentStatus,
+    *,
+    commit: bool = True,
+) -> models.Payment:
     if payment.status == status:
         return payment
     payment.status = status
     payment.updated_at = datetime.now(timezone.utc)
     if status == models.PaymentStatus.paid:
         payment.confirmation_url = None
-        if payment.class_slot_id:
-            booking = (
-                db.query(models.Booking)
-                .filter_by(class_slot_id=payment.class_slot_id, user_id=payment.user_id)
-                .order_by(models.Booking.id.desc())
-                .first()
-            )
+        if payment.booking_id:
+            booking = db.get(models.Booking, payment.booking_id)
             if booking:
                 booking.status = models.BookingStatus.confirmed
         if (
@@ -79,15 +171,223 @@ def apply_payment(db: Session, payment: models.Payment, status: models.PaymentSt
             if product:
                 valid_from = datetime.now(timezone.utc)
                 validity_days = product.validity_days or 30
-                remaining_classes = product.classes_count or 0
                 subscription = models.Subscription(
                     user_id=payment.user_id,
                     product_id=product.id,
-                    remaining_classes=remaining_classes,
                     valid_from=valid_from,
                     valid_to=valid_from + timedelta(days=validity_days),
                 )
-                db.add(subscription)
-    db.commit()
-    db.refresh(payment)
+                subscription_service.open_balance(
+                    db,
+                    subscription,
+                    product.classes_count or 0,
+                    reason=f"payment {payment.order_id}",
+                )
+    if commit:
+        db.commit()
     return payment
+
+
+def enqueue_webhook_event(
+    db: Session, provider: str, parsed: dict[str, Any], payload: dict[str, Any]
+) -> bool:
+    """Store a provider notification for the worker.
+
+    Returns ``False`` when the same event was already received, so provider
+    retries are acknowledged without doing the work twice.
+    """
+
+    db.add(
+        models.PaymentEvent(
+            provider=provider,
+            event_id=str(parsed["event_id"])[:255],
+            order_id=parsed["order_id"],
+            status=parsed.get("status"),
+            provider_payment_id=parsed.get("provider_payment_id"),
+            payload=payload,
+        )
+    )
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return False
+    return True
+
+
+def process_webhook_events(db: Session, *, batch_size: int = EVENT_BATCH_SIZE) -> int:
+    """Apply queued notifications in batches and return how many were handled.
+
+    Each batch is claimed with ``FOR UPDATE SKIP LOCKED`` and committed
+    together with its effects, so concurrent workers never apply an event
+    twice and a crash leaves the whole batch queued.
+    """
+
+    handled = 0
+    while True:
+        events = db.scalars(
+            select(models.PaymentEvent)
+            .where(models.PaymentEvent.processed_at.is_(None))
+            .order_by(models.PaymentEvent.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not events:
+            break
+        payments = {
+            payment.order_id: payment
+            for payment in db.scalars(
+                select(models.Payment)
+                .where(models.Payment.order_id.in_({event.order_id for event in events}))
+                .with_for_update()
+            )
+        }
+        now = datetime.now(timezone.utc)
+        for event in events:
+            payment = payments.get(event.order_id)
+            if payment is None:
+                event.error = "Payment not found"
+                logger.warning(
+                    "Payment event for unknown order", extra={"order_id": event.order_id}
+                )
+            else:
+                if event.provider_payment_id and not payment.provider_payment_id:
+                    payment.provider_payment_id = event.provider_payment_id
+                status = PROVIDER_STATUSES.get(event.status)
+                if status is None:
+                    # Intermediate states such as ``waiting_for_capture`` are
+                    # followed by a final notification.
+                    event.error = f"Unknown status {event.status!r}"
+                else:
+                    apply_payment(db, payment, status, commit=False)
+            event.processed_at = now
+        db.commit()
+        handled += len(events)
+        if len(events) < batch_size:
+            break
+    return handled
+
+
+def _stale_pending_payments(
+    db: Session, provider: str, cutoff: datetime, limit: int
+) -> list[dict[str, Any]]:
+    resubmit_after = datetime.now(timezone.utc) - RESUBMIT_WINDOW
+    rows = db.execute(
+        select(
+            models.Payment.id,
+            models.Payment.order_id,
+            models.Payment.provider_payment_id,
+            models.Payment.amount,
+            models.Payment.currency,
+            models.Payment.user_id,
+        )
+        .where(
+            models.Payment.provider == models.PaymentProvider(provider),
+            models.Payment.status == models.PaymentStatus.pending,
+            models.Payment.created_at < cutoff,
+            or_(
+                models.Payment.provider_payment_id.is_not(None),
+                models.Payment.created_at >= resubmit_after,
+            ),
+        )
+        .order_by(models.Payment.created_at)
+        .limit(limit)
+    ).all()
+    # Don't sit idle in a transaction while the provider is queried.
+    db.rollback()
+    return [row._asdict() for row in rows]
+
+
+def _apply_provider_statuses(
+    db: Session, results: dict[int, dict[str, Any]]
+) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    payments = db.scalars(
+        select(models.Payment)
+        .where(
+            models.Payment.id.in_(results),
+            # Skip payments a webhook settled while the provider was queried.
+            models.Payment.status == models.PaymentStatus.pending,
+        )
+        .with_for_update(skip_locked=True)
+    ).all()
+    for payment in payments:
+        result = results[payment.id]
+        status = PROVIDER_STATUSES.get(result.get("status"))
+        if result.get("provider_payment_id") and not payment.provider_payment_id:
+            payment.provider_payment_id = result["provider_payment_id"]
+        if result.get("confirmation_url") and not payment.confirmation_url:
+            payment.confirmation_url = result["confirmation_url"]
+        if status is None:
+            if result.get("status"):
+                logger.warning(
+                    "Unknown payment status from provider",
+                    extra={"order_id": payment.order_id, "status": result["status"]},
+                )
+        elif status != models.PaymentStatus.pending:
+            apply_payment(db, payment, status, commit=False)
+            counts[status.value] = counts.get(status.value, 0) + 1
+    db.commit()
+    return counts
+
+
+async def reconcile_pending_payments(
+    db: Session,
+    *,
+    older_than: timedelta | None = None,
+    concurrency: int | None = None,
+    limit: int = RECONCILE_BATCH_SIZE,
+) -> dict[str, int]:
+    """Re-check payments stuck in ``pending`` with the provider.
+
+    Covers lost webhooks and create requests whose answer never arrived:
+    payments without ``provider_payment_id`` are submitted again with their
+    ``order_id`` as the idempotence key, which returns the original payment
+    if the provider has it. Past ``RESUBMIT_WINDOW`` the key has expired, so
+    such payments are left to ``cleanup_reserved``. Providers that cannot
+    look payments up (Telegram) are skipped. At most ``concurrency``
+    requests are in flight; the answers are applied in one transaction.
+    Returns how many payments moved to each status.
+    """
+
+    settings = get_settings()
+    gateway_client = gateway.get_gateway(settings)
+    if not gateway_client.supports_status_lookup:
+        return {}
+    if older_than is None:
+        older_than = timedelta(minutes=settings.payment_reconcile_after_minutes)
+    cutoff = datetime.now(timezone.utc) - older_than
+    candidates = await anyio.to_thread.run_sync(
+        _stale_pending_payments, db, settings.payment_provider, cutoff, limit
+    )
+    if not candidates:
+        return {}
+
+    semaphore = asyncio.Semaphore(concurrency or settings.payment_reconcile_concurrency)
+    results: dict[int, dict[str, Any]] = {}
+
+    async def check(candidate: dict[str, Any]) -> None:
+        order_id = candidate["order_id"]
+        async with semaphore:
+            try:
+                if candidate["provider_payment_id"]:
+                    result = await gateway_client.get_payment_status(
+                        order_id, candidate["provider_payment_id"]
+                    )
+                else:
+                    result = await _register_with_gateway(
+                        order_id,
+                        float(candidate["amount"]),
+                        candidate["currency"],
+                        candidate["user_id"],
+                    )
+            except gateway.PaymentGatewayError:
+                logger.warning("Payment status check failed", extra={"order_id": order_id})
+                return
+        if result.get("status") or result.get("provider_payment_id"):
+            results[candidate["id"]] = result
+
+    await asyncio.gather(*(check(candidate) for candidate in candidates))
+    if not results:
+        return {}
+    return await anyio.to_thread.run_sync(_apply_provider_statuses, db, results)
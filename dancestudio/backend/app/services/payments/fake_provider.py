@@ -0,0 +1,85 @@
+"""Local stand-in for the YooKassa payments API.
+
+Tests mount it through ``httpx.ASGITransport``; for manual checks run it with
+``uvicorn app.services.payments.fake_provider:app --port 8100`` and set
+``PAYMENT_API_URL=http://localhost:8100/v3``.
+"""
+
+from __future__ import annotations
+
+import uuid
+from collections import deque
+from typing import Any
+
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+
+class FakeYooKassa:
+    def __init__(self) -> None:
+        self.payments: dict[str, dict[str, Any]] = {}
+        self.by_key: dict[str, str] = {}
+        self.requests: list[tuple[str, str, str | None]] = []
+        self._failures: deque[int] = deque()
+        self.app = self._build_app()
+
+    def fail_next(self, *statuses: int) -> None:
+        """Answer the next requests with ``statuses`` before behaving normally."""
+
+        self._failures.extend(statuses)
+
+    def set_status(self, payment_id: str, status: str) -> None:
+        self.payments[payment_id]["status"] = status
+        self.payments[payment_id]["paid"] = status == "succeeded"
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Fake YooKassa")
+
+        @app.middleware("http")
+        async def inject_failures(request: Request, call_next):
+            self.requests.append(
+                (request.method, request.url.path, request.headers.get("Idempotence-Key"))
+            )
+            if self._failures:
+                status_code = self._failures.popleft()
+                return JSONResponse({"type": "error", "code": "internal_error"}, status_code)
+            return await call_next(request)
+
+        @app.post("/v3/payments")
+        async def create_payment(
+            payload: dict[str, Any],
+            idempotence_key: str | None = Header(default=None, alias="Idempotence-Key"),
+        ) -> dict[str, Any]:
+            if not idempotence_key:
+                raise HTTPException(status_code=400, detail="Idempotence-Key is required")
+            if idempotence_key in self.by_key:
+                return self.payments[self.by_key[idempotence_key]]
+            payment_id = str(uuid.uuid4())
+            payment = {
+                "id": payment_id,
+                "status": "pending",
+                "paid": False,
+                "amount": payload.get("amount"),
+                "description": payload.get("description"),
+                "metadata": payload.get("metadata") or {},
+                "confirmation": {
+                    "type": "redirect",
+                    "confirmation_url": f"https://yookassa.local/checkout/{payment_id}",
+                },
+            }
+            self.payments[payment_id] = payment
+            self.by_key[idempotence_key] = payment_id
+            return payment
+
+        @app.get("/v3/payments/{payment_id}")
+        async def get_payment(payment_id: str) -> dict[str, Any]:
+            payment = self.payments.get(payment_id)
+            if payment is None:
+                raise HTTPException(status_code=404, detail="Payment not found")
+            return payment
+
+        return app
+
+
+provider = FakeYooKassa()
+app = provider.app
@@ -1,14 +1,29 @@
+import hashlib
+import hmac
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Mapping
 from ...config import Settings
 
+SIGNATURE_HEADER = "X-Webhook-Signature"
+
+
+class PaymentGatewayError(Exception):
+    """The provider could not be reached or rejected the request."""
+
+    def __init__(self, message: str, *, status_code: int | None = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
 
 class BasePaymentGateway(ABC):
+    # Whether :meth:`get_payment_status` can look payments up at all.
+    supports_status_lookup = True
+
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
 
     @abstractmethod
-    def create_payment(
+    async def create_payment(
         self,
         order_id: str,
         amount: float,
@@ -17,10 +32,47 @@ class BasePaymentGateway(ABC):
         return_url: str,
         metadata: dict[str, Any],
     ) -> dict[str, Any]:
+        """Register the payment with the provider.
+
+        ``order_id`` doubles as the idempotence key, so repeating the call for
+        the same order never creates a second charge.
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_payment_status(
+        self, order_id: str, provider_payment_id: str | None
+    ) -> dict[str, Any]:
+        """Ask the provider for the current state of a payment.
+
+        Returns ``status`` (a provider status as in webhooks, ``None`` when the
+        provider cannot tell) and ``provider_payment_id``.
+        """
+
         raise NotImplementedError
 
+    def verify_webhook(
+        self, body: bytes, headers: Mapping[str, str], client_host: str | None
+    ) -> bool:
+        """Check the hex HMAC-SHA256 of the raw body sent in ``X-Webhook-Signature``.
+
+        Without ``PAYMENT_WEBHOOK_SECRET`` every notification is rejected.
+        """
+
+        secret = self.settings.payment_webhook_secret
+        if not secret:
+            return False
+        expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(headers.get(SIGNATURE_HEADER, ""), expected)
+
     @abstractmethod
     def parse_webhook(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Extract ``event_id``, ``order_id``, ``status`` and ``provider_payment_id``.
+
+        ``event_id`` must be stable across redeliveries of the same notification.
+        """
+
         raise NotImplementedError
 
 
@@ -0,0 +1,117 @@
+"""Pooled HTTP clients for payment providers.
+
+One ``httpx.AsyncClient`` is kept per provider and event loop, so requests
+reuse keep-alive connections instead of opening a new TLS session each time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import weakref
+from typing import Any
+
+import httpx
+
+from .gateway import PaymentGatewayError
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30)
+
+# event loop -> provider name -> client. Async clients cannot be shared
+# between loops; scripts and tests that start their own loop get their own.
+_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]
+] = weakref.WeakKeyDictionary()
+_overrides: dict[str, httpx.AsyncBaseTransport] = {}
+
+
+def timeout(total: float) -> httpx.Timeout:
+    return httpx.Timeout(total, connect=min(total, 3.0), pool=min(total, 2.0))
+
+
+def get_client(
+    name: str,
+    *,
+    base_url: str,
+    timeout_seconds: float,
+    auth: tuple[str, str] | None = None,
+) -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    clients = _clients.setdefault(loop, {})
+    client = clients.get(name)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            base_url=base_url,
+            auth=auth,
+            timeout=timeout(timeout_seconds),
+            limits=_LIMITS,
+            transport=_overrides.get(name),
+        )
+        clients[name] = client
+    return client
+
+
+def override_transport(name: str, transport: httpx.AsyncBaseTransport | None) -> None:
+    """Route ``name``'s requests through ``transport`` (tests, local fakes)."""
+
+    if transport is None:
+        _overrides.pop(name, None)
+    else:
+        _overrides[name] = transport
+    for clients in list(_clients.values()):
+        clients.pop(name, None)
+
+
+async def aclose_all() -> None:
+    loop = asyncio.get_running_loop()
+    clients = _clients.pop(loop, {})
+    for client in clients.values():
+        await client.aclose()
+
+
+async def request(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    *,
+    retries: int,
+    backoff: float,
+    idempotence_key: str | None = None,
+    **kwargs: Any,
+) -> httpx.Response:
+    """Send a request, retrying timeouts, connection errors and 429/5xx.
+
+    Only idempotent requests are retried: GETs, and POSTs carrying an
+    ``Idempotence-Key`` that the provider deduplicates.
+    """
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    if idempotence_key:
+        headers["Idempotence-Key"] = idempotence_key
+    can_retry = method.upper() == "GET" or idempotence_key is not None
+    attempts = retries + 1 if can_retry else 1
+    for attempt in range(attempts):
+        last_attempt = attempt == attempts - 1
+        try:
+            response = await client.request(method, url, headers=headers, **kwargs)
+        except httpx.TransportError as exc:
+            if last_attempt:
+                raise PaymentGatewayError(f"Payment provider unavailable: {exc!r}") from exc
+            logger.warning("Payment provider request failed, retrying", extra={"url": url})
+        else:
+            if response.status_code not in RETRYABLE_STATUSES or last_attempt:
+                if response.is_error:
+                    raise PaymentGatewayError(
+                        f"Payment provider returned {response.status_code}",
+                        status_code=response.status_code,
+                    )
+                return response
+            logger.warning(
+                "Payment provider returned a retryable status",
+                extra={"url": url, "status": response.status_code},
+            )
+        await asyncio.sleep(backoff * 2**attempt)
+    raise AssertionError("unreachable")  # pragma: no cover
@@ -8,7 +8,7 @@ from .gateway import BasePaymentGateway
 class StubGateway(BasePaymentGateway):
     """Simple payment gateway stub that pretends every payment succeeds."""
 
-    def create_payment(
+    async def create_payment(
         self,
         order_id: str,
         amount: float,
@@ -27,10 +27,18 @@ class StubGateway(BasePaymentGateway):
             "metadata": metadata,
         }
 
+    async def get_payment_status(
+        self, order_id: str, provider_payment_id: str | None
+    ) -> dict[str, Any]:
+        return {"status": "succeeded", "provider_payment_id": provider_payment_id}
+
     def parse_webhook(self, data: dict[str, Any]) -> dict[str, Any]:
         # Webhooks are not used for the stub provider, simply echo data back
+        order_id = data.get("order_id")
+        status = data.get("status", "succeeded")
         return {
-            "order_id": data.get("order_id"),
-            "status": data.get("status", "succeeded"),
+            "event_id": data.get("event_id") or f"{order_id}:{status}",
+            "order_id": order_id,
+            "status": status,
             "provider_payment_id": data.get("provider_payment_id"),
         }
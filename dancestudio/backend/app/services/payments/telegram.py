@@ -14,7 +14,9 @@ class TelegramGateway(BasePaymentGateway):
     relayed back to Telegram handlers in the bot.
     """
 
-    def create_payment(
+    supports_status_lookup = False
+
+    async def create_payment(
         self,
         order_id: str,
         amount: float,
@@ -31,9 +33,19 @@ class TelegramGateway(BasePaymentGateway):
             "metadata": metadata,
         }
 
+    async def get_payment_status(
+        self, order_id: str, provider_payment_id: str | None
+    ) -> dict[str, Any]:
+        # The Bot API has no way to look a payment up; only the bot's
+        # successful_payment update confirms it.
+        return {"status": None, "provider_payment_id": provider_payment_id}
+
     def parse_webhook(self, data: dict[str, Any]) -> dict[str, Any]:
+        order_id = data.get("order_id")
+        status = data.get("status", "paid")
         return {
-            "order_id": data.get("order_id"),
-            "status": data.get("status", "paid"),
+            "event_id": data.get("event_id") or f"{order_id}:{status}",
+            "order_id": order_id,
+            "status": status,
             "provider_payment_id": data.get("provider_payment_id"),
         }
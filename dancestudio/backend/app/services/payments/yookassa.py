@@ -1,12 +1,38 @@
+import ipaddress
 import logging
-from typing import Any
+from decimal import Decimal
+from typing import Any, Mapping
+
+from . import http
 from .gateway import BasePaymentGateway
 
 logger = logging.getLogger(__name__)
 
+# Addresses YooKassa sends notifications from, as published in its docs.
+WEBHOOK_NETWORKS = (
+    "185.71.76.0/27",
+    "185.71.77.0/27",
+    "77.75.153.0/25",
+    "77.75.156.11",
+    "77.75.156.35",
+    "77.75.154.128/25",
+    "2a02:5180::/32",
+)
+
 
 class YooKassaGateway(BasePaymentGateway):
-    def create_payment(
+    name = "yookassa"
+    retry_backoff = 0.2
+
+    def _client(self):
+        return http.get_client(
+            self.name,
+            base_url=self.settings.payment_api_url,
+            timeout_seconds=self.settings.payment_timeout,
+            auth=(self.settings.payment_api_key, self.settings.payment_api_secret),
+        )
+
+    async def create_payment(
         self,
         order_id: str,
         amount: float,
@@ -16,17 +42,82 @@ class YooKassaGateway(BasePaymentGateway):
         metadata: dict[str, Any],
     ) -> dict[str, Any]:
         logger.info("Creating YooKassa payment", extra={"order_id": order_id, "amount": amount})
+        response = await http.request(
+            self._client(),
+            "POST",
+            "payments",
+            retries=self.settings.payment_max_retries,
+            backoff=self.retry_backoff,
+            idempotence_key=order_id,
+            json={
+                "amount": {"value": f"{Decimal(str(amount)):.2f}", "currency": currency},
+                "capture": True,
+                "confirmation": {"type": "redirect", "return_url": return_url},
+                "description": description[:128],
+                "metadata": {**metadata, "order_id": order_id},
+            },
+        )
+        data = response.json()
         return {
             "order_id": order_id,
             "amount": amount,
             "currency": currency,
-            "confirmation_url": return_url,
+            "status": data.get("status"),
+            "provider_payment_id": data.get("id"),
+            "confirmation_url": (data.get("confirmation") or {}).get("confirmation_url"),
         }
 
+    async def get_payment_status(
+        self, order_id: str, provider_payment_id: str | None
+    ) -> dict[str, Any]:
+        if not provider_payment_id:
+            # The create request never got an answer; the provider may not
+            # know the payment at all.
+            return {"status": None, "provider_payment_id": None}
+        response = await http.request(
+            self._client(),
+            "GET",
+            f"payments/{provider_payment_id}",
+            retries=self.settings.payment_max_retries,
+            backoff=self.retry_backoff,
+        )
+        data = response.json()
+        return {"status": data.get("status"), "provider_payment_id": data.get("id")}
+
+    def _webhook_networks(self) -> list[ipaddress.IPv4Network | ipaddress.IPv6Network]:
+        configured = [
+            item.strip()
+            for item in self.settings.payment_webhook_allowed_ips.split(",")
+            if item.strip()
+        ]
+        return [ipaddress.ip_network(item) for item in configured or WEBHOOK_NETWORKS]
+
+    def verify_webhook(
+        self, body: bytes, headers: Mapping[str, str], client_host: str | None
+    ) -> bool:
+        """Accept notifications from YooKassa's addresses.
+
+        YooKassa does not sign notifications, so the sender is checked against
+        ``PAYMENT_WEBHOOK_ALLOWED_IPS`` (its published networks by default).
+        A body signed with ``PAYMENT_WEBHOOK_SECRET`` is accepted as well.
+        """
+
+        if super().verify_webhook(body, headers, client_host):
+            return True
+        try:
+            address = ipaddress.ip_address(client_host or "")
+        except ValueError:
+            return False
+        return any(address in network for network in self._webhook_networks())
+
     def parse_webhook(self, data: dict[str, Any]) -> dict[str, Any]:
-        logger.info("Parsing YooKassa webhook", extra=data)
+        logger.info("Parsing YooKassa webhook", extra={"event": data.get("event")})
+        payment = data.get("object") or {}
+        # Notifications carry no id of their own; a payment passes through
+        # each event type at most once.
         return {
-            "order_id": data.get("object", {}).get("metadata", {}).get("order_id"),
-            "status": data.get("object", {}).get("status"),
-            "provider_payment_id": data.get("object", {}).get("id"),
+            "event_id": f"{payment.get('id')}:{data.get('event')}",
+            "order_id": (payment.get("metadata") or {}).get("order_id"),
+            "status": payment.get("status"),
+            "provider_payment_id": payment.get("id"),
         }
@@ -0,0 +1,294 @@
+"""Per-direction daily rollups of classes, attendance and revenue.
+
+Rows are keyed by (UTC class day, direction). The refresh is incremental:
+days touched by bookings or payments updated since the ``updated_at``
+high-watermark, and slots created after the last seen slot id, are
+recomputed; everything else is left as is. Slot edits the watermark cannot
+see (moving, canceling or deleting a slot) recompute their keys through
+:func:`refresh_keys`. Canceled slots add no capacity. Revenue is attributed to the day
+of the class the payment was made for; subscription payments are not tied to
+a direction and are not included.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Iterable
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..db import models, schemas
+from .stats_service import (
+    WATERMARK_OVERLAP,
+    read_watermark,
+    utc_day,
+    within_days,
+    write_watermark,
+)
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_KEY = "direction_rollup_watermark"
+SLOT_ID_KEY = "direction_rollup_slot_id"
+_DAYS_PER_QUERY = 100
+
+_SEATED_STATUSES = (
+    models.BookingStatus.confirmed,
+    models.BookingStatus.reserved,
+    models.BookingStatus.attended,
+    models.BookingStatus.no_show,
+)
+_COUNTERS = (
+    "slots",
+    "capacity",
+    "bookings_total",
+    "seats_taken",
+    "attended",
+    "no_show",
+    "canceled",
+    "late_cancel",
+)
+
+Key = tuple[date, int]
+
+
+def _read_slot_id(db: Session) -> int:
+    setting = db.get(models.Setting, SLOT_ID_KEY)
+    try:
+        return int(setting.value) if setting and setting.value else 0
+    except ValueError:
+        return 0
+
+
+def _write_slot_id(db: Session, value: int) -> None:
+    setting = db.get(models.Setting, SLOT_ID_KEY)
+    if setting is None:
+        db.add(models.Setting(key=SLOT_ID_KEY, value=str(value)))
+    else:
+        setting.value = str(value)
+
+
+def _touched_keys(
+    db: Session, since: datetime | None, last_slot_id: int
+) -> set[Key]:
+    slot_columns = (models.ClassSlot.starts_at, models.ClassSlot.direction_id)
+    if since is None:
+        rows: Iterable[tuple[datetime, int]] = db.query(*slot_columns).distinct()
+        return {(utc_day(starts_at), direction_id) for starts_at, direction_id in rows}
+    bookings = (
+        db.query(*slot_columns)
+        .join(models.Booking, models.Booking.class_slot_id == models.ClassSlot.id)
+        .filter(models.Booking.updated_at >= since)
+        .distinct()
+    )
+    payments = (
+        db.query(*slot_columns)
+        .join(models.Payment, models.Payment.class_slot_id == models.ClassSlot.id)
+        .filter(models.Payment.updated_at >= since)
+        .distinct()
+    )
+    new_slots = (
+        db.query(*slot_columns).filter(models.ClassSlot.id > last_slot_id).distinct()
+    )
+    return {
+        (utc_day(starts_at), direction_id)
+        for query in (bookings, payments, new_slots)
+        for starts_at, direction_id in query
+    }
+
+
+def _aggregate(
+    db: Session, days: list[date], direction_ids: set[int]
+) -> dict[Key, dict[str, Any]]:
+    slots = (
+        db.query(
+            models.ClassSlot.id,
+            models.ClassSlot.direction_id,
+            models.ClassSlot.starts_at,
+            models.ClassSlot.capacity,
+            models.ClassSlot.status,
+        )
+        .filter(models.ClassSlot.direction_id.in_(direction_ids))
+        .filter(within_days(models.ClassSlot.starts_at, days))
+        .all()
+    )
+    if not slots:
+        return {}
+    rows: dict[Key, dict[str, Any]] = defaultdict(
+        lambda: {**{name: 0 for name in _COUNTERS}, "revenue": Decimal("0")}
+    )
+    slot_keys: dict[int, Key] = {}
+    for slot_id, direction_id, starts_at, capacity, status in slots:
+        key = (utc_day(starts_at), direction_id)
+        slot_keys[slot_id] = key
+        if status != models.SlotStatus.canceled:
+            rows[key]["slots"] += 1
+            rows[key]["capacity"] += capacity or 0
+    bookings = (
+        db.query(
+            models.Booking.class_slot_id,
+            models.Booking.status,
+            func.count(models.Booking.id),
+        )
+        .filter(models.Booking.class_slot_id.in_(list(slot_keys)))
+        .group_by(models.Booking.class_slot_id, models.Booking.status)
+    )
+    for slot_id, status_value, count in bookings:
+        row = rows[slot_keys[slot_id]]
+        row["bookings_total"] += count
+        if status_value in _SEATED_STATUSES:
+            row["seats_taken"] += count
+        if status_value == models.BookingStatus.attended:
+            row["attended"] += count
+        elif status_value == models.BookingStatus.no_show:
+            row["no_show"] += count
+        elif status_value == models.BookingStatus.canceled:
+            row["canceled"] += count
+        elif status_value == models.BookingStatus.late_cancel:
+            row["late_cancel"] += count
+    payments = (
+        db.query(models.Payment.class_slot_id, func.sum(models.Payment.amount))
+        .filter(models.Payment.class_slot_id.in_(list(slot_keys)))
+        .filter(models.Payment.status == models.PaymentStatus.paid)
+        .group_by(models.Payment.class_slot_id)
+    )
+    for slot_id, amount in payments:
+        rows[slot_keys[slot_id]]["revenue"] += Decimal(amount or 0)
+    return dict(rows)
+
+
+def _rewrite_keys(db: Session, keys: set[Key]) -> None:
+    by_day: dict[date, set[int]] = defaultdict(set)
+    for day, direction_id in keys:
+        by_day[day].add(direction_id)
+    days = sorted(by_day)
+    for offset in range(0, len(days), _DAYS_PER_QUERY):
+        chunk = days[offset : offset + _DAYS_PER_QUERY]
+        chunk_keys = {(day, direction_id) for day in chunk for direction_id in by_day[day]}
+        direction_ids = {direction_id for _, direction_id in chunk_keys}
+        aggregated = _aggregate(db, chunk, direction_ids)
+        stale = (
+            db.query(models.DirectionDailyRollup)
+            .filter(models.DirectionDailyRollup.day.in_(chunk))
+            .filter(models.DirectionDailyRollup.direction_id.in_(direction_ids))
+            .all()
+        )
+        for row in stale:
+            if (row.day, row.direction_id) in chunk_keys:
+                db.delete(row)
+        db.flush()
+        db.add_all(
+            models.DirectionDailyRollup(day=day, direction_id=direction_id, **values)
+            for (day, direction_id), values in aggregated.items()
+            if (day, direction_id) in chunk_keys
+        )
+
+
+def _commit_refresh(db: Session) -> bool:
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        logger.info("Concurrent direction rollup refresh detected, skipping")
+        return False
+    return True
+
+
+def refresh_rollups(db: Session, *, full: bool = False) -> set[Key]:
+    """Recompute rollups touched since the last run and return their keys."""
+
+    started_at = datetime.now(timezone.utc)
+    watermark = None if full else read_watermark(db, WATERMARK_KEY)
+    since = watermark - WATERMARK_OVERLAP if watermark else None
+    last_slot_id = _read_slot_id(db)
+    max_slot_id = db.query(func.max(models.ClassSlot.id)).scalar() or 0
+    keys = _touched_keys(db, since, last_slot_id)
+    _rewrite_keys(db, keys)
+    write_watermark(db, started_at, WATERMARK_KEY)
+    _write_slot_id(db, max(max_slot_id, last_slot_id))
+    if not _commit_refresh(db):
+        return set()
+    return keys
+
+
+def refresh_keys(db: Session, keys: Iterable[Key]) -> None:
+    """Recompute the given (day, direction) rollups right away and commit."""
+
+    _rewrite_keys(db, set(keys))
+    _commit_refresh(db)
+
+
+def _ratio(part: int, whole: int) -> float:
+    return part / whole if whole else 0.0
+
+
+def _to_schema(
+    direction_id: int, name: str, values: dict[str, Any], day: date | None = None
+) -> schemas.DirectionStats:
+    attended = int(values["attended"])
+    no_show = int(values["no_show"])
+    return schemas.DirectionStats(
+        direction_id=direction_id,
+        direction_name=name,
+        day=day,
+        **{counter: int(values[counter]) for counter in _COUNTERS},
+        revenue=float(values["revenue"] or 0),
+        fill_rate=_ratio(int(values["seats_taken"]), int(values["capacity"])),
+        no_show_rate=_ratio(no_show, attended + no_show),
+    )
+
+
+def direction_report(
+    db: Session,
+    date_from: date,
+    date_to: date,
+    *,
+    direction_id: int | None = None,
+    include_days: bool = True,
+) -> schemas.DirectionStatsReport:
+    """Read per-day rows and per-direction totals for ``[date_from, date_to]``."""
+
+    rollup = models.DirectionDailyRollup
+    filters = [rollup.day >= date_from, rollup.day <= date_to]
+    if direction_id is not None:
+        filters.append(rollup.direction_id == direction_id)
+    names = dict(db.query(models.Direction.id, models.Direction.name))
+
+    totals_query = (
+        db.query(
+            rollup.direction_id,
+            *(func.sum(getattr(rollup, name)).label(name) for name in _COUNTERS),
+            func.sum(rollup.revenue).label("revenue"),
+        )
+        .filter(*filters)
+        .group_by(rollup.direction_id)
+        .order_by(rollup.direction_id)
+    )
+    totals = [
+        _to_schema(row.direction_id, names.get(row.direction_id, ""), row._asdict())
+        for row in totals_query
+    ]
+    days: list[schemas.DirectionStats] = []
+    if include_days:
+        day_rows = (
+            db.query(rollup)
+            .filter(*filters)
+            .order_by(rollup.day, rollup.direction_id)
+        )
+        days = [
+            _to_schema(
+                row.direction_id,
+                names.get(row.direction_id, ""),
+                {name: getattr(row, name) for name in (*_COUNTERS, "revenue")},
+                day=row.day,
+            )
+            for row in day_rows
+        ]
+    return schemas.DirectionStatsReport(
+        date_from=date_from, date_to=date_to, days=days, totals=totals
+    )
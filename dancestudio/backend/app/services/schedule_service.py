@@ -68,6 +68,7 @@ def cancel_slot(
             db,
             user_id=booking.user_id,
             slot_direction_id=slot.direction_id,
+            booking_id=booking.id,
         )
         booking.status = models.BookingStatus.canceled
         booking.canceled_at = now
@@ -76,8 +77,7 @@ def cancel_slot(
 
         payments = (
             db.query(models.Payment)
-            .filter(models.Payment.class_slot_id == slot.id)
-            .filter(models.Payment.user_id == booking.user_id)
+            .filter(models.Payment.booking_id == booking.id)
             .filter(models.Payment.status == models.PaymentStatus.pending)
             .all()
         )
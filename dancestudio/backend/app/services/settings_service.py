@@ -31,6 +31,16 @@ def get_addresses(db: Session) -> tuple[str, list[models.SettingMedia]]:
     return addresses, media_items
 
 
+def media_version(asset: models.SettingMedia) -> str:
+    """Return an identifier that changes whenever the stored file content changes.
+
+    Uploaded files are written once under a random name, so the stored file name
+    uniquely identifies the content of a media item.
+    """
+
+    return Path(asset.file_path).stem
+
+
 def _guess_media_type(upload: UploadFile) -> SettingMediaType:
     content_type = (upload.content_type or "").lower()
     if content_type.startswith("image/"):
@@ -97,6 +107,7 @@ def update_addresses(
 __all__ = [
     "ADDRESSES_KEY",
     "get_addresses",
+    "media_version",
     "save_addresses_media",
     "update_addresses",
 ]
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Iterable
+
+from sqlalchemy import and_, case, func, or_, select, true
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..db import models
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_KEY = "booking_stats_watermark"
+# Rows written by transactions that were still open during the previous run
+# carry an older ``updated_at``; re-reading a short overlap catches them.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+_DAYS_PER_QUERY = 100
+
+_ACTIVE_STATUSES = (models.BookingStatus.confirmed, models.BookingStatus.reserved)
+_COMPLETED_STATUSES = (models.BookingStatus.attended, models.BookingStatus.no_show)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def utc_day(value: datetime) -> date:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).date()
+
+
+def _count_if(condition: Any) -> Any:
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def within_days(column: Any, days: Iterable[date]) -> Any:
+    """Index-friendly filter matching ``column`` values on any of ``days``."""
+
+    return or_(
+        *(
+            and_(column >= day_start(day), column < day_start(day + timedelta(days=1)))
+            for day in days
+        )
+    )
+
+
+def read_watermark(db: Session, key: str = WATERMARK_KEY) -> datetime | None:
+    setting = db.get(models.Setting, key)
+    if not setting or not setting.value:
+        return None
+    try:
+        return datetime.fromisoformat(setting.value)
+    except ValueError:
+        return None
+
+
+def write_watermark(db: Session, value: datetime, key: str = WATERMARK_KEY) -> None:
+    setting = db.get(models.Setting, key)
+    if setting is None:
+        db.add(models.Setting(key=key, value=value.isoformat()))
+    else:
+        setting.value = value.isoformat()
+
+
+def _touched_days(db: Session, since: datetime | None) -> set[date]:
+    slot_starts = db.query(models.ClassSlot.starts_at).join(models.Booking)
+    payment_dates = db.query(models.Payment.created_at).filter(
+        models.Payment.status == models.PaymentStatus.paid
+    )
+    if since is not None:
+        slot_starts = slot_starts.filter(models.Booking.updated_at >= since)
+        payment_dates = db.query(models.Payment.created_at).filter(
+            models.Payment.updated_at >= since
+        )
+    days = {utc_day(value) for (value,) in slot_starts.distinct()}
+    days.update(utc_day(value) for (value,) in payment_dates.distinct())
+    return days
+
+
+def _aggregate_days(db: Session, days: list[date]) -> dict[date, dict[str, Any]]:
+    rows: dict[date, dict[str, Any]] = {
+        day: {
+            "bookings_total": 0,
+            "bookings_confirmed": 0,
+            "bookings_active": 0,
+            "attended": 0,
+            "no_show": 0,
+            "revenue": 0,
+        }
+        for day in days
+    }
+    bookings = (
+        db.query(
+            models.ClassSlot.starts_at,
+            models.Booking.status,
+            func.count(models.Booking.id),
+        )
+        .join(models.ClassSlot)
+        .filter(within_days(models.ClassSlot.starts_at, days))
+        .group_by(models.ClassSlot.starts_at, models.Booking.status)
+    )
+    for starts_at, status_value, count in bookings:
+        row = rows[utc_day(starts_at)]
+        row["bookings_total"] += count
+        if status_value == models.BookingStatus.confirmed:
+            row["bookings_confirmed"] += count
+        if status_value in _ACTIVE_STATUSES:
+            row["bookings_active"] += count
+        if status_value == models.BookingStatus.attended:
+            row["attended"] += count
+        if status_value == models.BookingStatus.no_show:
+            row["no_show"] += count
+    payments = (
+        db.query(models.Payment.created_at, models.Payment.amount)
+        .filter(models.Payment.status == models.PaymentStatus.paid)
+        .filter(within_days(models.Payment.created_at, days))
+    )
+    for created_at, amount in payments:
+        rows[utc_day(created_at)]["revenue"] += amount or 0
+    return rows
+
+
+def _rewrite_days(db: Session, days: list[date]) -> None:
+    for offset in range(0, len(days), _DAYS_PER_QUERY):
+        chunk = days[offset : offset + _DAYS_PER_QUERY]
+        aggregated = _aggregate_days(db, chunk)
+        db.query(models.BookingDailyStats).filter(
+            models.BookingDailyStats.day.in_(chunk)
+        ).delete(synchronize_session=False)
+        db.add_all(
+            models.BookingDailyStats(day=day, **values)
+            for day, values in aggregated.items()
+            if values["bookings_total"] or values["revenue"]
+        )
+
+
+def _commit_refresh(db: Session) -> bool:
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another refresh wrote the same days concurrently; its result wins.
+        db.rollback()
+        logger.info("Concurrent booking stats refresh detected, skipping")
+        return False
+    return True
+
+
+def refresh_daily_stats(db: Session, *, full: bool = False) -> set[date]:
+    """Recompute the daily statistics of days touched since the last run.
+
+    Returns the refreshed days. ``full`` recomputes every day with data.
+    """
+
+    started_at = _now()
+    watermark = None if full else read_watermark(db)
+    since = watermark - WATERMARK_OVERLAP if watermark else None
+    days = sorted(_touched_days(db, since))
+    _rewrite_days(db, days)
+    write_watermark(db, started_at)
+    if not _commit_refresh(db):
+        return set()
+    return set(days)
+
+
+def refresh_days(db: Session, days: Iterable[date]) -> None:
+    """Recompute ``days`` right away and commit.
+
+    For changes the watermark cannot see: a slot moved to another day or
+    deleted leaves its bookings' ``updated_at`` untouched.
+    """
+
+    _rewrite_days(db, sorted(set(days)))
+    _commit_refresh(db)
+
+
+def booking_stats(db: Session) -> dict[str, Any]:
+    """Dashboard counters: stored history plus today and later computed live.
+
+    ``weekly_revenue`` covers the rolling window ``now - 7 days .. now``: whole
+    days inside it come from stored history, while the partial day the window
+    starts in and today are summed from raw payments.
+    """
+
+    now = _now()
+    today = now.date()
+    today_start = day_start(today)
+    today_end = today_start + timedelta(days=1)
+    week_start = now - timedelta(days=7)
+    first_full_day = week_start.date() + timedelta(days=1)
+    stats = models.BookingDailyStats
+    history = (
+        select(
+            func.coalesce(func.sum(stats.bookings_total), 0).label("total"),
+            func.coalesce(func.sum(stats.bookings_confirmed), 0).label("confirmed"),
+            func.coalesce(func.sum(stats.attended), 0).label("attended"),
+            func.coalesce(func.sum(stats.attended + stats.no_show), 0).label(
+                "completed"
+            ),
+            func.coalesce(
+                func.sum(
+                    case((stats.day >= first_full_day, stats.revenue), else_=0)
+                ),
+                0,
+            ).label("revenue"),
+        )
+        .where(stats.day < today)
+        .subquery()
+    )
+    live = (
+        select(
+            func.count(models.Booking.id).label("total"),
+            _count_if(models.Booking.status == models.BookingStatus.confirmed).label(
+                "confirmed"
+            ),
+            _count_if(
+                and_(
+                    models.Booking.status.in_(_ACTIVE_STATUSES),
+                    models.ClassSlot.starts_at < today_end,
+                )
+            ).label("today"),
+            _count_if(
+                and_(
+                    models.ClassSlot.starts_at < now,
+                    models.Booking.status == models.BookingStatus.attended,
+                )
+            ).label("attended"),
+            _count_if(
+                and_(
+                    models.ClassSlot.starts_at < now,
+                    models.Booking.status.in_(_COMPLETED_STATUSES),
+                )
+            ).label("completed"),
+        )
+        .select_from(models.Booking)
+        .join(models.ClassSlot)
+        .where(models.ClassSlot.starts_at >= today_start)
+        .subquery()
+    )
+    live_revenue = (
+        select(func.coalesce(func.sum(models.Payment.amount), 0))
+        .where(models.Payment.status == models.PaymentStatus.paid)
+        .where(models.Payment.created_at >= week_start)
+        .where(
+            or_(
+                models.Payment.created_at < day_start(first_full_day),
+                models.Payment.created_at >= today_start,
+            )
+        )
+        .scalar_subquery()
+    )
+    row = db.execute(
+        select(
+            history.c.total + live.c.total,
+            history.c.confirmed + live.c.confirmed,
+            live.c.today,
+            history.c.attended + live.c.attended,
+            history.c.completed + live.c.completed,
+            history.c.revenue + live_revenue,
+        ).select_from(history.join(live, true()))
+    ).one()
+    total, confirmed, bookings_today, attended, completed, revenue = row
+    return {
+        "total": int(total),
+        "confirmed": int(confirmed),
+        "bookings_today": int(bookings_today),
+        "attendance_rate": (attended / completed) * 100 if completed else 0.0,
+        "weekly_revenue": float(revenue or 0),
+    }
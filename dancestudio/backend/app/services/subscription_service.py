@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
 
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from ..db import models
 
@@ -16,6 +18,119 @@ def _now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def _record(
+    db: Session,
+    subscription: models.Subscription,
+    kind: models.ClassCreditKind,
+    delta: int,
+    balance_after: int,
+    booking_id: int | None,
+    reason: str | None,
+) -> models.ClassCredit:
+    entry = models.ClassCredit(
+        subscription_id=subscription.id,
+        user_id=subscription.user_id,
+        kind=kind,
+        delta=delta,
+        balance_after=balance_after,
+        booking_id=booking_id,
+        reason=reason,
+    )
+    db.add(entry)
+    return entry
+
+
+def open_balance(
+    db: Session,
+    subscription: models.Subscription,
+    classes: int,
+    *,
+    kind: models.ClassCreditKind = models.ClassCreditKind.grant,
+    booking_id: int | None = None,
+    reason: str | None = None,
+) -> models.ClassCredit:
+    """Give a new subscription its starting balance and log it."""
+
+    subscription.remaining_classes = classes
+    db.add(subscription)
+    db.flush()
+    return _record(db, subscription, kind, classes, classes, booking_id, reason)
+
+
+def change_balance(
+    db: Session,
+    subscription: models.Subscription,
+    kind: models.ClassCreditKind,
+    delta: int,
+    *,
+    booking_id: int | None = None,
+    reason: str | None = None,
+) -> models.ClassCredit | None:
+    """Move the cached balance by ``delta`` and append the ledger entry.
+
+    The balance is changed by a single conditional ``UPDATE`` in the database
+    instead of read-modify-write, so concurrent changes are never lost and it
+    cannot drop below zero. Returns ``None`` if it would have.
+    """
+
+    db.flush()
+    balance = db.execute(
+        update(models.Subscription)
+        .where(
+            models.Subscription.id == subscription.id,
+            models.Subscription.remaining_classes + delta >= 0,
+        )
+        .values(remaining_classes=models.Subscription.remaining_classes + delta)
+        .returning(models.Subscription.remaining_classes)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+    if balance is None:
+        return None
+    set_committed_value(subscription, "remaining_classes", balance)
+    return _record(db, subscription, kind, delta, balance, booking_id, reason)
+
+
+def credit_history(
+    db: Session, user_id: int, *, limit: int = 50
+) -> list[models.ClassCredit]:
+    """Latest balance changes across the user's subscriptions, newest first."""
+
+    return list(
+        db.scalars(
+            select(models.ClassCredit)
+            .where(models.ClassCredit.user_id == user_id)
+            .order_by(models.ClassCredit.id.desc())
+            .limit(limit)
+        )
+    )
+
+
+def expire_subscriptions(db: Session) -> int:
+    """Write off the classes left on lapsed subscriptions and mark them expired."""
+
+    now = _now()
+    subscriptions = db.scalars(
+        select(models.Subscription)
+        .where(
+            models.Subscription.status == models.SubscriptionStatus.active,
+            models.Subscription.valid_to < now,
+        )
+        .with_for_update(skip_locked=True)
+    ).all()
+    for subscription in subscriptions:
+        if subscription.remaining_classes:
+            change_balance(
+                db,
+                subscription,
+                models.ClassCreditKind.expire,
+                -subscription.remaining_classes,
+                reason="validity ended",
+            )
+        subscription.status = models.SubscriptionStatus.expired
+    db.commit()
+    return len(subscriptions)
+
+
 def _get_compensation_product(db: Session) -> models.Product:
     product = (
         db.query(models.Product)
@@ -67,6 +182,7 @@ def grant_class_credit(
     *,
     user_id: int,
     slot_direction_id: int | None = None,
+    booking_id: int | None = None,
 ) -> models.Subscription:
     """Return an active subscription with an extra class or create a new credit."""
 
@@ -85,7 +201,9 @@ def grant_class_credit(
         if direction_limit and slot_direction_id and direction_limit != slot_direction_id:
             subscription = None
     if subscription:
-        subscription.remaining_classes += 1
+        change_balance(
+            db, subscription, models.ClassCreditKind.refund, 1, booking_id=booking_id
+        )
         if subscription.initial_classes is not None:
             subscription.initial_classes += 1
         return subscription
@@ -102,7 +220,9 @@ def grant_class_credit(
         .first()
     )
     if subscription:
-        subscription.remaining_classes += 1
+        change_balance(
+            db, subscription, models.ClassCreditKind.refund, 1, booking_id=booking_id
+        )
         target_valid_to = now + timedelta(days=validity_days)
         if subscription.valid_to < target_valid_to:
             subscription.valid_to = target_valid_to
@@ -111,13 +231,14 @@ def grant_class_credit(
     subscription = models.Subscription(
         user_id=user_id,
         product_id=product.id,
-        remaining_classes=1,
         initial_classes=1,
         valid_from=now,
         valid_to=now + timedelta(days=validity_days),
         status=models.SubscriptionStatus.active,
     )
-    db.add(subscription)
+    open_balance(
+        db, subscription, 1, kind=models.ClassCreditKind.refund, booking_id=booking_id
+    )
     return subscription
 
 
@@ -134,16 +255,22 @@ def issue_manual_subscription(
     subscription = models.Subscription(
         user_id=user_id,
         product_id=product.id,
-        remaining_classes=classes_count,
         initial_classes=classes_count,
         valid_from=now,
         valid_to=now + timedelta(days=days),
         status=models.SubscriptionStatus.active,
     )
-    db.add(subscription)
+    open_balance(db, subscription, classes_count, reason="issued by administrator")
     db.commit()
     db.refresh(subscription)
     return subscription
 
 
-__all__ = ["grant_class_credit", "issue_manual_subscription"]
+__all__ = [
+    "change_balance",
+    "credit_history",
+    "expire_subscriptions",
+    "grant_class_credit",
+    "issue_manual_subscription",
+    "open_balance",
+]
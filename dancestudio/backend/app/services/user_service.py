@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import re
+import time
+
+from sqlalchemy import case, func, or_
+from sqlalchemy.orm import Session
+
+from ..db import models
+from ..db.models.user import normalize_phone
+
+_USER_ID_TTL = 300.0
+_USER_ID_CACHE_LIMIT = 10_000
+
+# Queries made only of digits and phone punctuation are looked up by exact
+# phone/tg_id instead of by name.
+_NUMBER_QUERY = re.compile(r"\+?[\d\s()\-]+")
+_MIN_NUMBER_DIGITS = 5
+_MAX_BIGINT = 2**63 - 1
+
+# tg_id -> (cached_at, user_id). Users are never deleted and tg_id is unique,
+# so a cached mapping only goes stale if a row is removed by hand.
+_user_ids: dict[int, tuple[float, int]] = {}
+
+
+def _cached_user_id(tg_id: int) -> int | None:
+    entry = _user_ids.get(tg_id)
+    if entry is None:
+        return None
+    cached_at, user_id = entry
+    if time.monotonic() - cached_at > _USER_ID_TTL:
+        _user_ids.pop(tg_id, None)
+        return None
+    return user_id
+
+
+def _remember_user_id(tg_id: int, user_id: int) -> None:
+    if len(_user_ids) >= _USER_ID_CACHE_LIMIT:
+        _user_ids.clear()
+    _user_ids[tg_id] = (time.monotonic(), user_id)
+
+
+def clear_user_id_cache() -> None:
+    _user_ids.clear()
+
+
+def resolve_user_id(db: Session, tg_id: int) -> int | None:
+    """Return the id of the user with ``tg_id`` without loading the row."""
+
+    user_id = _cached_user_id(tg_id)
+    if user_id is not None:
+        return user_id
+    user_id = db.query(models.User.id).filter_by(tg_id=tg_id).scalar()
+    if user_id is not None:
+        _remember_user_id(tg_id, user_id)
+    return user_id
+
+
+def get_by_tg_id(db: Session, tg_id: int) -> models.User | None:
+    user_id = _cached_user_id(tg_id)
+    if user_id is not None:
+        user = db.get(models.User, user_id)
+        if user is not None and user.tg_id == tg_id:
+            return user
+        _user_ids.pop(tg_id, None)
+    user = db.query(models.User).filter_by(tg_id=tg_id).first()
+    if user is not None:
+        _remember_user_id(tg_id, user.id)
+    return user
+
+
+def sync_user(
+    db: Session,
+    tg_id: int,
+    *,
+    full_name: str | None = None,
+    age: int | None = None,
+    phone: str | None = None,
+) -> models.User:
+    """Create the user or update the given fields, writing only real changes."""
+
+    user = get_by_tg_id(db, tg_id)
+    created = user is None
+    if user is None:
+        user = models.User(tg_id=tg_id)
+        db.add(user)
+    changed = False
+    for field, value in (("full_name", full_name), ("age", age), ("phone", phone)):
+        if value is not None and getattr(user, field) != value:
+            setattr(user, field, value)
+            changed = True
+    if created or changed:
+        db.commit()
+        db.refresh(user)
+    if created:
+        _remember_user_id(tg_id, user.id)
+    return user
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _search_by_number(db: Session, query: str, limit: int) -> list[models.User]:
+    digits = "".join(char for char in query if char.isdigit())
+    if len(digits) < _MIN_NUMBER_DIGITS:
+        return []
+    conditions = [models.User.phone_normalized == normalize_phone(digits)]
+    if int(digits) <= _MAX_BIGINT:
+        conditions.append(models.User.tg_id == int(digits))
+    return (
+        db.query(models.User)
+        .filter(or_(*conditions))
+        .order_by(models.User.id.asc())
+        .limit(limit)
+        .all()
+    )
+
+
+def _search_by_name(db: Session, query: str, limit: int) -> list[models.User]:
+    full_name = models.User.full_name
+    pattern = f"%{_escape_like(query)}%"
+    if db.get_bind().dialect.name == "postgresql":
+        # Both ILIKE and the ``%`` similarity operator are served by the
+        # pg_trgm GIN index; the latter also tolerates typos.
+        return (
+            db.query(models.User)
+            .filter(or_(full_name.ilike(pattern, escape="\\"), full_name.op("%")(query)))
+            .order_by(func.similarity(full_name, query).desc(), full_name.asc())
+            .limit(limit)
+            .all()
+        )
+    lowered = func.lower(full_name)
+    prefix_first = case(
+        (lowered.like(f"{_escape_like(query.lower())}%", escape="\\"), 0), else_=1
+    )
+    return (
+        db.query(models.User)
+        .filter(lowered.like(pattern.lower(), escape="\\"))
+        .order_by(prefix_first, full_name.asc())
+        .limit(limit)
+        .all()
+    )
+
+
+def search_users(db: Session, query: str, *, limit: int = 10) -> list[models.User]:
+    """Find users by part of the name, or by exact phone number or tg_id.
+
+    Name matches are ranked by trigram similarity on PostgreSQL and by
+    prefix match on other databases.
+    """
+
+    query = query.strip()
+    if not query:
+        return []
+    if _NUMBER_QUERY.fullmatch(query):
+        return _search_by_number(db, query, limit)
+    return _search_by_name(db, query, limit)
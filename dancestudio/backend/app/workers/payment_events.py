@@ -0,0 +1,70 @@
+"""Background worker applying queued payment notifications.
+
+The webhook endpoint only stores the event and calls :func:`notify`; the
+worker wakes up, drains the queue in batches in the threadpool and otherwise
+polls every ``POLL_INTERVAL`` seconds to pick up events left by other
+processes or a previous crash.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+
+from fastapi.concurrency import run_in_threadpool
+
+from ..db.session import SessionLocal
+from ..services import payment_service
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 30.0
+
+_wakeup: asyncio.Event | None = None
+_task: asyncio.Task | None = None
+
+
+def drain() -> int:
+    with SessionLocal() as db:
+        return payment_service.process_webhook_events(db)
+
+
+def notify() -> None:
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+async def _run() -> None:
+    assert _wakeup is not None
+    while True:
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(_wakeup.wait(), POLL_INTERVAL)
+        _wakeup.clear()
+        try:
+            handled = await run_in_threadpool(drain)
+        except Exception:  # pragma: no cover - logged and retried on the next wakeup
+            logger.exception("Failed to process payment events")
+            continue
+        if handled:
+            logger.info("Processed payment events", extra={"events": handled})
+
+
+def start() -> None:
+    global _wakeup, _task
+    if _task is not None and not _task.done():
+        return
+    _wakeup = asyncio.Event()
+    _wakeup.set()
+    _task = asyncio.create_task(_run())
+
+
+async def stop() -> None:
+    global _wakeup, _task
+    if _task is None:
+        return
+    _task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await _task
+    _task = None
+    _wakeup = None
@@ -11,6 +11,14 @@ from ..core.constants import (
 )
 from ..db import models
 from ..db.session import SessionLocal
+from ..config import get_settings
+from ..services import (
+    google_sheets,
+    payment_service,
+    rollup_service,
+    stats_service,
+    subscription_service,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -45,8 +53,7 @@ def cleanup_reserved() -> None:
                 db.query(models.Payment)
                 .filter(
                     and_(
-                        models.Payment.class_slot_id == booking.class_slot_id,
-                        models.Payment.user_id == booking.user_id,
+                        models.Payment.booking_id == booking.id,
                         models.Payment.status == models.PaymentStatus.pending,
                     )
                 )
@@ -59,6 +66,13 @@ def cleanup_reserved() -> None:
         db.commit()
 
 
+async def reconcile_payments() -> None:
+    with SessionLocal() as db:
+        counts = await payment_service.reconcile_pending_payments(db)
+        if counts:
+            logger.info("Reconciled pending payments", extra=counts)
+
+
 def process_waitlist() -> None:
     with SessionLocal() as db:
         notifications = (
@@ -72,9 +86,88 @@ def process_waitlist() -> None:
         db.commit()
 
 
+def refresh_booking_stats() -> None:
+    with SessionLocal() as db:
+        days = stats_service.refresh_daily_stats(db)
+        if days:
+            logger.info("Refreshed booking stats", extra={"days": len(days)})
+
+
+def refresh_direction_rollups() -> None:
+    with SessionLocal() as db:
+        keys = rollup_service.refresh_rollups(db)
+        if keys:
+            logger.info("Refreshed direction rollups", extra={"rows": len(keys)})
+
+
+def expire_subscriptions() -> None:
+    with SessionLocal() as db:
+        expired = subscription_service.expire_subscriptions(db)
+        if expired:
+            logger.info("Expired subscriptions", extra={"subscriptions": expired})
+
+
+def sync_google_sheets() -> None:
+    if not get_settings().google_sheets_enabled:
+        return
+    with SessionLocal() as db:
+        google_sheets.sync_to_sheets(db)
+
+
+def _legacy_jobs() -> set[str]:
+    """Job ids listed in ``SCHEDULER_LEGACY_JOBS``.
+
+    ``send_reminders``, ``cleanup_reserved`` and ``process_waitlist`` predate
+    the scheduler being started by the API and have never run in production,
+    so each of them has to be switched on explicitly.
+    """
+
+    raw = get_settings().scheduler_legacy_jobs
+    return {job_id.strip() for job_id in raw.split(",") if job_id.strip()}
+
+
 def get_scheduler() -> AsyncIOScheduler:
     scheduler = AsyncIOScheduler()
-    scheduler.add_job(send_reminders, "interval", hours=1)
-    scheduler.add_job(cleanup_reserved, "interval", minutes=1)
-    scheduler.add_job(process_waitlist, "interval", minutes=30)
+    legacy_jobs = _legacy_jobs()
+    if "send_reminders" in legacy_jobs:
+        scheduler.add_job(send_reminders, "interval", hours=1, id="send_reminders")
+    if "cleanup_reserved" in legacy_jobs:
+        scheduler.add_job(
+            cleanup_reserved, "interval", minutes=1, id="cleanup_reserved"
+        )
+    scheduler.add_job(
+        reconcile_payments, "interval", minutes=2, id="reconcile_payments"
+    )
+    if "process_waitlist" in legacy_jobs:
+        scheduler.add_job(
+            process_waitlist, "interval", minutes=30, id="process_waitlist"
+        )
+    scheduler.add_job(
+        refresh_booking_stats, "interval", minutes=5, id="refresh_booking_stats"
+    )
+    scheduler.add_job(
+        refresh_direction_rollups, "interval", minutes=5, id="refresh_direction_rollups"
+    )
+    scheduler.add_job(expire_subscriptions, "cron", hour=2, id="expire_subscriptions")
+    scheduler.add_job(sync_google_sheets, "cron", hour=3, id="sync_google_sheets")
     return scheduler
+
+
+_scheduler: AsyncIOScheduler | None = None
+
+
+def start() -> AsyncIOScheduler:
+    """Start the periodic jobs on the running event loop (once per process)."""
+
+    global _scheduler
+    if _scheduler is None or not _scheduler.running:
+        _scheduler = get_scheduler()
+        _scheduler.start()
+    return _scheduler
+
+
+def stop() -> None:
+    global _scheduler
+    if _scheduler is not None and _scheduler.running:
+        _scheduler.shutdown(wait=False)
+    _scheduler = None
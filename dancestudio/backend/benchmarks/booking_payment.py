@@ -0,0 +1,106 @@
+"""Measure commits, statements and time per bot booking that needs a payment.
+
+Runs ``POST /bot/bookings`` against a file-backed SQLite database (so commits
+really hit the disk) with the stub payment provider::
+
+    python -m benchmarks.booking_payment --bookings 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes import bot
+from app.config import get_settings
+from app.db import models
+from app.db.session import Base, get_db
+
+
+def run(bookings: int) -> dict[str, float]:
+    os.environ["PAYMENT_PROVIDER"] = "stub"
+    os.environ["BOT_API_TOKEN"] = ""
+    get_settings.cache_clear()
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{directory}/bench.db")
+        Base.metadata.create_all(engine)
+        SessionLocal = sessionmaker(
+            bind=engine, autoflush=False, expire_on_commit=False
+        )
+        with SessionLocal() as db:
+            direction = models.Direction(name="Bench")
+            db.add(direction)
+            db.flush()
+            db.add(
+                models.ClassSlot(
+                    direction_id=direction.id,
+                    starts_at=datetime.now(timezone.utc) + timedelta(days=3),
+                    capacity=bookings,
+                    price_single_visit=500,
+                )
+            )
+            # Users are synced when they open the bot, before they book.
+            db.add_all(models.User(tg_id=1000 + index) for index in range(bookings))
+            db.commit()
+
+        def override_get_db():
+            db = SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app = FastAPI()
+        app.include_router(bot.router, prefix="/api/v1")
+        app.dependency_overrides[get_db] = override_get_db
+
+        counters = {"commits": 0, "statements": 0}
+
+        def count(name: str):
+            def listener(*args) -> None:
+                counters[name] += 1
+
+            return listener
+
+        event.listen(engine, "commit", count("commits"))
+        event.listen(engine, "before_cursor_execute", count("statements"))
+        with TestClient(app) as client:
+            client.post(
+                "/api/v1/bot/bookings",
+                json={"tg_id": 1000 + bookings - 1, "slot_id": 1},
+            )
+            counters.update(commits=0, statements=0)
+            started = time.perf_counter()
+            for index in range(bookings - 1):
+                response = client.post(
+                    "/api/v1/bot/bookings", json={"tg_id": 1000 + index, "slot_id": 1}
+                )
+                response.raise_for_status()
+            elapsed = time.perf_counter() - started
+        engine.dispose()
+    measured = bookings - 1
+    return {
+        "commits_per_booking": counters["commits"] / measured,
+        "statements_per_booking": counters["statements"] / measured,
+        "ms_per_booking": elapsed * 1000 / measured,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bookings", type=int, default=200)
+    args = parser.parse_args()
+    for name, value in run(args.bookings).items():
+        print(f"{name}: {value:.2f}")
+
+
+if __name__ == "__main__":
+    main()
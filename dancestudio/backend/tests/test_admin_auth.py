@@ -0,0 +1,150 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api import deps
+from app.api.routes import auth
+from app.core import security
+from app.db import models
+from app.db.session import Base, get_db
+from app.services import admin as admin_service
+
+
+@pytest.fixture()
+def auth_client():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        future=True,
+    )
+    TestingSessionLocal = sessionmaker(bind=engine, autoflush=False, future=True)
+    Base.metadata.create_all(bind=engine)
+    with TestingSessionLocal() as session:
+        admin_service.ensure_admin_exists(session, "boss", "secret-password")
+    admin_service.clear_principal_cache()
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    test_app = FastAPI()
+    test_app.include_router(auth.router, prefix="/api/v1")
+
+    @test_app.get("/api/v1/protected")
+    def protected(admin=Depends(deps.require_roles("admin"))):
+        return {"login": admin.login}
+
+    test_app.dependency_overrides[get_db] = override_get_db
+    statements: list[str] = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    with TestClient(test_app) as client:
+        response = client.post(
+            "/api/v1/auth/login",
+            data={"username": "boss", "password": "secret-password"},
+        )
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        yield client, TestingSessionLocal, headers, statements
+    admin_service.clear_principal_cache()
+
+
+def _admin(session):
+    return session.query(models.AdminUser).filter_by(login="boss").one()
+
+
+def test_repeated_requests_are_authorised_from_the_cache(auth_client):
+    client, _, headers, statements = auth_client
+
+    assert client.get("/api/v1/protected", headers=headers).status_code == 200
+    statements.clear()
+    for _ in range(5):
+        response = client.get("/api/v1/protected", headers=headers)
+        assert response.json() == {"login": "boss"}
+
+    assert statements == []
+
+
+def test_role_change_applies_to_cached_principal(auth_client):
+    client, SessionLocal, headers, _ = auth_client
+    assert client.get("/api/v1/protected", headers=headers).status_code == 200
+
+    with SessionLocal() as session:
+        _admin(session).role = models.AdminRole.viewer
+        session.commit()
+
+    assert client.get("/api/v1/protected", headers=headers).status_code == 403
+
+
+def test_revoked_and_disabled_admins_are_rejected(auth_client):
+    client, SessionLocal, headers, _ = auth_client
+    assert client.get("/api/v1/protected", headers=headers).status_code == 200
+
+    with SessionLocal() as session:
+        admin_service.revoke_tokens(session, _admin(session))
+    assert client.get("/api/v1/protected", headers=headers).status_code == 401
+
+    relogin = client.post(
+        "/api/v1/auth/login", data={"username": "boss", "password": "secret-password"}
+    )
+    fresh = {"Authorization": f"Bearer {relogin.json()['access_token']}"}
+    assert client.get("/api/v1/protected", headers=fresh).status_code == 200
+
+    with SessionLocal() as session:
+        admin_service.set_active(session, _admin(session), False)
+    assert client.get("/api/v1/protected", headers=fresh).status_code == 401
+    assert (
+        client.post(
+            "/api/v1/auth/login",
+            data={"username": "boss", "password": "secret-password"},
+        ).status_code
+        == 403
+    )
+
+
+def test_admin_endpoints_deactivate_and_log_out(auth_client):
+    client, SessionLocal, headers, _ = auth_client
+    with SessionLocal() as session:
+        manager = models.AdminUser(
+            login="manager",
+            password_hash=security.get_password_hash("manager-password"),
+            role=models.AdminRole.admin,
+        )
+        session.add(manager)
+        session.commit()
+        manager_id = manager.id
+    login = client.post(
+        "/api/v1/auth/login",
+        data={"username": "manager", "password": "manager-password"},
+    )
+    manager_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    assert client.get("/api/v1/protected", headers=manager_headers).status_code == 200
+
+    logout = client.post(
+        f"/api/v1/auth/admins/{manager_id}/logout-all", headers=headers
+    )
+    assert logout.status_code == 204
+    assert client.get("/api/v1/protected", headers=manager_headers).status_code == 401
+
+    deactivated = client.post(
+        f"/api/v1/auth/admins/{manager_id}/deactivate", headers=headers
+    )
+    assert deactivated.json()["is_active"] is False
+    relogin = client.post(
+        "/api/v1/auth/login",
+        data={"username": "manager", "password": "manager-password"},
+    )
+    assert relogin.status_code == 403
+
+    assert client.post("/api/v1/auth/logout-all", headers=headers).status_code == 204
+    assert client.get("/api/v1/protected", headers=headers).status_code == 401
@@ -136,3 +136,29 @@ def test_upload_addresses_media_standard_form(settings_api_client):
     assert saved_asset.content_type == "image/jpeg"
     assert (media_root / saved_asset.file_path).exists()
     db.close()
+
+
+def test_addresses_media_exposes_content_version(settings_api_client):
+    client, SessionLocal, _ = settings_api_client
+
+    first = client.post(
+        "/api/v1/settings/addresses/media",
+        files={"files": ("a.jpg", b"FIRST", "image/jpeg")},
+    ).json()[0]
+    second = client.post(
+        "/api/v1/settings/addresses/media",
+        files={"files": ("a.jpg", b"SECOND", "image/jpeg")},
+    ).json()[0]
+
+    assert first["version"]
+    assert first["version"] != second["version"]
+
+    db = SessionLocal()
+    asset = db.get(models.SettingMedia, first["id"])
+    assert first["version"] == Path(asset.file_path).stem
+    db.close()
+
+    response = client.get("/api/v1/settings/addresses")
+    assert response.status_code == 200
+    versions = {item["id"]: item["version"] for item in response.json()["media"]}
+    assert versions == {first["id"]: first["version"], second["id"]: second["version"]}
@@ -11,8 +11,10 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from app.api import deps
 from app.db import models
 from app.db.session import Base, get_db
+from app.services import rollup_service, stats_service
 
 
 @pytest.fixture()
@@ -65,6 +67,9 @@ def slots_api_client():
     test_app = FastAPI()
     test_app.include_router(slots_router, prefix="/api/v1")
     test_app.dependency_overrides[get_db] = override_get_db
+    test_app.dependency_overrides[deps.get_current_admin] = lambda: models.AdminUser(
+        id=1, login="admin", role="admin"
+    )
 
     with TestClient(test_app) as client:
         yield client, TestingSessionLocal
@@ -106,3 +111,50 @@ def test_slots_without_direction_are_skipped(slots_api_client):
     assert len(slots) == 1
     assert slots[0]["id"] == valid_slot.id
     assert slots[0]["direction_id"] == direction.id
+
+
+def test_moving_a_slot_refreshes_both_days_and_directions(slots_api_client):
+    client, SessionLocal = slots_api_client
+    db = SessionLocal()
+    direction = models.Direction(name="Vogue")
+    other_direction = models.Direction(name="Waacking")
+    user = models.User(tg_id=6060)
+    db.add_all([direction, other_direction, user])
+    db.flush()
+    old_start = datetime.now(timezone.utc).replace(hour=12) - timedelta(days=3)
+    new_start = old_start + timedelta(days=1)
+    slot = models.ClassSlot(
+        direction_id=direction.id,
+        starts_at=old_start,
+        duration_min=60,
+        capacity=10,
+        price_single_visit=500,
+    )
+    db.add(slot)
+    db.flush()
+    db.add(
+        models.Booking(
+            user_id=user.id, class_slot_id=slot.id, status=models.BookingStatus.attended
+        )
+    )
+    db.commit()
+    stats_service.refresh_daily_stats(db)
+    rollup_service.refresh_rollups(db)
+    db.close()
+
+    response = client.patch(
+        f"/api/v1/slots/{slot.id}",
+        json={"starts_at": new_start.isoformat(), "direction_id": other_direction.id},
+    )
+
+    assert response.status_code == 200
+    with SessionLocal() as db:
+        days = {
+            row.day: row.attended for row in db.query(models.BookingDailyStats)
+        }
+        rollups = {
+            (row.day, row.direction_id): (row.slots, row.attended)
+            for row in db.query(models.DirectionDailyRollup)
+        }
+    assert days == {new_start.date(): 1}
+    assert rollups == {(new_start.date(), other_direction.id): (1, 1)}
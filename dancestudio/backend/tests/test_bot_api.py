@@ -8,7 +8,7 @@ from pathlib import Path
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -16,12 +16,14 @@ from app.config import get_settings
 from app.core.constants import RESERVATION_PAYMENT_TIMEOUT
 from app.db import models
 from app.db.session import Base, get_db
+from app.services import user_service
 
 
 @pytest.fixture()
 def bot_api_client(monkeypatch):
     monkeypatch.setenv("BOT_API_TOKEN", "bot-secret")
     get_settings.cache_clear()
+    user_service.clear_user_id_cache()
 
     engine = create_engine(
         "sqlite+pysqlite:///:memory:",
@@ -92,6 +94,44 @@ def test_sync_user_creates_user(bot_api_client):
     db.close()
 
 
+def test_sync_user_skips_unchanged_writes(bot_api_client):
+    client, SessionLocal = bot_api_client
+    headers = {"X-Bot-Token": "bot-secret"}
+    client.post(
+        "/api/v1/bot/users/sync",
+        json={"tg_id": 321, "full_name": "Same Name", "age": 30},
+        headers=headers,
+    )
+    engine = SessionLocal.kw["bind"]
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.post(
+            "/api/v1/bot/users/sync",
+            json={"tg_id": 321, "full_name": "Same Name"},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        assert not [sql for sql in statements if sql.lstrip().upper().startswith("UPDATE")]
+
+        client.post(
+            "/api/v1/bot/users/sync",
+            json={"tg_id": 321, "full_name": "New Name"},
+            headers=headers,
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert len([sql for sql in statements if sql.lstrip().upper().startswith("UPDATE")]) == 1
+    db = SessionLocal()
+    assert db.query(models.User).filter_by(tg_id=321).one().full_name == "New Name"
+    db.close()
+
+
 def test_create_booking_creates_payment(bot_api_client):
     client, SessionLocal = bot_api_client
     db = SessionLocal()
@@ -132,6 +172,45 @@ def test_create_booking_creates_payment(bot_api_client):
     db.close()
 
 
+def test_booking_with_payment_commits_twice(bot_api_client):
+    client, SessionLocal = bot_api_client
+    db = SessionLocal()
+    direction = models.Direction(name="Jazz-Funk")
+    db.add(direction)
+    db.flush()
+    slot = models.ClassSlot(
+        direction_id=direction.id,
+        starts_at=datetime.now(timezone.utc) + timedelta(days=2),
+        capacity=5,
+        price_single_visit=700,
+    )
+    db.add_all([slot, models.User(tg_id=457)])
+    db.commit()
+    slot_id = slot.id
+    db.close()
+
+    engine = SessionLocal.kw["bind"]
+    commits: list[object] = []
+
+    def record(conn):
+        commits.append(conn)
+
+    event.listen(engine, "commit", record)
+    try:
+        response = client.post(
+            "/api/v1/bot/bookings",
+            json={"tg_id": 457, "slot_id": slot_id},
+            headers={"X-Bot-Token": "bot-secret"},
+        )
+    finally:
+        event.remove(engine, "commit", record)
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "confirmed"
+    # Booking and pending payment go in together, then the provider's answer.
+    assert len(commits) == 2
+
+
 def test_list_bookings_returns_upcoming(bot_api_client):
     client, SessionLocal = bot_api_client
     db = SessionLocal()
@@ -169,6 +248,82 @@ def test_list_bookings_returns_upcoming(bot_api_client):
     assert data[0]["slot"]["direction_name"] == "Jazz"
 
 
+def _seed_paid_bookings(SessionLocal, tg_id: int, count: int) -> None:
+    db = SessionLocal()
+    direction = models.Direction(name=f"Direction {tg_id}")
+    user = models.User(tg_id=tg_id)
+    db.add_all([direction, user])
+    db.commit()
+    now = datetime.now(timezone.utc)
+    for index in range(count):
+        slot = models.ClassSlot(
+            direction_id=direction.id,
+            starts_at=now + timedelta(days=1, hours=index),
+            duration_min=60,
+            capacity=5,
+            price_single_visit=Decimal("500.00"),
+        )
+        db.add(slot)
+        db.flush()
+        booking = models.Booking(
+            user_id=user.id,
+            class_slot_id=slot.id,
+            status=models.BookingStatus.reserved,
+        )
+        db.add(booking)
+        for attempt, payment_status in enumerate(
+            (models.PaymentStatus.canceled, models.PaymentStatus.pending)
+        ):
+            db.add(
+                models.Payment(
+                    user_id=user.id,
+                    class_slot_id=slot.id,
+                    booking=booking,
+                    amount=Decimal("500.00"),
+                    currency="RUB",
+                    provider=models.PaymentProvider.stub,
+                    order_id=f"order-{tg_id}-{index}-{attempt}",
+                    status=payment_status,
+                    purpose=models.PaymentPurpose.single_visit,
+                    confirmation_url=f"http://example.com/pay/{index}/{attempt}",
+                    created_at=now - timedelta(minutes=10 - attempt),
+                )
+            )
+    db.commit()
+    db.close()
+
+
+def test_list_bookings_uses_constant_number_of_queries(bot_api_client):
+    client, SessionLocal = bot_api_client
+    _seed_paid_bookings(SessionLocal, 7001, 1)
+    _seed_paid_bookings(SessionLocal, 7050, 50)
+    engine = SessionLocal.kw["bind"]
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    query_counts: list[int] = []
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        for tg_id, expected in ((7001, 1), (7050, 50)):
+            statements.clear()
+            response = client.get(
+                f"/api/v1/bot/users/{tg_id}/bookings",
+                headers={"X-Bot-Token": "bot-secret"},
+            )
+            assert response.status_code == 200
+            data = response.json()
+            assert len(data) == expected
+            assert all(item["payment_status"] == "pending" for item in data)
+            assert data[-1]["payment_url"] == f"http://example.com/pay/{expected - 1}/1"
+            query_counts.append(len(statements))
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert query_counts[0] == query_counts[1]
+
+
 def test_pending_booking_exposes_payment_link(bot_api_client):
     client, SessionLocal = bot_api_client
     db = SessionLocal()
@@ -199,6 +354,7 @@ def test_pending_booking_exposes_payment_link(bot_api_client):
     payment = models.Payment(
         user_id=user.id,
         class_slot_id=slot.id,
+        booking_id=booking.id,
         amount=Decimal("900.00"),
         currency="RUB",
         provider=models.PaymentProvider.stub,
@@ -406,3 +562,61 @@ def test_bot_token_required(bot_api_client):
         json={"tg_id": 1},
     )
     assert response.status_code == 401
+
+
+def test_batch_runs_calls_in_order(bot_api_client):
+    client, SessionLocal = bot_api_client
+    db = SessionLocal()
+    direction = models.Direction(name="Contemporary")
+    db.add(direction)
+    db.commit()
+    slot = models.ClassSlot(
+        direction_id=direction.id,
+        starts_at=datetime.now(timezone.utc) + timedelta(days=1),
+        duration_min=60,
+        capacity=4,
+        price_single_visit=600,
+    )
+    user = models.User(tg_id=4242)
+    db.add_all([slot, user])
+    db.commit()
+    db.add(
+        models.Booking(
+            user_id=user.id,
+            class_slot_id=slot.id,
+            status=models.BookingStatus.confirmed,
+        )
+    )
+    db.commit()
+    db.close()
+
+    response = client.post(
+        "/api/v1/bot/batch",
+        json={
+            "calls": [
+                {"op": "sync_user", "args": {"tg_id": 4242, "full_name": "Batch User"}},
+                {"op": "bookings", "args": {"tg_id": 4242}},
+                {"op": "subscriptions", "args": {"tg_id": 4242}},
+                {"op": "bookings", "args": {}},
+            ]
+        },
+        headers={"X-Bot-Token": "bot-secret"},
+    )
+
+    assert response.status_code == 200
+    sync, bookings, subscriptions, invalid = response.json()
+    assert sync["status"] == 200 and sync["body"]["full_name"] == "Batch User"
+    assert bookings["status"] == 200
+    assert [item["slot"]["direction_name"] for item in bookings["body"]] == ["Contemporary"]
+    assert subscriptions == {"status": 200, "body": []}
+    assert invalid["status"] == 422
+
+
+def test_batch_rejects_unknown_operations(bot_api_client):
+    client, _ = bot_api_client
+    response = client.post(
+        "/api/v1/bot/batch",
+        json={"calls": [{"op": "drop_tables"}]},
+        headers={"X-Bot-Token": "bot-secret"},
+    )
+    assert response.status_code == 422
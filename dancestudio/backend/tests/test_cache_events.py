@@ -0,0 +1,104 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import models
+from app.db.session import Base
+from app.services import booking_service, cache_events
+
+
+@pytest.fixture()
+def events_session():
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    Base.metadata.create_all(bind=engine)
+    cache_events.install(SessionLocal)
+    published: list[list[dict]] = []
+    cache_events.set_publisher(published.append)
+    session = SessionLocal()
+    try:
+        yield session, published
+    finally:
+        session.close()
+        cache_events.flush()
+        cache_events.set_publisher(None)
+
+
+def test_admin_edits_publish_events_after_commit(events_session):
+    session, published = events_session
+    direction = models.Direction(name="Jazz")
+    session.add(direction)
+    session.flush()
+    cache_events.flush()
+    assert published == []
+
+    session.commit()
+    cache_events.flush()
+    assert published == [[{"kind": "directions", "id": direction.id}]]
+
+    slot = models.ClassSlot(
+        direction_id=direction.id,
+        starts_at=datetime.now(timezone.utc) + timedelta(days=1),
+        capacity=5,
+        price_single_visit=500,
+    )
+    session.add(slot)
+    session.commit()
+    cache_events.flush()
+    assert published[-1] == [{"kind": "slots", "id": slot.id, "direction_id": direction.id}]
+
+
+def test_rolled_back_changes_are_not_published(events_session):
+    session, published = events_session
+    session.add(
+        models.Product(type=models.ProductType.subscription, name="8 classes", price=4000)
+    )
+    session.flush()
+    session.rollback()
+
+    cache_events.flush()
+    assert published == []
+
+
+def test_booking_publishes_availability_change(events_session):
+    session, published = events_session
+    direction = models.Direction(name="Hip-Hop")
+    user = models.User(tg_id=1)
+    session.add_all([direction, user])
+    session.commit()
+    slot = models.ClassSlot(
+        direction_id=direction.id,
+        starts_at=datetime.now(timezone.utc) + timedelta(days=2),
+        capacity=3,
+        price_single_visit=500,
+    )
+    session.add(slot)
+    session.commit()
+    cache_events.flush()
+    published.clear()
+
+    booking_service.book_class(session, user, slot)
+    cache_events.flush()
+
+    flattened = [event for batch in published for event in batch]
+    assert {"kind": "slots", "id": slot.id, "direction_id": direction.id} in flattened
+
+
+def test_publishing_does_not_wait_for_the_transport(events_session):
+    session, published = events_session
+    release = threading.Event()
+    cache_events.set_publisher(lambda events: release.wait(5) and published.append(events))
+
+    session.add(models.Direction(name="Salsa"))
+    started = time.monotonic()
+    session.commit()
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 1
+    release.set()
+    cache_events.flush()
+    assert published and published[0][0]["kind"] == "directions"
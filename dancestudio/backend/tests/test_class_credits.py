@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, timezone
+
+from app.db import models
+from app.services import booking_service, subscription_service
+
+
+def _user_with_subscription(db, classes: int, *, valid_days: int = 30):
+    direction = models.Direction(name="Heels")
+    user = models.User(tg_id=8080)
+    product = models.Product(
+        type=models.ProductType.subscription, name="Абонемент", price=4000
+    )
+    db.add_all([direction, user, product])
+    db.flush()
+    now = datetime.now(timezone.utc)
+    subscription = models.Subscription(
+        user_id=user.id,
+        product_id=product.id,
+        valid_from=now - timedelta(days=1),
+        valid_to=now + timedelta(days=valid_days),
+    )
+    subscription_service.open_balance(db, subscription, classes)
+    slot = models.ClassSlot(
+        direction_id=direction.id,
+        starts_at=now + timedelta(days=2),
+        capacity=5,
+        price_single_visit=500,
+    )
+    db.add(slot)
+    db.commit()
+    return user, subscription, slot
+
+
+def test_booking_and_cancellation_are_recorded_in_the_ledger(db_session):
+    user, subscription, slot = _user_with_subscription(db_session, 2)
+
+    booking = booking_service.book_class(db_session, user, slot)
+    db_session.commit()
+    assert booking.status == models.BookingStatus.confirmed
+    assert subscription.remaining_classes == 1
+
+    booking_service.cancel_booking(db_session, booking, actor="user")
+
+    history = subscription_service.credit_history(db_session, user.id)
+    assert [(entry.kind, entry.delta, entry.balance_after) for entry in history] == [
+        (models.ClassCreditKind.refund, 1, 2),
+        (models.ClassCreditKind.consume, -1, 1),
+        (models.ClassCreditKind.grant, 2, 2),
+    ]
+    assert history[0].booking_id == booking.id == history[1].booking_id
+    db_session.refresh(subscription)
+    assert subscription.remaining_classes == history[0].balance_after
+
+
+def test_balance_never_goes_below_zero(db_session):
+    user, subscription, slot = _user_with_subscription(db_session, 0)
+
+    consumed = subscription_service.change_balance(
+        db_session, subscription, models.ClassCreditKind.consume, -1
+    )
+
+    assert consumed is None
+    assert subscription.remaining_classes == 0
+    booking = booking_service.book_class(db_session, user, slot)
+    assert booking.status == models.BookingStatus.reserved
+
+
+def test_expired_subscriptions_write_off_remaining_classes(db_session):
+    user, subscription, _ = _user_with_subscription(db_session, 3, valid_days=-1)
+
+    assert subscription_service.expire_subscriptions(db_session) == 1
+
+    db_session.refresh(subscription)
+    assert subscription.status == models.SubscriptionStatus.expired
+    assert subscription.remaining_classes == 0
+    latest = subscription_service.credit_history(db_session, user.id, limit=1)[0]
+    assert (latest.kind, latest.delta, latest.balance_after) == (
+        models.ClassCreditKind.expire,
+        -3,
+        0,
+    )
@@ -0,0 +1,163 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api import deps
+from app.api.routes import export as export_routes
+from app.db import models
+from app.db.session import Base, get_db
+from app.services import export_service
+
+
+def _seed(session):
+    direction = models.Direction(name="Jazz")
+    users = [models.User(tg_id=700 + index, full_name=f"Ученик {index}") for index in range(5)]
+    session.add_all([direction, *users])
+    session.flush()
+    slots = [
+        models.ClassSlot(
+            direction_id=direction.id,
+            starts_at=datetime(2024, month, 10, 18, tzinfo=timezone.utc),
+            duration_min=60,
+            capacity=10,
+            price_single_visit=Decimal("500.00"),
+        )
+        for month in (1, 2, 3)
+    ]
+    session.add_all(slots)
+    session.flush()
+    for index, user in enumerate(users):
+        for slot in slots:
+            session.add(
+                models.Booking(
+                    user_id=user.id,
+                    class_slot_id=slot.id,
+                    status=(
+                        models.BookingStatus.attended
+                        if index % 2
+                        else models.BookingStatus.no_show
+                    ),
+                )
+            )
+    session.commit()
+
+
+def _read(chunks):
+    return b"".join(chunks).decode("utf-8")
+
+
+def test_csv_export_streams_filtered_rows_in_chunks(db_session):
+    _seed(db_session)
+    filters = export_service.ExportFilters(
+        date_from=datetime(2024, 2, 1).date(),
+        date_to=datetime(2024, 3, 10).date(),
+        status="attended",
+    )
+
+    chunks = list(
+        export_service.stream_export(db_session, "bookings", "csv", filters, chunk_size=1)
+    )
+    rows = list(csv.DictReader(io.StringIO(_read(chunks))))
+
+    assert len(chunks) == 4
+    assert len(rows) == 4
+    assert {row["status"] for row in rows} == {"attended"}
+    assert {row["starts_at"][:7] for row in rows} == {"2024-02", "2024-03"}
+    assert rows[0]["direction"] == "Jazz"
+
+
+def test_ndjson_export_and_empty_csv_header(db_session):
+    _seed(db_session)
+
+    lines = _read(export_service.stream_export(db_session, "users", "ndjson")).splitlines()
+    empty = _read(
+        export_service.stream_export(
+            db_session,
+            "payments",
+            "csv",
+            export_service.ExportFilters(status="paid"),
+        )
+    )
+
+    assert [json.loads(line)["tg_id"] for line in lines] == [700, 701, 702, 703, 704]
+    assert json.loads(lines[0])["full_name"] == "Ученик 0"
+    assert empty.splitlines()[0].startswith("id,user_id,order_id")
+    assert len(empty.splitlines()) == 1
+
+
+@pytest.mark.parametrize(
+    ("dataset", "filters"),
+    [
+        ("users", export_service.ExportFilters(status="paid")),
+        ("bookings", export_service.ExportFilters(status="unknown")),
+        (
+            "payments",
+            export_service.ExportFilters(
+                date_from=datetime(2024, 2, 1).date(), date_to=datetime(2024, 1, 1).date()
+            ),
+        ),
+    ],
+)
+def test_invalid_filters_fail_before_streaming(db_session, dataset, filters):
+    with pytest.raises(export_service.ExportError):
+        export_service.stream_export(db_session, dataset, "csv", filters)
+
+
+def test_export_endpoint_streams_attachment():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        future=True,
+    )
+    TestingSessionLocal = sessionmaker(bind=engine, autoflush=False, future=True)
+    Base.metadata.create_all(bind=engine)
+    with TestingSessionLocal() as session:
+        _seed(session)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    test_app = FastAPI()
+    test_app.include_router(export_routes.router, prefix="/api/v1")
+    test_app.dependency_overrides[get_db] = override_get_db
+    test_app.dependency_overrides[deps.get_current_admin] = lambda: models.AdminUser(
+        id=1, login="admin", role="admin"
+    )
+
+    with TestClient(test_app) as client:
+        response = client.get(
+            "/api/v1/export/bookings", params={"format": "ndjson", "status": "no_show"}
+        )
+        invalid = client.get("/api/v1/export/users", params={"status": "paid"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert 'filename="bookings.ndjson"' in response.headers["content-disposition"]
+    assert len(response.text.splitlines()) == 9
+    assert invalid.status_code == 400
+
+
+def test_parquet_export_writes_a_row_group_per_chunk(db_session):
+    pq = pytest.importorskip("pyarrow.parquet")
+    _seed(db_session)
+
+    chunks = list(export_service.stream_export(db_session, "bookings", "parquet", chunk_size=6))
+    parquet_file = pq.ParquetFile(io.BytesIO(b"".join(chunks)))
+
+    assert parquet_file.metadata.num_rows == 15
+    assert parquet_file.num_row_groups == 3
+    assert parquet_file.read().column("status").to_pylist()[:2] == ["no_show", "no_show"]
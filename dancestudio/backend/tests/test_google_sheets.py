@@ -0,0 +1,171 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.api import deps
+from app.api.routes import misc
+from app.config import get_settings
+from app.db import models
+from app.services import google_sheets
+
+
+def _seed(db_session, bookings_count):
+    long_ago = datetime.now(timezone.utc) - timedelta(days=30)
+    direction = models.Direction(name="Contemporary")
+    db_session.add(direction)
+    db_session.flush()
+    slot = models.ClassSlot(
+        direction_id=direction.id,
+        starts_at=datetime(2024, 5, 1, 18, tzinfo=timezone.utc),
+        capacity=bookings_count,
+        price_single_visit=Decimal("500.00"),
+    )
+    users = [models.User(tg_id=5000 + index) for index in range(bookings_count)]
+    db_session.add_all([slot, *users])
+    db_session.flush()
+    bookings = [
+        models.Booking(
+            user_id=user.id,
+            class_slot_id=slot.id,
+            status=models.BookingStatus.confirmed,
+            updated_at=long_ago,
+        )
+        for user in users
+    ]
+    db_session.add_all(bookings)
+    db_session.commit()
+    return bookings
+
+
+def test_full_sync_writes_rows_in_batches(db_session):
+    _seed(db_session, 25)
+    client = google_sheets.LocalSheetsClient()
+
+    result = google_sheets.sync_dataset(db_session, client, "bookings", batch_size=10)
+
+    sheet = client.sheets["bookings"]
+    assert sheet[0][:3] == ["id", "user_id", "user_tg_id"]
+    assert len(sheet) == 26
+    assert sheet[1][7] == "confirmed"
+    assert (result.appended, result.updated) == (25, 0)
+    assert client.calls == ["get", "append", "append", "append", "append"]
+    assert result.api_calls == 5
+
+
+def test_incremental_sync_updates_changed_rows_in_place(db_session):
+    bookings = _seed(db_session, 3)
+    client = google_sheets.LocalSheetsClient()
+    google_sheets.sync_dataset(db_session, client, "bookings")
+
+    now = datetime.now(timezone.utc)
+    setting = db_session.get(models.Setting, "google_sheets_watermark:bookings")
+    setting.value = (now - timedelta(hours=1)).isoformat()
+    bookings[1].status = models.BookingStatus.attended
+    bookings[1].updated_at = now
+    db_session.commit()
+    client.calls.clear()
+
+    result = google_sheets.sync_dataset(db_session, client, "bookings")
+
+    assert (result.appended, result.updated) == (0, 1)
+    assert client.calls == ["get", "batch_update"]
+    assert [row[7] for row in client.sheets["bookings"][1:]] == [
+        "confirmed",
+        "attended",
+        "confirmed",
+    ]
+
+
+class _QuotaLimitedClient(google_sheets.LocalSheetsClient):
+    def __init__(self, failures, status=429):
+        super().__init__()
+        self.failures = failures
+        self.status = status
+
+    def append(self, range_, rows):
+        if self.failures:
+            self.failures -= 1
+            raise google_sheets.SheetsApiError(self.status)
+        super().append(range_, rows)
+
+
+def test_quota_errors_are_retried_with_backoff(db_session):
+    _seed(db_session, 2)
+    client = _QuotaLimitedClient(failures=2)
+    delays = []
+
+    result = google_sheets.sync_dataset(
+        db_session, client, "users", sleep=delays.append
+    )
+
+    assert len(client.sheets["users"]) == 3
+    assert len(delays) == 2
+    assert 1 <= delays[0] < 2 <= delays[1] < 3
+    assert result.api_calls == 5
+
+
+def test_other_errors_fail_without_moving_the_watermark(db_session):
+    _seed(db_session, 1)
+    client = _QuotaLimitedClient(failures=1, status=403)
+
+    with pytest.raises(google_sheets.SheetsApiError):
+        google_sheets.sync_dataset(db_session, client, "users", sleep=lambda _: None)
+
+    assert db_session.get(models.Setting, "google_sheets_watermark:users") is None
+
+
+@pytest.fixture()
+def export_client(db_session, monkeypatch):
+    monkeypatch.setenv("GOOGLE_SHEETS_ENABLED", "true")
+    monkeypatch.setattr(
+        google_sheets, "SessionLocal", sessionmaker(bind=db_session.get_bind())
+    )
+    monkeypatch.setattr(google_sheets, "_local_client", None)
+    test_app = FastAPI()
+    test_app.include_router(misc.router, prefix="/api/v1")
+    test_app.dependency_overrides[deps.get_current_admin] = lambda: models.AdminUser(
+        id=1, login="admin", role="admin"
+    )
+    get_settings.cache_clear()
+    with TestClient(test_app) as client:
+        yield client
+    get_settings.cache_clear()
+
+
+def test_export_endpoint_queues_the_sync(export_client, db_session, monkeypatch):
+    _seed(db_session, 2)
+    monkeypatch.setenv("GOOGLE_SHEETS_CLIENT", "local")
+    get_settings.cache_clear()
+
+    response = export_client.post(
+        "/api/v1/export/google-sheets", json={"datasets": ["users"]}
+    )
+
+    assert response.status_code == 202
+    assert response.json()["datasets"] == ["users"]
+    # TestClient runs background tasks before returning the response.
+    assert len(google_sheets._local_client.sheets["users"]) == 3
+
+
+@pytest.mark.parametrize(
+    "env",
+    [
+        {"GOOGLE_SHEETS_CLIENT": "local", "ENV": "prod"},
+        {"GOOGLE_SHEETS_CLIENT": "google", "GOOGLE_SHEETS_SPREADSHEET_ID": ""},
+    ],
+)
+def test_export_refuses_to_sync_into_memory_by_accident(
+    export_client, monkeypatch, env
+):
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    get_settings.cache_clear()
+
+    response = export_client.post("/api/v1/export/google-sheets", json={})
+
+    assert response.status_code == 503
+    assert google_sheets._local_client is None
@@ -0,0 +1,180 @@
+import hashlib
+import hmac
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.routes import payments
+from app.config import get_settings
+from app.db import models
+from app.db.session import Base, get_db
+from app.services import booking_service, payment_service
+from app.services.payments.yookassa import YooKassaGateway
+
+
+def _reserved_booking(db):
+    direction = models.Direction(name="Vogue")
+    user = models.User(tg_id=3030)
+    db.add_all([direction, user])
+    db.flush()
+    slot = models.ClassSlot(
+        direction_id=direction.id,
+        starts_at=datetime.now(timezone.utc) + timedelta(days=2),
+        capacity=3,
+        price_single_visit=600,
+    )
+    db.add(slot)
+    db.commit()
+    booking = booking_service.book_class(db, user, slot)
+    payment = models.Payment(
+        user_id=user.id,
+        class_slot_id=slot.id,
+        booking=booking,
+        amount=600,
+        provider=models.PaymentProvider.yookassa,
+        order_id="order-1",
+        purpose=models.PaymentPurpose.single_visit,
+    )
+    db.add(payment)
+    db.commit()
+    return booking, payment
+
+
+def _event(event_id, order_id="order-1", status="succeeded"):
+    return {"event_id": event_id, "order_id": order_id, "status": status}
+
+
+def test_events_are_deduplicated_and_applied_once(db_session):
+    booking, payment = _reserved_booking(db_session)
+
+    assert payment_service.enqueue_webhook_event(db_session, "stub", _event("e1"), {})
+    assert not payment_service.enqueue_webhook_event(db_session, "stub", _event("e1"), {})
+    payment_service.enqueue_webhook_event(db_session, "stub", _event("e2", "missing"), {})
+
+    assert payment_service.process_webhook_events(db_session, batch_size=1) == 2
+    assert payment_service.process_webhook_events(db_session) == 0
+
+    db_session.refresh(payment)
+    db_session.refresh(booking)
+    assert payment.status == models.PaymentStatus.paid
+    assert booking.status == models.BookingStatus.confirmed
+    events = db_session.query(models.PaymentEvent).order_by(models.PaymentEvent.id).all()
+    assert all(event.processed_at is not None for event in events)
+    assert [event.error for event in events] == [None, "Payment not found"]
+
+
+def test_intermediate_statuses_leave_the_payment_pending(db_session):
+    booking, payment = _reserved_booking(db_session)
+    payment_service.enqueue_webhook_event(
+        db_session, "yookassa", _event("e1", status="waiting_for_capture"), {}
+    )
+
+    assert payment_service.process_webhook_events(db_session) == 1
+
+    db_session.refresh(payment)
+    assert payment.status == models.PaymentStatus.pending
+    assert booking.status == models.BookingStatus.reserved
+    event = db_session.query(models.PaymentEvent).one()
+    assert event.error == "Unknown status 'waiting_for_capture'"
+
+
+def _client():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_db():
+        with SessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(payments.router, prefix="/api/v1")
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as client:
+        yield client, SessionLocal
+    get_settings.cache_clear()
+
+
+@pytest.fixture()
+def webhook_client(monkeypatch):
+    monkeypatch.setenv("PAYMENT_WEBHOOK_SECRET", "hook-secret")
+    monkeypatch.setenv("BOT_API_TOKEN", "bot-secret")
+    get_settings.cache_clear()
+    yield from _client()
+
+
+@pytest.fixture()
+def unconfigured_client(monkeypatch):
+    monkeypatch.delenv("PAYMENT_WEBHOOK_SECRET", raising=False)
+    monkeypatch.delenv("BOT_API_TOKEN", raising=False)
+    get_settings.cache_clear()
+    yield from _client()
+
+
+def _signature(body: bytes) -> str:
+    return hmac.new(b"hook-secret", body, hashlib.sha256).hexdigest()
+
+
+def test_webhook_verifies_and_enqueues(webhook_client):
+    client, SessionLocal = webhook_client
+    body = json.dumps(_event("evt-1")).encode()
+
+    unsigned = client.post("/api/v1/payments/webhook", content=body)
+    assert unsigned.status_code == 401
+
+    for _ in range(2):
+        response = client.post(
+            "/api/v1/payments/webhook",
+            content=body,
+            headers={"X-Webhook-Signature": _signature(body)},
+        )
+        assert response.status_code == 200
+    relayed = client.post(
+        "/api/v1/payments/webhook",
+        json={"order_id": "order-2", "status": "paid"},
+        headers={"X-Bot-Token": "bot-secret"},
+    )
+    assert relayed.status_code == 200
+
+    with SessionLocal() as db:
+        events = db.query(models.PaymentEvent).order_by(models.PaymentEvent.id).all()
+        assert [(event.event_id, event.processed_at) for event in events] == [
+            ("evt-1", None),
+            ("order-2:paid", None),
+        ]
+
+
+def test_webhook_is_rejected_without_configured_credentials(unconfigured_client):
+    client, _ = unconfigured_client
+    body = json.dumps(_event("evt-1")).encode()
+
+    for headers in ({}, {"X-Webhook-Signature": ""}, {"X-Bot-Token": ""}):
+        response = client.post("/api/v1/payments/webhook", content=body, headers=headers)
+        assert response.status_code == 401
+
+
+def test_yookassa_notifications_are_checked_by_sender_address(monkeypatch):
+    monkeypatch.delenv("PAYMENT_WEBHOOK_SECRET", raising=False)
+    monkeypatch.delenv("PAYMENT_WEBHOOK_ALLOWED_IPS", raising=False)
+    get_settings.cache_clear()
+    yookassa = YooKassaGateway(get_settings())
+
+    assert yookassa.verify_webhook(b"{}", {}, "185.71.76.10")
+    assert yookassa.verify_webhook(b"{}", {}, "2a02:5180::1")
+    assert not yookassa.verify_webhook(b"{}", {}, "203.0.113.5")
+    assert not yookassa.verify_webhook(b"{}", {}, None)
+
+    monkeypatch.setenv("PAYMENT_WEBHOOK_ALLOWED_IPS", "203.0.113.0/24")
+    get_settings.cache_clear()
+    assert YooKassaGateway(get_settings()).verify_webhook(b"{}", {}, "203.0.113.5")
+    get_settings.cache_clear()
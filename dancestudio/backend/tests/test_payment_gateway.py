@@ -0,0 +1,149 @@
+import asyncio
+from datetime import timedelta
+
+import httpx
+import pytest
+
+from app.config import get_settings
+from app.db import models
+from app.services import payment_service
+from app.services.payments import gateway, http
+from app.services.payments.fake_provider import FakeYooKassa
+from app.services.payments.yookassa import YooKassaGateway
+
+
+@pytest.fixture()
+def fake_provider(monkeypatch):
+    monkeypatch.setenv("PAYMENT_PROVIDER", "yookassa")
+    monkeypatch.setenv("PAYMENT_API_URL", "http://yookassa.test/v3")
+    monkeypatch.setenv("PAYMENT_MAX_RETRIES", "2")
+    monkeypatch.setattr(YooKassaGateway, "retry_backoff", 0.0)
+    get_settings.cache_clear()
+    provider = FakeYooKassa()
+    http.override_transport("yookassa", httpx.ASGITransport(app=provider.app))
+    yield provider
+    http.override_transport("yookassa", None)
+    get_settings.cache_clear()
+
+
+@pytest.fixture()
+def user(db_session):
+    user = models.User(tg_id=4242)
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def _create_payment(db, user, amount):
+    return asyncio.run(
+        payment_service.create_payment_async(
+            db, user, amount=amount, purpose=models.PaymentPurpose.single_visit
+        )
+    )
+
+
+def test_payment_is_registered_with_idempotence_key(db_session, user, fake_provider):
+    payment, response = _create_payment(db_session, user, 750)
+
+    assert payment.status == models.PaymentStatus.pending
+    assert payment.provider_payment_id == response["provider_payment_id"]
+    assert payment.confirmation_url.endswith(payment.provider_payment_id)
+    assert fake_provider.requests == [("POST", "/v3/payments", payment.order_id)]
+    stored = fake_provider.payments[payment.provider_payment_id]
+    assert stored["amount"] == {"value": "750.00", "currency": "RUB"}
+    assert stored["metadata"]["order_id"] == payment.order_id
+
+
+def test_server_errors_are_retried_with_the_same_key(db_session, user, fake_provider):
+    fake_provider.fail_next(503, 500)
+
+    payment, _ = _create_payment(db_session, user, 500)
+
+    assert [key for _, _, key in fake_provider.requests] == [payment.order_id] * 3
+    assert len(fake_provider.payments) == 1
+    assert payment.status == models.PaymentStatus.pending
+
+
+@pytest.mark.parametrize("statuses", [(503, 503, 503), (400,)])
+def test_gateway_failure_marks_payment_failed(db_session, user, fake_provider, statuses):
+    fake_provider.fail_next(*statuses)
+
+    with pytest.raises(gateway.PaymentGatewayError):
+        _create_payment(db_session, user, 500)
+
+    assert len(fake_provider.requests) == len(statuses)
+    payment = db_session.query(models.Payment).one()
+    assert payment.status == models.PaymentStatus.failed
+
+
+def test_async_creation_reuses_the_pooled_client(db_session, user, fake_provider):
+    async def create_two():
+        first, _ = await payment_service.create_payment_async(
+            db_session, user, amount=500, purpose=models.PaymentPurpose.single_visit
+        )
+        client = http.get_client(
+            "yookassa", base_url="http://yookassa.test/v3", timeout_seconds=1
+        )
+        second, _ = await payment_service.create_payment_async(
+            db_session, user, amount=500, purpose=models.PaymentPurpose.single_visit
+        )
+        same = client is http.get_client(
+            "yookassa", base_url="http://yookassa.test/v3", timeout_seconds=1
+        )
+        await http.aclose_all()
+        return first, second, same
+
+    first, second, same = asyncio.run(create_two())
+
+    assert same
+    assert first.provider_payment_id != second.provider_payment_id
+    assert len(fake_provider.payments) == 2
+
+
+def test_reconciliation_applies_provider_statuses(db_session, user, fake_provider):
+    payments = [_create_payment(db_session, user, 500)[0] for _ in range(4)]
+    fake_provider.set_status(payments[0].provider_payment_id, "succeeded")
+    fake_provider.set_status(payments[1].provider_payment_id, "canceled")
+    fake_provider.set_status(payments[2].provider_payment_id, "waiting_for_capture")
+    # The answer to the create request was lost: only the outbox row is left.
+    lost = payments[3]
+    lost_payment_id = lost.provider_payment_id
+    lost.provider_payment_id = None
+    lost.confirmation_url = None
+    telegram = models.Payment(
+        user_id=user.id,
+        amount=500,
+        provider=models.PaymentProvider.telegram,
+        order_id="telegram-order",
+        purpose=models.PaymentPurpose.single_visit,
+    )
+    db_session.add(telegram)
+    db_session.commit()
+    fake_provider.requests.clear()
+
+    counts = asyncio.run(
+        payment_service.reconcile_pending_payments(
+            db_session, older_than=timedelta(seconds=-60), concurrency=2
+        )
+    )
+
+    assert counts == {"paid": 1, "canceled": 1}
+    checks = [
+        ("GET", f"/v3/payments/{payment.provider_payment_id}", None)
+        for payment in payments[:3]
+    ]
+    assert sorted(fake_provider.requests) == sorted(
+        [*checks, ("POST", "/v3/payments", lost.order_id)]
+    )
+    for payment in [*payments, telegram]:
+        db_session.refresh(payment)
+    assert [payment.status for payment in payments] == [
+        models.PaymentStatus.paid,
+        models.PaymentStatus.canceled,
+        models.PaymentStatus.pending,
+        models.PaymentStatus.pending,
+    ]
+    assert lost.provider_payment_id == lost_payment_id
+    assert lost.confirmation_url.endswith(lost_payment_id)
+    assert telegram.status == models.PaymentStatus.pending
+
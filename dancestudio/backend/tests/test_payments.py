@@ -1,9 +1,15 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
 
+from app.config import get_settings
 from app.db import models
 from app.services import booking_service, payment_service
 
 
+def _create_payment(db, user, **kwargs):
+    return asyncio.run(payment_service.create_payment_async(db, user, **kwargs))
+
+
 def test_auto_subscription_confirmation(db_session):
     direction = models.Direction(name="Contemporary")
     db_session.add(direction)
@@ -45,7 +51,7 @@ def test_payment_webhook_idempotent(db_session):
     db_session.add_all([slot, user])
     db_session.commit()
     booking = booking_service.book_class(db_session, user, slot)
-    payment, _ = payment_service.create_payment(
+    payment, _ = _create_payment(
         db_session,
         user,
         amount=500,
@@ -70,7 +76,7 @@ def test_stub_payment_creates_subscription(db_session):
     db_session.add_all([user, product])
     db_session.commit()
 
-    payment, _ = payment_service.create_payment(
+    payment, _ = _create_payment(
         db_session,
         user,
         amount=float(product.price),
@@ -88,3 +94,38 @@ def test_stub_payment_creates_subscription(db_session):
     )
     assert subscription.remaining_classes == product.classes_count
     assert subscription.valid_to - subscription.valid_from == timedelta(days=product.validity_days)
+
+
+def test_payment_confirms_the_linked_booking(db_session, monkeypatch):
+    monkeypatch.setenv("PAYMENT_PROVIDER", "telegram")
+    get_settings.cache_clear()
+    direction = models.Direction(name="Bachata")
+    user = models.User(tg_id=777)
+    db_session.add_all([direction, user])
+    db_session.flush()
+    slot = models.ClassSlot(
+        direction_id=direction.id,
+        starts_at=datetime.now(timezone.utc) + timedelta(days=2),
+        capacity=2,
+        price_single_visit=500,
+    )
+    db_session.add(slot)
+    db_session.commit()
+    booking = booking_service.book_class(db_session, user, slot)
+    payment, _ = _create_payment(
+        db_session,
+        user,
+        amount=500,
+        purpose=models.PaymentPurpose.single_visit,
+        booking=booking,
+    )
+    get_settings.cache_clear()
+
+    assert payment.booking_id == booking.id
+    assert payment.class_slot_id == slot.id
+    assert booking.status == models.BookingStatus.reserved
+
+    payment_service.apply_payment(db_session, payment, models.PaymentStatus.paid)
+
+    db_session.refresh(booking)
+    assert booking.status == models.BookingStatus.confirmed
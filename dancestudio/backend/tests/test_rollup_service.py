@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from app.db import models
+from app.services import rollup_service
+from app.services.stats_service import utc_day
+
+
+def _slot(db_session, direction, starts_at, capacity=4):
+    slot = models.ClassSlot(
+        direction_id=direction.id,
+        starts_at=starts_at,
+        duration_min=60,
+        capacity=capacity,
+        price_single_visit=Decimal("600.00"),
+    )
+    db_session.add(slot)
+    db_session.flush()
+    return slot
+
+
+def _seed(db_session, now):
+    long_ago = now - timedelta(days=60)
+    jazz = models.Direction(name="Jazz")
+    salsa = models.Direction(name="Salsa")
+    users = [models.User(tg_id=8000 + index) for index in range(4)]
+    db_session.add_all([jazz, salsa, *users])
+    db_session.flush()
+    day_one = now - timedelta(days=2)
+    jazz_slot = _slot(db_session, jazz, day_one)
+    salsa_slot = _slot(db_session, salsa, day_one, capacity=2)
+    jazz_next = _slot(db_session, jazz, now - timedelta(days=1))
+    statuses = {
+        jazz_slot: [
+            models.BookingStatus.attended,
+            models.BookingStatus.no_show,
+            models.BookingStatus.late_cancel,
+            models.BookingStatus.attended,
+        ],
+        salsa_slot: [models.BookingStatus.attended, models.BookingStatus.canceled],
+        jazz_next: [models.BookingStatus.attended],
+    }
+    bookings = {}
+    for slot, slot_statuses in statuses.items():
+        for user, status in zip(users, slot_statuses):
+            bookings[(slot.id, user.id)] = models.Booking(
+                user_id=user.id,
+                class_slot_id=slot.id,
+                status=status,
+                updated_at=long_ago,
+            )
+    db_session.add_all(bookings.values())
+    db_session.add(
+        models.Payment(
+            user_id=users[0].id,
+            class_slot_id=jazz_slot.id,
+            amount=Decimal("600.00"),
+            currency="RUB",
+            provider=models.PaymentProvider.stub,
+            order_id="rollup-1",
+            status=models.PaymentStatus.paid,
+            purpose=models.PaymentPurpose.single_visit,
+            updated_at=long_ago,
+        )
+    )
+    db_session.commit()
+    return jazz, salsa, jazz_slot, bookings
+
+
+def test_report_reads_rollups_per_direction_and_day(db_session):
+    now = datetime.now(timezone.utc)
+    jazz, salsa, _, _ = _seed(db_session, now)
+
+    rollup_service.refresh_rollups(db_session)
+    report = rollup_service.direction_report(
+        db_session, (now - timedelta(days=7)).date(), now.date()
+    )
+
+    assert [(item.direction_name, item.day) for item in report.days] == [
+        ("Jazz", (now - timedelta(days=2)).date()),
+        ("Salsa", (now - timedelta(days=2)).date()),
+        ("Jazz", (now - timedelta(days=1)).date()),
+    ]
+    jazz_day = report.days[0]
+    assert (jazz_day.attended, jazz_day.no_show, jazz_day.late_cancel) == (2, 1, 1)
+    assert jazz_day.fill_rate == 0.75
+    assert jazz_day.revenue == 600.0
+    totals = {item.direction_id: item for item in report.totals}
+    assert totals[jazz.id].slots == 2
+    assert totals[jazz.id].no_show_rate == 0.25
+    assert totals[salsa.id].canceled == 1
+    assert totals[salsa.id].fill_rate == 0.5
+
+
+def test_incremental_refresh_recomputes_only_touched_rows(db_session):
+    now = datetime.now(timezone.utc)
+    jazz, salsa, jazz_slot, bookings = _seed(db_session, now)
+    rollup_service.refresh_rollups(db_session, full=True)
+
+    setting = db_session.get(models.Setting, rollup_service.WATERMARK_KEY)
+    setting.value = (now - timedelta(hours=1)).isoformat()
+    booking = next(
+        item
+        for item in bookings.values()
+        if item.class_slot_id == jazz_slot.id
+        and item.status == models.BookingStatus.no_show
+    )
+    booking.status = models.BookingStatus.attended
+    booking.updated_at = now - timedelta(minutes=30)
+    new_slot = _slot(db_session, salsa, now + timedelta(days=3))
+    db_session.commit()
+
+    touched = rollup_service.refresh_rollups(db_session)
+
+    assert touched == {
+        ((now - timedelta(days=2)).date(), jazz.id),
+        (new_slot.starts_at.date(), salsa.id),
+    }
+    row = db_session.get(
+        models.DirectionDailyRollup, ((now - timedelta(days=2)).date(), jazz.id)
+    )
+    assert (row.attended, row.no_show) == (3, 0)
+    assert db_session.query(models.DirectionDailyRollup).count() == 4
+
+
+def test_canceled_slots_add_no_capacity(db_session):
+    now = datetime.now(timezone.utc)
+    jazz, _, jazz_slot, _ = _seed(db_session, now)
+    jazz_slot.status = models.SlotStatus.canceled
+    db_session.commit()
+
+    rollup_service.refresh_keys(db_session, {(utc_day(jazz_slot.starts_at), jazz.id)})
+
+    row = db_session.get(models.DirectionDailyRollup, (utc_day(jazz_slot.starts_at), jazz.id))
+    assert (row.slots, row.capacity, row.bookings_total) == (0, 0, 4)
+    assert db_session.query(models.DirectionDailyRollup).count() == 1
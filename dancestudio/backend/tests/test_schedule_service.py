@@ -55,6 +55,7 @@ def test_cancel_slot_refunds_subscription_and_creates_notifications(
     payment = models.Payment(
         user_id=another_user.id,
         class_slot_id=slot.id,
+        booking=reserved_booking,
         amount=slot.price_single_visit,
         currency="RUB",
         provider=models.PaymentProvider.stub,
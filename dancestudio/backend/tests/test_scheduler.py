@@ -0,0 +1,147 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import main
+from app.config import get_settings
+from app.db import models
+from app.db.session import Base
+from app.services import google_sheets, payment_service, subscription_service
+from app.workers import payment_events, scheduler
+
+
+@pytest.fixture()
+def session_factory(monkeypatch):
+    monkeypatch.setenv("SCHEDULER_ENABLED", "true")
+    get_settings.cache_clear()
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    monkeypatch.setattr(main, "engine", engine)
+    monkeypatch.setattr(main, "SessionLocal", SessionLocal)
+    monkeypatch.setattr(scheduler, "SessionLocal", SessionLocal)
+    # The payment event worker starts too; keep it off the single shared
+    # connection so its transactions don't interleave with the jobs'.
+    monkeypatch.setattr(payment_events, "drain", lambda: 0)
+    yield SessionLocal
+    get_settings.cache_clear()
+
+
+def _run_job(job_id: str) -> set[str]:
+    """Start the app, fire ``job_id`` right away and wait for it to finish."""
+
+    finished = threading.Event()
+
+    def on_job_event(event) -> None:
+        if event.job_id == job_id:
+            finished.set()
+
+    async def lifecycle() -> set[str]:
+        await main.startup_event()
+        try:
+            running = scheduler._scheduler
+            assert running is not None and running.running
+            running.add_listener(on_job_event, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
+            running.get_job(job_id).modify(next_run_time=datetime.now(timezone.utc))
+            for _ in range(100):
+                if finished.is_set():
+                    break
+                await asyncio.sleep(0.02)
+            return {job.id for job in running.get_jobs()}
+        finally:
+            await main.shutdown_event()
+
+    jobs = asyncio.run(lifecycle())
+    assert finished.is_set()
+    assert scheduler._scheduler is None
+    return jobs
+
+
+def test_scheduler_is_off_by_default(session_factory, monkeypatch):
+    monkeypatch.delenv("SCHEDULER_ENABLED")
+    get_settings.cache_clear()
+
+    async def lifecycle() -> None:
+        await main.startup_event()
+        try:
+            assert scheduler._scheduler is None
+        finally:
+            await main.shutdown_event()
+
+    asyncio.run(lifecycle())
+
+
+def test_legacy_jobs_run_only_when_listed(monkeypatch):
+    legacy = {"send_reminders", "cleanup_reserved", "process_waitlist"}
+    get_settings.cache_clear()
+    default_jobs = {job.id for job in scheduler.get_scheduler().get_jobs()}
+
+    monkeypatch.setenv("SCHEDULER_LEGACY_JOBS", "cleanup_reserved, send_reminders")
+    get_settings.cache_clear()
+    try:
+        listed_jobs = {job.id for job in scheduler.get_scheduler().get_jobs()}
+    finally:
+        get_settings.cache_clear()
+
+    assert not default_jobs & legacy
+    assert listed_jobs - default_jobs == {"cleanup_reserved", "send_reminders"}
+
+
+def test_startup_runs_payment_reconciliation(session_factory, monkeypatch):
+    reconciled = []
+
+    async def fake_reconcile(db):
+        reconciled.append(db)
+        return {}
+
+    monkeypatch.setattr(payment_service, "reconcile_pending_payments", fake_reconcile)
+
+    assert "reconcile_payments" in _run_job("reconcile_payments")
+    assert len(reconciled) == 1
+
+
+def test_startup_runs_nightly_subscription_expiry(session_factory):
+    with session_factory() as db:
+        user = models.User(tg_id=9090)
+        product = models.Product(
+            type=models.ProductType.subscription, name="Абонемент", price=4000
+        )
+        db.add_all([user, product])
+        db.flush()
+        now = datetime.now(timezone.utc)
+        subscription = models.Subscription(
+            user_id=user.id,
+            product_id=product.id,
+            valid_from=now - timedelta(days=31),
+            valid_to=now - timedelta(days=1),
+        )
+        subscription_service.open_balance(db, subscription, 2)
+        db.commit()
+
+    _run_job("expire_subscriptions")
+
+    with session_factory() as db:
+        subscription = db.get(models.Subscription, subscription.id)
+        assert subscription.status == models.SubscriptionStatus.expired
+        assert subscription.remaining_classes == 0
+
+
+def test_startup_runs_nightly_google_sheets_sync(session_factory, monkeypatch):
+    monkeypatch.setenv("GOOGLE_SHEETS_ENABLED", "true")
+    get_settings.cache_clear()
+    synced = []
+    monkeypatch.setattr(google_sheets, "sync_to_sheets", synced.append)
+
+    assert "sync_google_sheets" in _run_job("sync_google_sheets")
+
+    assert len(synced) == 1
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from app.db import models
+from app.services import stats_service
+
+
+def _seed(db_session, now):
+    direction = models.Direction(name="Jazz-Funk")
+    users = [models.User(tg_id=9000 + index) for index in range(4)]
+    db_session.add(direction)
+    db_session.add_all(users)
+    db_session.commit()
+    long_ago = now - timedelta(days=30)
+    statuses_by_day = {
+        -3: [models.BookingStatus.attended, models.BookingStatus.no_show],
+        -1: [models.BookingStatus.attended, models.BookingStatus.canceled],
+        0: [models.BookingStatus.confirmed, models.BookingStatus.reserved],
+        2: [models.BookingStatus.confirmed],
+    }
+    bookings = {}
+    for offset, statuses in statuses_by_day.items():
+        slot = models.ClassSlot(
+            direction_id=direction.id,
+            starts_at=now + timedelta(days=offset) - timedelta(minutes=1),
+            duration_min=60,
+            capacity=10,
+            price_single_visit=Decimal("500.00"),
+        )
+        db_session.add(slot)
+        db_session.flush()
+        for user, status in zip(users, statuses):
+            booking = models.Booking(
+                user_id=user.id,
+                class_slot_id=slot.id,
+                status=status,
+                updated_at=long_ago,
+            )
+            db_session.add(booking)
+            bookings[(offset, user.tg_id)] = booking
+    for offset, amount in ((-2, "700.00"), (-10, "900.00")):
+        db_session.add(
+            models.Payment(
+                user_id=users[0].id,
+                amount=Decimal(amount),
+                currency="RUB",
+                provider=models.PaymentProvider.stub,
+                order_id=f"stats-{offset}",
+                status=models.PaymentStatus.paid,
+                purpose=models.PaymentPurpose.subscription,
+                created_at=now + timedelta(days=offset),
+                updated_at=long_ago,
+            )
+        )
+    db_session.commit()
+    return bookings
+
+
+def test_stats_combine_stored_history_with_live_counters(db_session):
+    now = datetime.now(timezone.utc).replace(hour=12)
+    _seed(db_session, now)
+
+    stats_service.refresh_daily_stats(db_session)
+    stats = stats_service.booking_stats(db_session)
+
+    assert stats["total"] == 7
+    assert stats["confirmed"] == 2
+    assert stats["bookings_today"] == 2
+    assert stats["attendance_rate"] == (2 / 3) * 100
+    assert stats["weekly_revenue"] == 700.0
+    assert db_session.query(models.BookingDailyStats).count() == 6
+
+
+def test_weekly_revenue_is_a_rolling_window(db_session, monkeypatch):
+    now = datetime.now(timezone.utc).replace(hour=12, minute=0)
+    monkeypatch.setattr(stats_service, "_now", lambda: now)
+    user = models.User(tg_id=9100)
+    db_session.add(user)
+    db_session.flush()
+    # Both payments fall on the same calendar day, on either side of now - 7d.
+    for index, shift in enumerate((timedelta(hours=1), -timedelta(hours=1))):
+        db_session.add(
+            models.Payment(
+                user_id=user.id,
+                amount=Decimal("100.00") * (index + 1),
+                currency="RUB",
+                provider=models.PaymentProvider.stub,
+                order_id=f"rolling-{index}",
+                status=models.PaymentStatus.paid,
+                purpose=models.PaymentPurpose.subscription,
+                created_at=now - timedelta(days=7) + shift,
+            )
+        )
+    db_session.commit()
+
+    stats_service.refresh_daily_stats(db_session, full=True)
+
+    assert stats_service.booking_stats(db_session)["weekly_revenue"] == 100.0
+
+
+def test_refresh_only_recomputes_touched_days(db_session):
+    now = datetime.now(timezone.utc).replace(hour=12)
+    bookings = _seed(db_session, now)
+    stats_service.refresh_daily_stats(db_session, full=True)
+
+    real_now = datetime.now(timezone.utc)
+    setting = db_session.get(models.Setting, stats_service.WATERMARK_KEY)
+    setting.value = (real_now - timedelta(hours=1)).isoformat()
+    booking = bookings[(-1, 9001)]
+    booking.status = models.BookingStatus.no_show
+    booking.updated_at = real_now - timedelta(minutes=30)
+    db_session.commit()
+
+    refreshed = stats_service.refresh_daily_stats(db_session)
+
+    assert refreshed == {(now - timedelta(days=1)).date()}
+    row = db_session.get(models.BookingDailyStats, (now - timedelta(days=1)).date())
+    assert (row.attended, row.no_show) == (1, 1)
+    assert stats_service.refresh_daily_stats(db_session) == set()
@@ -0,0 +1,54 @@
+from app.db import models
+from app.services import user_service
+
+
+def _seed(db_session):
+    db_session.add_all(
+        [
+            models.User(tg_id=111111, full_name="Anna Petrova", phone="+7 (912) 345-67-89"),
+            models.User(tg_id=222222, full_name="Marianna Smirnova", phone="8 912 000 11 22"),
+            models.User(tg_id=333333, full_name="Boris Annenkov"),
+            models.User(tg_id=444444, full_name="100% Dance_Fan"),
+        ]
+    )
+    db_session.commit()
+
+
+def test_name_search_ranks_prefix_matches_first(db_session):
+    _seed(db_session)
+
+    results = user_service.search_users(db_session, "  ann ")
+
+    assert [user.full_name for user in results] == [
+        "Anna Petrova",
+        "Boris Annenkov",
+        "Marianna Smirnova",
+    ]
+    assert user_service.search_users(db_session, "ann", limit=1)[0].tg_id == 111111
+
+
+def test_like_wildcards_in_query_are_literal(db_session):
+    _seed(db_session)
+
+    assert [user.tg_id for user in user_service.search_users(db_session, "0% d")] == [444444]
+    assert user_service.search_users(db_session, "a_n") == []
+
+
+def test_phone_and_tg_id_use_exact_lookups(db_session):
+    _seed(db_session)
+
+    assert [user.tg_id for user in user_service.search_users(db_session, "89123456789")] == [
+        111111
+    ]
+    assert [user.tg_id for user in user_service.search_users(db_session, "+7 912 000-11-22")] == [
+        222222
+    ]
+    assert [user.tg_id for user in user_service.search_users(db_session, "333333")] == [333333]
+    assert user_service.search_users(db_session, "91234") == []
+
+
+def test_phone_normalized_follows_phone_updates(db_session):
+    user = models.User(tg_id=1, phone="8 (900) 111-22-33")
+    assert user.phone_normalized == "79001112233"
+    user.phone = None
+    assert user.phone_normalized is None
@@ -5,10 +5,9 @@ import types
 from importlib.machinery import ModuleSpec
 from pathlib import Path
 
-from aiogram import Bot, Dispatcher
+from aiogram import Bot
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
-from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.types import BotCommand
 
 def _bootstrap_namespace() -> None:
@@ -50,7 +49,17 @@ _bootstrap_namespace()
 
 from dancestudio.bot.config import get_settings
 from dancestudio.bot.handlers import menu, payments
-from dancestudio.bot.middlewares.logging import LoggingMiddleware
+from dancestudio.bot.middlewares.metrics import TelegramRequestMetricsMiddleware
+from dancestudio.bot.middlewares.setup import build_dispatcher
+from dancestudio.bot.middlewares.shedding import (
+    count_pending_updates,
+    drop_pending_updates,
+)
+from dancestudio.bot.services.cache_events import listen_for_cache_events
+from dancestudio.bot.services.monitoring import (
+    log_metrics_periodically,
+    start_metrics_server,
+)
 
 
 logging.basicConfig(level=logging.INFO)
@@ -62,10 +71,15 @@ async def main() -> None:
         settings.token,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
-    dp = Dispatcher(storage=MemoryStorage())
-    dp.message.middleware(LoggingMiddleware())
-    dp.include_router(menu.router)
-    dp.include_router(payments.router)
+    bot.session.middleware(TelegramRequestMetricsMiddleware())
+    pending_updates = 0
+    if settings.skip_pending_updates:
+        await drop_pending_updates(bot)
+    else:
+        pending_updates = await count_pending_updates(bot)
+    dp = build_dispatcher(
+        settings, menu.router, payments.router, pending_updates=pending_updates
+    )
 
     await bot.set_my_commands(
         [
@@ -73,7 +87,32 @@ async def main() -> None:
         ]
     )
 
-    await dp.start_polling(bot)
+    metrics_runner = None
+    if settings.metrics_port:
+        metrics_runner = await start_metrics_server(
+            settings.metrics_host, settings.metrics_port
+        )
+    summary_task = None
+    if settings.metrics_log_interval > 0:
+        summary_task = asyncio.create_task(
+            log_metrics_periodically(settings.metrics_log_interval)
+        )
+
+    cache_events_task = None
+    if settings.cache_events_enabled:
+        cache_events_task = asyncio.create_task(
+            listen_for_cache_events(settings.redis_url, settings.cache_events_channel)
+        )
+
+    try:
+        await dp.start_polling(bot)
+    finally:
+        if cache_events_task is not None:
+            cache_events_task.cancel()
+        if summary_task is not None:
+            summary_task.cancel()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
 
 
 if __name__ == "__main__":
@@ -12,6 +12,16 @@ def _env(key: str, default: str = "") -> str:
     return os.getenv(key, default)
 
 
+def _env_int(key: str, default: int) -> int:
+    raw = os.getenv(key, "").strip()
+    return int(raw) if raw else default
+
+
+def _env_float(key: str, default: float) -> float:
+    raw = os.getenv(key, "").strip()
+    return float(raw) if raw else default
+
+
 @dataclass
 class BotSettings:
     token: str = _env("TELEGRAM_BOT_TOKEN")
@@ -24,6 +34,38 @@ class BotSettings:
     payment_fallback_url: str = _env("PAYMENT_FALLBACK_URL", "")
     payment_provider_token: str = _PAYMENT_PROVIDER_TOKEN
     payment_currency: str = _PAYMENT_CURRENCY
+    api_timeout: float = _env_float("BOT_API_TIMEOUT", 5.0)
+    api_timeout_budget: float = _env_float("BOT_API_TIMEOUT_BUDGET", 8.0)
+    api_retries: int = _env_int("BOT_API_RETRIES", 2)
+    api_retry_backoff: float = _env_float("BOT_API_RETRY_BACKOFF", 0.2)
+    api_circuit_failure_threshold: int = _env_int("BOT_API_CIRCUIT_FAILURES", 5)
+    api_circuit_reset_timeout: float = _env_float("BOT_API_CIRCUIT_RESET", 30.0)
+    snapshot_path: str = _env("BOT_SNAPSHOT_PATH", "")
+    catalogue_cache_ttl: float = _env_float("BOT_CATALOGUE_CACHE_TTL", 30.0)
+    profile_cache_ttl: float = _env_float("BOT_PROFILE_CACHE_TTL", 300.0)
+    cache_events_enabled: bool = _env("CACHE_EVENTS_ENABLED", "false").lower() == "true"
+    cache_events_channel: str = _env("CACHE_EVENTS_CHANNEL", "dancestudio:catalogue")
+    max_concurrent_updates: int = _env_int("BOT_MAX_CONCURRENT_UPDATES", 32)
+    chat_queue_size: int = _env_int("BOT_CHAT_QUEUE_SIZE", 8)
+    skip_pending_updates: bool = (
+        _env("BOT_SKIP_PENDING_UPDATES", "false").lower() == "true"
+    )
+    callback_max_age: float = _env_float("BOT_CALLBACK_MAX_AGE", 10.0)
+    collapse_duplicate_callbacks: bool = (
+        _env("BOT_COLLAPSE_DUPLICATE_CALLBACKS", "true").lower() == "true"
+    )
+    media_download_concurrency: int = _env_int("BOT_MEDIA_DOWNLOAD_CONCURRENCY", 4)
+    media_max_bytes: int = _env_int("BOT_MEDIA_MAX_BYTES", 50 * 1024 * 1024)
+    throttle_rate: float = _env_float("BOT_THROTTLE_RATE", 1.0)
+    throttle_burst: int = _env_int("BOT_THROTTLE_BURST", 5)
+    throttle_storage: str = _env("BOT_THROTTLE_STORAGE", "memory")
+    metrics_host: str = _env("BOT_METRICS_HOST", "0.0.0.0")
+    metrics_port: int = _env_int("BOT_METRICS_PORT", 0)
+    metrics_log_interval: float = _env_float("BOT_METRICS_LOG_INTERVAL", 0.0)
+    redis_url: str = _env(
+        "BOT_REDIS_URL",
+        f"redis://{_env('REDIS_HOST', 'localhost')}:{_env('REDIS_PORT', '6379')}/0",
+    )
 
 
 def get_settings() -> BotSettings:
@@ -42,14 +42,16 @@ from dancestudio.bot.services import (
     fetch_products,
     fetch_slots,
     fetch_bookings,
-    fetch_subscriptions,
+    fetch_user_overview,
     sync_user,
     fetch_studio_addresses,
-    download_media,
+    download_media_many,
 )
 from dancestudio.bot.services import payments as payment_services
 from dancestudio.bot.services.api_client import Direction
-from dancestudio.bot.utils import texts
+from dancestudio.bot.services.media_cache import extract_file_id, file_id_cache
+from dancestudio.bot.services.snapshot import is_stale
+from dancestudio.bot.utils import feedback, texts
 
 
 logger = logging.getLogger(__name__)
@@ -87,14 +89,50 @@ def _is_outdated_callback_query_error(error: TelegramBadRequest) -> bool:
     return "query is too old" in description or "query id is invalid" in description
 
 
-async def _safe_answer_callback(callback: CallbackQuery, *args, **kwargs) -> None:
+async def _safe_answer_callback(
+    callback: CallbackQuery, text: str | None = None, show_alert: bool = False, **kwargs
+) -> None:
+    if feedback.acknowledged():
+        # A query can only be answered once: alerts after an early
+        # acknowledgement are delivered as a message, plain toasts are dropped.
+        if text and show_alert and isinstance(callback.message, Message):
+            await callback.message.answer(text)
+        return
     try:
-        await callback.answer(*args, **kwargs)
+        await callback.answer(text, show_alert=show_alert, **kwargs)
     except TelegramBadRequest as error:
         if _is_outdated_callback_query_error(error):
             logger.debug("Ignoring outdated callback query: %s", error.message)
             return
         raise
+    finally:
+        feedback.mark_acknowledged()
+
+
+async def _show_loading(
+    callback: CallbackQuery, text: str = texts.LOADING, *, edit_message: bool = True
+) -> Message | None:
+    """Acknowledge ``callback`` at once and show ``text`` until the result is ready.
+
+    Returns the edited message the result should be rendered into, or the
+    original message when the interim edit was not possible. Actions whose
+    result arrives as a new message pass ``edit_message=False``: ``text`` is
+    shown as a toast instead, so the keyboard stays usable if the action fails.
+    """
+
+    message = callback.message
+    if not edit_message:
+        await _safe_answer_callback(callback, text)
+        return message if isinstance(message, Message) else None
+    await _safe_answer_callback(callback)
+    if not isinstance(message, Message):
+        return None
+    try:
+        edited = await message.edit_text(text)
+    except TelegramBadRequest as error:
+        logger.debug("Failed to show loading state: %s", error.message)
+        return message
+    return edited if isinstance(edited, Message) else message
 
 
 def _is_allowed_payment_url(url: str) -> bool:
@@ -727,55 +765,86 @@ async def show_addresses(callback: CallbackQuery) -> None:
         reply_markup=main_menu_keyboard(),
     )
     media_payload = result.get("media") if isinstance(result.get("media"), list) else []
-    media_group: list[InputMediaPhoto | InputMediaVideo] = []
+    published_ids: list[int] = []
+    # (media id, content version, url, filename, media type, cached file_id)
+    entries: list[tuple[int | None, str, str, str, str, str | None]] = []
     for item in media_payload:
         if not isinstance(item, dict):
             continue
         url = item.get("url")
         if not isinstance(url, str) or not url:
             continue
-        try:
-            data = await download_media(url)
-        except HTTPError as error:
-            logger.warning("Failed to download studio media %s: %s", url, error)
-            continue
-        except Exception:  # pragma: no cover - defensive
-            logger.exception("Unexpected error when downloading studio media %s", url)
-            continue
-        if not data:
-            logger.warning("Studio media %s is empty, skipping", url)
-            continue
+        raw_media_id = item.get("id")
+        media_id = raw_media_id if isinstance(raw_media_id, int) else None
+        version_value = item.get("version")
+        version = version_value if isinstance(version_value, str) and version_value else url
+        if media_id is not None:
+            published_ids.append(media_id)
+        cached_file_id = (
+            file_id_cache.get(media_id, version) if media_id is not None else None
+        )
         filename_value = item.get("filename")
         filename = (
             str(filename_value)
             if isinstance(filename_value, str) and filename_value.strip()
             else Path(urlparse(url).path).name or "media"
         )
-        file = BufferedInputFile(data, filename=filename)
         media_type = str(item.get("media_type") or "image")
+        entries.append((media_id, version, url, filename, media_type, cached_file_id))
+
+    missing_urls = [url for _, _, url, _, _, cached in entries if not cached]
+    downloaded = dict(zip(missing_urls, await download_media_many(missing_urls)))
+
+    # (media id, content version, uploaded from bytes, input media)
+    media_group: list[
+        tuple[int | None, str, bool, InputMediaPhoto | InputMediaVideo]
+    ] = []
+    for media_id, version, url, filename, media_type, cached_file_id in entries:
+        source: str | BufferedInputFile
+        if cached_file_id:
+            source = cached_file_id
+        else:
+            data = downloaded.get(url)
+            if not data:
+                logger.warning("Studio media %s is unavailable, skipping", url)
+                continue
+            source = BufferedInputFile(data, filename=filename)
         if media_type == "video":
-            media_group.append(InputMediaVideo(media=file))
+            media = InputMediaVideo(media=source)
         else:
-            media_group.append(InputMediaPhoto(media=file))
+            media = InputMediaPhoto(media=source)
+        media_group.append((media_id, version, cached_file_id is None, media))
+    file_id_cache.retain(published_ids)
     for chunk in _chunked(media_group, 10):
         if not chunk:
             continue
         try:
-            await callback.message.answer_media_group(chunk)
+            sent = await callback.message.answer_media_group(
+                [media for _, _, _, media in chunk]
+            )
         except TelegramBadRequest:
             logger.exception("Failed to send studio address media group")
+            for media_id, _, uploaded, _ in chunk:
+                if media_id is not None and not uploaded:
+                    file_id_cache.discard(media_id)
             break
+        for (media_id, version, uploaded, _), sent_message in zip(chunk, sent):
+            if media_id is None or not uploaded:
+                continue
+            file_id = extract_file_id(sent_message)
+            if file_id:
+                file_id_cache.store(media_id, version, file_id)
     await _safe_answer_callback(callback)
 
 
 async def _compose_bookings_view(
     tg_id: int,
+    *,
+    full_name: str | None = None,
 ) -> tuple[str, InlineKeyboardMarkup, list[Mapping[str, object]]]:
-    bookings = await fetch_bookings(tg_id=tg_id)
-    try:
-        subscriptions = await fetch_subscriptions(tg_id=tg_id)
-    except HTTPError:
-        subscriptions = None
+    overview = await fetch_user_overview(tg_id=tg_id, full_name=full_name)
+    bookings = overview["bookings"]
+    subscriptions = overview["subscriptions"]
 
     items: list[dict[str, object]] = []
     pay_rows: list[list[InlineKeyboardButton]] = []
@@ -883,17 +952,21 @@ async def my_bookings(callback: CallbackQuery) -> None:
     if not user:
         await _safe_answer_callback(callback, texts.API_ERROR, show_alert=True)
         return
+    message = await _show_loading(callback)
     try:
-        await sync_user(tg_id=user.id, full_name=user.full_name)
-    except HTTPError:
-        pass
-    try:
-        text, reply_markup, _ = await _compose_bookings_view(user.id)
+        text, reply_markup, _ = await _compose_bookings_view(
+            user.id, full_name=user.full_name
+        )
     except HTTPError:
-        await _safe_answer_callback(callback, texts.API_ERROR, show_alert=True)
-        return
-    await _safe_edit_message(callback.message, text, reply_markup=reply_markup)
-    await _safe_answer_callback(callback)
+        text = texts.API_ERROR
+        reply_markup = InlineKeyboardMarkup(
+            inline_keyboard=[
+                [InlineKeyboardButton(text="Обновить", callback_data="my_bookings")],
+                [InlineKeyboardButton(text="Главное меню", callback_data="back_main")],
+            ]
+        )
+    if message is not None:
+        await _safe_edit_message(message, text, reply_markup=reply_markup)
 
 
 @router.callback_query(F.data == "buy_subscription")
@@ -913,9 +986,12 @@ async def show_products(callback: CallbackQuery) -> None:
         await _safe_answer_callback(callback)
         return
 
+    prompt = texts.PRODUCTS_PROMPT
+    if is_stale(products):
+        prompt = texts.with_stale_note(prompt)
     await _safe_edit_message(
         callback.message,
-        texts.PRODUCTS_PROMPT,
+        prompt,
         reply_markup=products_keyboard(products),
     )
     await _safe_answer_callback(callback)
@@ -940,10 +1016,12 @@ async def product_details(callback: CallbackQuery) -> None:
         await _safe_answer_callback(callback, texts.ITEM_NOT_FOUND, show_alert=True)
         return
 
+    stale = is_stale(products)
+    details = texts.product_details(product)
     await _safe_edit_message(
         callback.message,
-        texts.product_details(product),
-        reply_markup=product_actions_keyboard(product_id),
+        texts.with_stale_note(details) if stale else details,
+        reply_markup=product_actions_keyboard(product_id, purchase_enabled=not stale),
     )
     await _safe_answer_callback(callback)
 
@@ -961,6 +1039,7 @@ async def purchase_product(callback: CallbackQuery, state: FSMContext) -> None:
         await _safe_answer_callback(callback, texts.ITEM_NOT_FOUND, show_alert=True)
         return
 
+    await _show_loading(callback, texts.PURCHASE_IN_PROGRESS, edit_message=False)
     try:
         user_payload = await sync_user(tg_id=user.id, full_name=user.full_name)
     except HTTPError:
@@ -999,9 +1078,12 @@ async def choose_direction(callback: CallbackQuery) -> None:
         await _safe_answer_callback(callback, texts.NO_DIRECTIONS, show_alert=True)
         return
 
+    prompt = texts.DIRECTIONS_PROMPT
+    if is_stale(directions):
+        prompt = texts.with_stale_note(prompt)
     await _safe_edit_message(
         callback.message,
-        texts.DIRECTIONS_PROMPT,
+        prompt,
         reply_markup=directions_keyboard(directions),
     )
     await _safe_answer_callback(callback)
@@ -1020,10 +1102,15 @@ async def _show_direction(callback: CallbackQuery, direction_id: int) -> None:
         await _safe_answer_callback(callback, texts.ITEM_NOT_FOUND, show_alert=True)
         return
 
+    stale = is_stale(directions) or is_stale(slots)
+    empty_text = texts.no_slots(direction.get("name", ""))
+    if stale:
+        empty_text = texts.with_stale_note(empty_text)
+
     if not slots:
         await _safe_edit_message(
             callback.message,
-            texts.no_slots(direction.get("name", "")),
+            empty_text,
             reply_markup=directions_keyboard(directions),
         )
         await _safe_answer_callback(callback)
@@ -1044,15 +1131,16 @@ async def _show_direction(callback: CallbackQuery, direction_id: int) -> None:
     if not slot_buttons:
         await _safe_edit_message(
             callback.message,
-            texts.no_slots(direction.get("name", "")),
+            empty_text,
             reply_markup=directions_keyboard(directions),
         )
         await _safe_answer_callback(callback)
         return
 
+    title = _direction_title(direction)
     await _safe_edit_message(
         callback.message,
-        _direction_title(direction),
+        texts.with_stale_note(title) if stale else title,
         reply_markup=slots_keyboard(direction_id, slot_buttons),
     )
     await _safe_answer_callback(callback)
@@ -1092,9 +1180,10 @@ async def show_slot_details(callback: CallbackQuery) -> None:
         await _safe_answer_callback(callback, texts.ITEM_NOT_FOUND, show_alert=True)
         return
 
+    stale = is_stale(directions) or is_stale(slots)
     existing_booking: Mapping[str, object] | None = None
     existing_booking_id: int | None = None
-    if callback.from_user:
+    if callback.from_user and not stale:
         try:
             user_bookings = await fetch_bookings(tg_id=callback.from_user.id)
         except HTTPError:
@@ -1115,6 +1204,8 @@ async def show_slot_details(callback: CallbackQuery) -> None:
 
     _, long_label = _format_slot_time(slot)
     slot_text = texts.slot_details(direction.get("name", ""), slot, long_label)
+    if stale:
+        slot_text = texts.with_stale_note(slot_text)
     payment_button: InlineKeyboardButton | None = None
     if existing_booking and existing_booking_id is not None:
         status_value = str(existing_booking.get("status") or "")
@@ -1147,6 +1238,7 @@ async def show_slot_details(callback: CallbackQuery) -> None:
             slot_id,
             booking_id=existing_booking_id,
             payment_button=payment_button,
+            booking_enabled=not stale,
         ),
     )
     await _safe_answer_callback(callback)
@@ -1176,6 +1268,7 @@ async def book_slot(callback: CallbackQuery, state: FSMContext) -> None:
         await _safe_answer_callback(callback, texts.ITEM_NOT_FOUND, show_alert=True)
         return
 
+    await _show_loading(callback, texts.BOOKING_IN_PROGRESS, edit_message=False)
     try:
         user_payload = await sync_user(tg_id=user.id, full_name=user.full_name)
     except HTTPError:
@@ -1214,16 +1307,16 @@ async def send_booking_invoice(callback: CallbackQuery, state: FSMContext) -> No
         await _safe_answer_callback(callback, texts.ITEM_NOT_FOUND, show_alert=True)
         return
 
+    await _show_loading(callback, texts.INVOICE_IN_PROGRESS, edit_message=False)
     try:
-        user_payload = await sync_user(tg_id=user.id, full_name=user.full_name)
-    except HTTPError:
-        user_payload = None
-
-    try:
-        bookings = await fetch_bookings(tg_id=user.id)
+        overview = await fetch_user_overview(
+            tg_id=user.id, full_name=user.full_name, include_subscriptions=False
+        )
     except HTTPError:
         await _safe_answer_callback(callback, texts.API_ERROR, show_alert=True)
         return
+    user_payload = overview["profile"]
+    bookings = overview["bookings"]
 
     booking = next((item for item in bookings if item.get("id") == booking_id), None)
     if not booking or booking.get("status") != "reserved":
@@ -1366,9 +1459,12 @@ async def back_to_directions(callback: CallbackQuery) -> None:
         await _safe_answer_callback(callback, texts.NO_DIRECTIONS, show_alert=True)
         return
 
+    prompt = texts.DIRECTIONS_PROMPT
+    if is_stale(directions):
+        prompt = texts.with_stale_note(prompt)
     await _safe_edit_message(
         callback.message,
-        texts.DIRECTIONS_PROMPT,
+        prompt,
         reply_markup=directions_keyboard(directions),
     )
     await _safe_answer_callback(callback)
@@ -37,21 +37,26 @@ def products_keyboard(products: Sequence[Product]) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
-def product_actions_keyboard(product_id: int) -> InlineKeyboardMarkup:
-    return InlineKeyboardMarkup(
-        inline_keyboard=[
+def product_actions_keyboard(
+    product_id: int, *, purchase_enabled: bool = True
+) -> InlineKeyboardMarkup:
+    rows: list[list[InlineKeyboardButton]] = []
+    if purchase_enabled:
+        rows.append(
             [
                 InlineKeyboardButton(
                     text="Купить",
                     callback_data=f"purchase_product:{product_id}",
                 )
-            ],
-            [
-                InlineKeyboardButton(text="Назад", callback_data="buy_subscription"),
-                InlineKeyboardButton(text="Главное меню", callback_data="back_main"),
-            ],
+            ]
+        )
+    rows.append(
+        [
+            InlineKeyboardButton(text="Назад", callback_data="buy_subscription"),
+            InlineKeyboardButton(text="Главное меню", callback_data="back_main"),
         ]
     )
+    return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
 __all__ = ["products_keyboard", "product_actions_keyboard"]
@@ -29,15 +29,18 @@ def slot_actions_keyboard(
     *,
     booking_id: int | None = None,
     payment_button: InlineKeyboardButton | None = None,
+    booking_enabled: bool = True,
 ) -> InlineKeyboardMarkup:
-    rows: list[list[InlineKeyboardButton]] = [
-        [
-            InlineKeyboardButton(
-                text="Записаться",
-                callback_data=f"book_slot:{direction_id}:{slot_id}",
-            )
-        ]
-    ]
+    rows: list[list[InlineKeyboardButton]] = []
+    if booking_enabled:
+        rows.append(
+            [
+                InlineKeyboardButton(
+                    text="Записаться",
+                    callback_data=f"book_slot:{direction_id}:{slot_id}",
+                )
+            ]
+        )
     if payment_button is not None:
         rows.append([payment_button])
     if booking_id is not None:
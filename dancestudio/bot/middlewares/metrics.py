@@ -0,0 +1,88 @@
+"""Latency instrumentation for bot handlers and outgoing Telegram requests."""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.types import CallbackQuery, TelegramObject
+
+from dancestudio.bot.utils import feedback, metrics
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+    from aiogram.methods import Response, TelegramMethod
+    from aiogram.methods.base import TelegramType
+
+
+def _handler_name(data: Dict[str, Any]) -> str:
+    handler = data.get("handler")
+    callback = getattr(handler, "callback", None)
+    name = getattr(callback, "__name__", None)
+    return name if isinstance(name, str) else "unknown"
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Time every handled update by the name of the handler function.
+
+    Must be registered as an inner middleware so that the matched handler is
+    known when it runs. For callback queries it also measures the time until
+    the query is first answered (see :mod:`dancestudio.bot.utils.feedback`).
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        name = _handler_name(data)
+        token = feedback.begin(name) if isinstance(event, CallbackQuery) else None
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await handler(event, data)
+            outcome = "ok"
+            return result
+        finally:
+            if token is not None:
+                feedback.end(token)
+            metrics.observe(
+                "bot_handler_duration_seconds",
+                time.perf_counter() - started,
+                handler=name,
+                outcome=outcome,
+            )
+
+
+class TelegramRequestMetricsMiddleware(BaseRequestMiddleware):
+    """Time outgoing Telegram Bot API calls by method name."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        method_name = type(method).__name__
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await make_request(bot, method)
+            outcome = "ok" if response.ok else "failed"
+            return response
+        finally:
+            metrics.observe(
+                "bot_telegram_request_duration_seconds",
+                time.perf_counter() - started,
+                method=method_name,
+                outcome=outcome,
+            )
+
+
+__all__ = ["HandlerMetricsMiddleware", "TelegramRequestMetricsMiddleware"]
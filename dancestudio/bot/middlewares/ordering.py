@@ -0,0 +1,122 @@
+"""Per-chat ordering of concurrently processed updates."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import Chat, TelegramObject, User
+
+from dancestudio.bot.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class _ChatQueue:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    pending: int = 0
+
+
+class ChatOrderingMiddleware(BaseMiddleware):
+    """Run updates in parallel across chats and strictly in order within a chat.
+
+    Must be registered as an outer ``update`` middleware ahead of the FSM
+    middleware, so the chat lock is held before the FSM state is read. Updates
+    of one chat wait on a FIFO lock; when more than ``max_queue_size`` updates
+    of the same chat are pending the newest one is dropped. ``max_concurrency``
+    bounds the number of updates processed at once across all chats.
+    """
+
+    def __init__(self, *, max_concurrency: int = 32, max_queue_size: int = 8) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be positive")
+        if max_queue_size < 1:
+            raise ValueError("max_queue_size must be positive")
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._max_queue_size = max_queue_size
+        self._queues: dict[int, _ChatQueue] = {}
+        self._in_flight = 0
+
+    @property
+    def queued(self) -> int:
+        """Total number of updates waiting or running across all chats."""
+
+        return sum(queue.pending for queue in self._queues.values())
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def queue_depth(self, chat_id: int) -> int:
+        queue = self._queues.get(chat_id)
+        return queue.pending if queue else 0
+
+    @staticmethod
+    def _resolve_key(data: Dict[str, Any]) -> int | None:
+        chat = data.get("event_chat")
+        if isinstance(chat, Chat):
+            return chat.id
+        user = data.get("event_from_user")
+        if isinstance(user, User):
+            return user.id
+        return None
+
+    def _report_depth(self) -> None:
+        metrics.set_gauge("bot_update_queue_depth", self.queued)
+        metrics.set_gauge("bot_update_queue_chats", len(self._queues))
+        metrics.set_gauge("bot_updates_in_flight", self._in_flight)
+
+    async def _run(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        async with self._semaphore:
+            self._in_flight += 1
+            self._report_depth()
+            try:
+                return await handler(event, data)
+            finally:
+                self._in_flight -= 1
+                self._report_depth()
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        key = self._resolve_key(data)
+        if key is None:
+            return await self._run(handler, event, data)
+
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = _ChatQueue()
+        if queue.pending >= self._max_queue_size:
+            metrics.increment("bot_updates_dropped_total", reason="chat_queue_full")
+            logger.warning(
+                "Dropping update for chat %s: %s updates already queued",
+                key,
+                queue.pending,
+            )
+            return None
+
+        queue.pending += 1
+        self._report_depth()
+        try:
+            async with queue.lock:
+                return await self._run(handler, event, data)
+        finally:
+            queue.pending -= 1
+            if queue.pending == 0 and self._queues.get(key) is queue:
+                del self._queues[key]
+            self._report_depth()
+
+
+__all__ = ["ChatOrderingMiddleware"]
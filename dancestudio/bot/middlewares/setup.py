@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from aiogram import Dispatcher, Router
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from ..config import BotSettings
+from .logging import LoggingMiddleware
+from .metrics import HandlerMetricsMiddleware
+from .ordering import ChatOrderingMiddleware
+from .shedding import LoadSheddingMiddleware
+from .throttling import (
+    MemoryTokenBucketStorage,
+    RedisTokenBucketStorage,
+    ThrottlingMiddleware,
+)
+
+
+def build_dispatcher(
+    settings: BotSettings, *routers: Router, pending_updates: int = 0
+) -> Dispatcher:
+    """Create the dispatcher with its update middlewares in the required order.
+
+    Throttling runs before per-chat ordering so rejected updates never occupy
+    a chat queue. The FSM middleware is registered by hand after ordering: the
+    chat lock must be held before the FSM state is read, otherwise an update
+    queued behind another one of the same chat would see the state as it was
+    before the first handler changed it. ``pending_updates`` is the startup
+    backlog size the load-shedding middleware treats as stale.
+    """
+
+    dp = Dispatcher(storage=MemoryStorage(), disable_fsm=True)
+    shedding = LoadSheddingMiddleware(
+        max_callback_age=settings.callback_max_age,
+        collapse_duplicates=settings.collapse_duplicate_callbacks,
+        pending_updates=pending_updates,
+    )
+    if settings.throttle_storage.strip().lower() == "redis":
+        throttle_storage = RedisTokenBucketStorage.from_url(settings.redis_url)
+    else:
+        throttle_storage = MemoryTokenBucketStorage()
+    dp.update.outer_middleware(shedding)
+    dp.update.outer_middleware(
+        ThrottlingMiddleware(
+            throttle_storage,
+            rate=settings.throttle_rate,
+            burst=settings.throttle_burst,
+        )
+    )
+    dp.update.outer_middleware(
+        ChatOrderingMiddleware(
+            max_concurrency=settings.max_concurrent_updates,
+            max_queue_size=settings.chat_queue_size,
+        )
+    )
+    dp.update.outer_middleware(dp.fsm)
+    dp.callback_query.outer_middleware(shedding)
+    dp.message.middleware(LoggingMiddleware())
+    handler_metrics = HandlerMetricsMiddleware()
+    dp.message.middleware(handler_metrics)
+    dp.callback_query.middleware(handler_metrics)
+    dp.pre_checkout_query.middleware(handler_metrics)
+    for router in routers:
+        dp.include_router(router)
+    return dp
@@ -0,0 +1,143 @@
+"""Drop callback queries that are too old or already being processed."""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.exceptions import TelegramAPIError
+from aiogram.types import CallbackQuery, TelegramObject, Update
+
+from dancestudio.bot.utils import metrics
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+logger = logging.getLogger(__name__)
+
+_RECEIVED_AT_KEY = "update_received_at"
+_BACKLOG_KEY = "update_from_backlog"
+
+
+class LoadSheddingMiddleware(BaseMiddleware):
+    """Shed callback queries that cannot be served usefully.
+
+    Register the same instance as the first outer ``update`` middleware (to
+    stamp when an update arrived, before it waits in per-chat queues) and as an
+    outer ``callback_query`` middleware. While a callback with the same data is
+    queued or running for a user, repeated taps are answered silently and
+    dropped. Callbacks that waited longer than ``max_callback_age`` seconds
+    before reaching their handler are dropped: Telegram refuses to answer them
+    anyway.
+
+    The monotonic stamp cannot see time spent in Telegram's queue while the bot
+    was down, so ``pending_updates`` (the ``pending_update_count`` reported at
+    startup) marks the first updates delivered after a restart as backlog;
+    callbacks among them are dropped as stale as well.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_callback_age: float = 10.0,
+        collapse_duplicates: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+        pending_updates: int = 0,
+    ) -> None:
+        self._max_callback_age = max_callback_age
+        self._collapse_duplicates = collapse_duplicates
+        self._clock = clock
+        self._in_flight: set[tuple[int, str]] = set()
+        self._pending_updates = pending_updates
+        self._backlog_end: int | None = None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if isinstance(event, Update):
+            data.setdefault(_RECEIVED_AT_KEY, self._clock())
+            data.setdefault(_BACKLOG_KEY, self._from_backlog(event))
+            return await self._collapse(handler, event, data)
+        if isinstance(event, CallbackQuery) and self._is_stale(data):
+            metrics.increment("bot_updates_dropped_total", reason="stale_callback")
+            logger.info("Dropping stale callback query %s", event.data)
+            return None
+        return await handler(event, data)
+
+    def _from_backlog(self, update: Update) -> bool:
+        # Update ids grow sequentially, so the backlog is the id range that
+        # starts with the first update seen after startup.
+        if self._backlog_end is None:
+            self._backlog_end = update.update_id + self._pending_updates
+        return update.update_id < self._backlog_end
+
+    def _is_stale(self, data: Dict[str, Any]) -> bool:
+        if self._max_callback_age <= 0:
+            return False
+        if data.get(_BACKLOG_KEY):
+            return True
+        received_at = data.get(_RECEIVED_AT_KEY)
+        return (
+            isinstance(received_at, float)
+            and self._clock() - received_at > self._max_callback_age
+        )
+
+    async def _collapse(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        update: Update,
+        data: Dict[str, Any],
+    ) -> Any:
+        # Tracked at the update level so that taps still waiting in the
+        # per-chat queue count as in flight as well.
+        callback = update.callback_query
+        if not self._collapse_duplicates or callback is None or callback.data is None:
+            return await handler(update, data)
+        key = (callback.from_user.id, callback.data)
+        if key in self._in_flight:
+            metrics.increment("bot_updates_dropped_total", reason="duplicate_callback")
+            try:
+                await callback.answer()
+            except TelegramAPIError:
+                logger.debug("Failed to answer duplicate callback query", exc_info=True)
+            return None
+        self._in_flight.add(key)
+        try:
+            return await handler(update, data)
+        finally:
+            self._in_flight.discard(key)
+
+
+async def count_pending_updates(bot: Bot) -> int:
+    """Return how many updates Telegram accumulated while the bot was offline."""
+
+    try:
+        info = await bot.get_webhook_info()
+    except TelegramAPIError:
+        return 0
+    return info.pending_update_count
+
+
+async def drop_pending_updates(bot: Bot) -> int:
+    """Discard the updates Telegram accumulated while the bot was offline."""
+
+    pending = await count_pending_updates(bot)
+    await bot.delete_webhook(drop_pending_updates=True)
+    if pending:
+        metrics.increment(
+            "bot_updates_dropped_total", value=pending, reason="startup_backlog"
+        )
+        logger.info("Skipped %s pending updates at startup", pending)
+    return pending
+
+
+__all__ = ["LoadSheddingMiddleware", "count_pending_updates", "drop_pending_updates"]
@@ -0,0 +1,173 @@
+"""Per-user rate limiting for incoming messages and callback queries."""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Protocol
+
+from aiogram import BaseMiddleware
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import CallbackQuery, Message, TelegramObject, Update, User
+
+from dancestudio.bot.utils import metrics, texts
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "bot:throttle:"
+_REDIS_BUCKET_SCRIPT = """
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return allowed
+"""
+
+
+class TokenBucketStorage(Protocol):
+    async def consume(self, key: str, *, rate: float, capacity: int) -> bool:
+        """Take one token from the bucket ``key`` and report whether it was available."""
+
+
+class MemoryTokenBucketStorage:
+    """Token buckets kept in the bot process memory."""
+
+    def __init__(self, *, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    async def consume(self, key: str, *, rate: float, capacity: int) -> bool:
+        now = self._clock()
+        tokens, updated = self._buckets.get(key, (float(capacity), now))
+        tokens = min(float(capacity), tokens + max(0.0, now - updated) * rate)
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > 10_000:
+            self._prune(now, rate, capacity)
+        return allowed
+
+    def _prune(self, now: float, rate: float, capacity: int) -> None:
+        refill_time = capacity / rate
+        stale = [
+            key
+            for key, (_, updated) in self._buckets.items()
+            if now - updated > refill_time
+        ]
+        for key in stale:
+            del self._buckets[key]
+
+
+class RedisTokenBucketStorage:
+    """Token buckets shared between bot instances through Redis."""
+
+    def __init__(self, redis: Any) -> None:
+        self._redis = redis
+        self._script = redis.register_script(_REDIS_BUCKET_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisTokenBucketStorage":
+        from redis.asyncio import Redis
+
+        return cls(Redis.from_url(url))
+
+    async def consume(self, key: str, *, rate: float, capacity: int) -> bool:
+        allowed = await self._script(
+            keys=[_KEY_PREFIX + key], args=[rate, capacity, time.time()]
+        )
+        return bool(int(allowed))
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Drop messages and callbacks from users exceeding ``rate`` events per second.
+
+    Each user owns a token bucket of ``burst`` tokens refilled at ``rate``
+    tokens per second. A throttled callback is answered with a short notice so
+    the client stops spinning; a throttled message gets at most one notice per
+    ``notice_interval`` seconds.
+
+    Register it as an outer ``update`` middleware ahead of
+    :class:`ChatOrderingMiddleware` so throttled updates are rejected without
+    waiting for the chat lock. Other update types pass through untouched.
+    """
+
+    def __init__(
+        self,
+        storage: TokenBucketStorage | None = None,
+        *,
+        rate: float = 1.0,
+        burst: int = 5,
+        notice_interval: float = 5.0,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be positive")
+        self._storage = storage or MemoryTokenBucketStorage()
+        self._rate = rate
+        self._burst = burst
+        self._notice_interval = notice_interval
+        self._last_notice: dict[int, float] = {}
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        payload = event.event if isinstance(event, Update) else event
+        if not isinstance(user, User) or not isinstance(payload, (Message, CallbackQuery)):
+            return await handler(event, data)
+        try:
+            allowed = await self._storage.consume(
+                str(user.id), rate=self._rate, capacity=self._burst
+            )
+        except Exception:  # pragma: no cover - storage outage must not block users
+            logger.exception("Rate limit storage failed, letting the event through")
+            return await handler(event, data)
+        if allowed:
+            return await handler(event, data)
+
+        event_type = "callback_query" if isinstance(payload, CallbackQuery) else "message"
+        metrics.increment("bot_throttled_events_total", event_type=event_type)
+        logger.info("Throttled %s from user %s", event_type, user.id)
+        await self._notify(payload, user.id)
+        return None
+
+    async def _notify(self, event: TelegramObject, user_id: int) -> None:
+        try:
+            if isinstance(event, CallbackQuery):
+                await event.answer(texts.THROTTLED)
+                return
+            if not isinstance(event, Message):
+                return
+            now = time.monotonic()
+            last_notice = self._last_notice.get(user_id)
+            if last_notice is not None and now - last_notice < self._notice_interval:
+                return
+            if len(self._last_notice) > 10_000:
+                self._last_notice.clear()
+            self._last_notice[user_id] = now
+            await event.answer(texts.THROTTLED)
+        except TelegramBadRequest as error:
+            logger.debug("Failed to send throttling notice: %s", error)
+
+
+__all__ = [
+    "TokenBucketStorage",
+    "MemoryTokenBucketStorage",
+    "RedisTokenBucketStorage",
+    "ThrottlingMiddleware",
+]
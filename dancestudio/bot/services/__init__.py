@@ -8,8 +8,10 @@ from .api_client import (
     cancel_booking,
     create_subscription_payment,
     sync_user,
+    fetch_user_overview,
     fetch_studio_addresses,
     download_media,
+    download_media_many,
 )
 
 __all__ = [
@@ -22,6 +24,8 @@ __all__ = [
     "cancel_booking",
     "create_subscription_payment",
     "sync_user",
+    "fetch_user_overview",
     "fetch_studio_addresses",
     "download_media",
+    "download_media_many",
 ]
@@ -1,16 +1,28 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import random
+import time
 from datetime import datetime, timezone
-from typing import Any, TypedDict
+from typing import Any, Sequence, TypedDict
 
 import httpx
 
 try:  # pragma: no cover - executed depending on import layout
     from dancestudio.bot.config import get_settings
+    from dancestudio.bot.services.circuit_breaker import CircuitBreaker
+    from dancestudio.bot.services.snapshot import SnapshotStore, StaleList
+    from dancestudio.bot.utils import metrics
 except ModuleNotFoundError as exc:  # pragma: no cover - fallback for Docker image
     if exc.name and not exc.name.startswith("dancestudio"):
         raise
     from config import get_settings  # type: ignore[no-redef]
+    from services.circuit_breaker import CircuitBreaker  # type: ignore[no-redef]
+    from services.snapshot import SnapshotStore, StaleList  # type: ignore[no-redef]
+    from utils import metrics  # type: ignore[no-redef]
+
+logger = logging.getLogger(__name__)
 
 
 class Product(TypedDict, total=False):
@@ -84,6 +96,13 @@ class AddressMedia(TypedDict, total=False):
     url: str
     media_type: str
     filename: str
+    version: str
+
+
+class UserOverview(TypedDict):
+    profile: dict[str, Any] | None
+    bookings: list[Booking]
+    subscriptions: list[Subscription] | None
 
 
 class StudioAddresses(TypedDict, total=False):
@@ -112,18 +131,126 @@ def _request_path(path: str) -> str:
     return path.lstrip("/")
 
 
+def _endpoint_label(path: str) -> str:
+    """Collapse numeric path segments so that metrics keep a low cardinality."""
+
+    if path.startswith("http://") or path.startswith("https://"):
+        return "external"
+    segments = [
+        "{id}" if segment.isdigit() else segment
+        for segment in path.strip("/").split("/")
+    ]
+    return "/" + "/".join(segments)
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised without contacting the backend while the circuit breaker is open."""
+
+    response = None
+
+
+# Endpoints that reach the payment gateway get more time than plain reads.
+_ENDPOINT_TIMEOUTS: dict[str, float] = {
+    "/bot/batch": 15.0,
+    "/bot/bookings": 15.0,
+    "/bot/payments/subscription": 15.0,
+    "/payments/webhook": 15.0,
+}
+_RETRYABLE_STATUS_CODES = frozenset({502, 503, 504})
+
+_breaker = CircuitBreaker(
+    "backend",
+    failure_threshold=_settings.api_circuit_failure_threshold,
+    reset_timeout=_settings.api_circuit_reset_timeout,
+)
+
+
+def _endpoint_timeout(endpoint: str) -> float:
+    return _ENDPOINT_TIMEOUTS.get(endpoint, _settings.api_timeout)
+
+
+async def _send(
+    method: str, path: str, endpoint: str, timeout: float, **kwargs: Any
+) -> httpx.Response:
+    started = time.perf_counter()
+    status = "error"
+    try:
+        async with httpx.AsyncClient(
+            base_url=_settings.api_base_url, timeout=timeout
+        ) as client:
+            response = await client.request(
+                method, _request_path(path), headers=_headers(), **kwargs
+            )
+            status = str(response.status_code)
+            return response
+    finally:
+        metrics.observe(
+            "bot_api_request_duration_seconds",
+            time.perf_counter() - started,
+            method=method,
+            endpoint=endpoint,
+            status=status,
+        )
+
+
+async def _request(method: str, path: str, **kwargs: Any) -> Any:
+    """Send a request to the backend honouring timeouts, retries and the breaker.
+
+    Only idempotent ``GET`` requests are retried, with jittered exponential
+    backoff, on transport errors and gateway failures, and never past the
+    overall ``api_timeout_budget``.
+    """
+
+    endpoint = _endpoint_label(path)
+    attempts = 1 + (max(0, _settings.api_retries) if method == "GET" else 0)
+    timeout = _endpoint_timeout(endpoint)
+    deadline = time.monotonic() + max(timeout, _settings.api_timeout_budget)
+    last_error: httpx.HTTPError | None = None
+    for attempt in range(attempts):
+        if not _breaker.allow():
+            metrics.increment("bot_api_rejected_total", endpoint=endpoint)
+            raise CircuitOpenError(f"Backend is unavailable, skipped {method} {endpoint}")
+        attempt_timeout = min(timeout, max(deadline - time.monotonic(), 0.1))
+        try:
+            response = await _send(method, path, endpoint, attempt_timeout, **kwargs)
+        except httpx.TransportError as error:
+            _breaker.record_failure()
+            last_error = error
+        except BaseException:
+            _breaker.release()
+            raise
+        else:
+            if response.status_code >= 500:
+                _breaker.record_failure()
+            else:
+                _breaker.record_success()
+            if (
+                response.status_code not in _RETRYABLE_STATUS_CODES
+                or attempt == attempts - 1
+            ):
+                response.raise_for_status()
+                return response.json()
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError as error:
+                last_error = error
+        if attempt == attempts - 1:
+            break
+        delay = random.uniform(0, _settings.api_retry_backoff * 2**attempt)
+        if time.monotonic() + delay >= deadline:
+            break
+        metrics.increment("bot_api_retries_total", endpoint=endpoint)
+        await asyncio.sleep(delay)
+    assert last_error is not None
+    raise last_error
+
+
 async def _get(path: str, params: dict[str, Any] | None = None) -> Any:
-    async with httpx.AsyncClient(base_url=_settings.api_base_url, timeout=10.0) as client:
-        response = await client.get(_request_path(path), params=params, headers=_headers())
-        response.raise_for_status()
-        return response.json()
+    return await _request("GET", path, params=params)
 
 
 async def _post(path: str, json: dict[str, Any]) -> Any:
-    async with httpx.AsyncClient(base_url=_settings.api_base_url, timeout=10.0) as client:
-        response = await client.post(_request_path(path), json=json, headers=_headers())
-        response.raise_for_status()
-        return response.json()
+    return await _request("POST", path, json=json)
 
 
 def _headers() -> dict[str, str]:
@@ -133,31 +260,146 @@ def _headers() -> dict[str, str]:
     return headers
 
 
+_snapshots = SnapshotStore(_settings.snapshot_path or None)
+# Fresh catalogue responses served without a backend round trip, keyed like
+# the snapshots and dropped by ``invalidate_catalogue``.
+_catalogue_cache: dict[str, tuple[float, list[Any]]] = {}
+
+
+def invalidate_catalogue(kind: str | None = None, *, direction_id: int | None = None) -> None:
+    """Drop cached catalogue responses affected by a backend change.
+
+    ``kind`` is ``"directions"``, ``"products"`` or ``"slots"``; slot changes
+    with a known ``direction_id`` only drop that direction and the combined
+    listing. ``None`` clears everything.
+    """
+
+    if kind == "slots" and direction_id is not None:
+        keys = [f"slots:{direction_id}", "slots:all"]
+    elif kind is None:
+        keys = list(_catalogue_cache)
+    else:
+        keys = [key for key in _catalogue_cache if key.split(":", 1)[0] == kind]
+    for key in keys:
+        if _catalogue_cache.pop(key, None) is not None:
+            metrics.increment("bot_catalogue_invalidations_total", kind=key.split(":", 1)[0])
+
+
+def _backend_unavailable(error: httpx.HTTPError) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+async def _get_with_snapshot(
+    key: str, path: str, params: dict[str, Any] | None = None
+) -> list[Any]:
+    """Fetch a catalogue list, falling back to its last-known-good snapshot.
+
+    The snapshot is only served while the backend is unreachable or failing;
+    the returned :class:`StaleList` lets handlers mark the data as outdated.
+    """
+
+    ttl = _settings.catalogue_cache_ttl
+    cached = _catalogue_cache.get(key)
+    if cached is not None and time.monotonic() - cached[0] < ttl:
+        metrics.increment("bot_catalogue_cache_hits_total", kind=key.split(":", 1)[0])
+        return list(cached[1])
+    try:
+        data = await _get(path, params=params)
+    except httpx.HTTPError as error:
+        if not _backend_unavailable(error):
+            raise
+        snapshot = _snapshots.recall(key)
+        if snapshot is None:
+            raise
+        metrics.increment("bot_snapshot_served_total", kind=key.split(":", 1)[0])
+        logger.warning("Serving %s from snapshot: %s", key, error)
+        return snapshot
+    if isinstance(data, list):
+        _snapshots.remember(key, data)
+        if ttl > 0:
+            _catalogue_cache[key] = (time.monotonic(), list(data))
+    return data
+
+
+def _keep(data: list[Any], items: list[Any]) -> list[Any]:
+    """Return ``items`` preserving the snapshot marker of ``data``."""
+
+    if isinstance(data, StaleList):
+        return StaleList(items, data.saved_at)
+    return items
+
+
+def _slot_is_upcoming(slot: Any, now: datetime) -> bool:
+    raw_value = slot.get("starts_at") if isinstance(slot, dict) else None
+    if not isinstance(raw_value, str):
+        return True
+    try:
+        starts_at = datetime.fromisoformat(raw_value.replace("Z", "+00:00"))
+    except ValueError:
+        return True
+    if starts_at.tzinfo is None:
+        starts_at = starts_at.replace(tzinfo=timezone.utc)
+    return starts_at >= now
+
+
 async def fetch_products(*, active_only: bool = True) -> list[Product]:
-    data = await _get("/products")
+    data = await _get_with_snapshot("products", "/products")
     if active_only:
-        return [product for product in data if product.get("is_active")]
+        return _keep(data, [product for product in data if product.get("is_active")])
     return data
 
 
 async def fetch_directions(*, active_only: bool = True) -> list[Direction]:
     params = {"include_inactive": not active_only}
-    data = await _get("/directions", params=params)
+    data = await _get_with_snapshot(
+        f"directions:{'active' if active_only else 'all'}", "/directions", params=params
+    )
     if active_only:
-        return [direction for direction in data if direction.get("is_active")]
+        return _keep(
+            data, [direction for direction in data if direction.get("is_active")]
+        )
     return data
 
 
 async def fetch_slots(*, direction_id: int | None = None) -> list[Slot]:
-    params: dict[str, Any] = {"from_dt": datetime.now(timezone.utc).isoformat()}
+    now = datetime.now(timezone.utc)
+    params: dict[str, Any] = {"from_dt": now.isoformat()}
     if direction_id is not None:
         params["direction_id"] = direction_id
-    data = await _get("/slots", params=params)
-    return data
+    key = f"slots:{direction_id if direction_id is not None else 'all'}"
+    data = await _get_with_snapshot(key, "/slots", params=params)
+    # Cached and snapshot listings may contain slots that have started since.
+    return _keep(data, [slot for slot in data if _slot_is_upcoming(slot, now)])
 
 
-async def sync_user(
-    *,
+# Profiles returned by the last sync per tg_id: a sync that would not change
+# anything is answered from here without a backend round trip.
+_profiles: dict[int, tuple[float, dict[str, Any]]] = {}
+_PROFILE_CACHE_LIMIT = 10_000
+
+
+def _known_profile(tg_id: int, payload: dict[str, Any]) -> dict[str, Any] | None:
+    cached = _profiles.get(tg_id)
+    if (
+        cached is not None
+        and time.monotonic() - cached[0] < _settings.profile_cache_ttl
+        and all(cached[1].get(key) == value for key, value in payload.items())
+    ):
+        metrics.increment("bot_user_sync_skipped_total")
+        return dict(cached[1])
+    return None
+
+
+def _remember_profile(tg_id: int, data: object) -> None:
+    if isinstance(data, dict) and _settings.profile_cache_ttl > 0:
+        if len(_profiles) >= _PROFILE_CACHE_LIMIT:
+            _profiles.clear()
+        _profiles[tg_id] = (time.monotonic(), dict(data))
+
+
+def _sync_payload(
     tg_id: int,
     full_name: str | None = None,
     age: int | None = None,
@@ -170,7 +412,93 @@ async def sync_user(
         payload["age"] = age
     if phone is not None:
         payload["phone"] = phone
-    return await _post("/bot/users/sync", payload)
+    return payload
+
+
+async def sync_user(
+    *,
+    tg_id: int,
+    full_name: str | None = None,
+    age: int | None = None,
+    phone: str | None = None,
+) -> dict[str, Any]:
+    payload = _sync_payload(tg_id, full_name, age, phone)
+    known = _known_profile(tg_id, payload)
+    if known is not None:
+        return known
+    data = await _post("/bot/users/sync", payload)
+    _remember_profile(tg_id, data)
+    return data
+
+
+async def batch(calls: Sequence[tuple[str, dict[str, Any]]]) -> list[Any]:
+    """Run several bot API calls in one round trip via ``POST /bot/batch``.
+
+    ``calls`` are ``(operation, arguments)`` pairs. Results come back in the
+    same order; a failed call is returned (not raised) as
+    :class:`httpx.HTTPStatusError` so callers can decide which failures matter.
+    """
+
+    data = await _post(
+        "/bot/batch", {"calls": [{"op": op, "args": args} for op, args in calls]}
+    )
+    request = httpx.Request("POST", f"{_settings.api_base_url.rstrip('/')}/bot/batch")
+    results: list[Any] = []
+    for item in data:
+        status_code = int(item.get("status", 500))
+        body = item.get("body")
+        if status_code >= 400:
+            response = httpx.Response(status_code, json=body, request=request)
+            results.append(
+                httpx.HTTPStatusError(
+                    f"Batched call failed with status {status_code}",
+                    request=request,
+                    response=response,
+                )
+            )
+        else:
+            results.append(body)
+    return results
+
+
+async def fetch_user_overview(
+    *,
+    tg_id: int,
+    full_name: str | None = None,
+    include_subscriptions: bool = True,
+) -> UserOverview:
+    """Load the user's bookings (and subscriptions) in one round trip.
+
+    With ``full_name`` the user is synced in the same batch unless the profile
+    is already known. Failures of the sync or of the subscriptions call yield
+    ``None`` for that part; a failure to load bookings is raised.
+    """
+
+    calls: list[tuple[str, dict[str, Any]]] = []
+    profile: dict[str, Any] | None = None
+    sync_needed = False
+    if full_name is not None:
+        payload = _sync_payload(tg_id, full_name)
+        profile = _known_profile(tg_id, payload)
+        sync_needed = profile is None
+    if sync_needed:
+        calls.append(("sync_user", payload))
+    calls.append(("bookings", {"tg_id": tg_id}))
+    if include_subscriptions:
+        calls.append(("subscriptions", {"tg_id": tg_id}))
+    results = await batch(calls)
+    if sync_needed:
+        synced = results.pop(0)
+        if not isinstance(synced, Exception):
+            _remember_profile(tg_id, synced)
+            profile = synced
+    bookings = results[0]
+    if isinstance(bookings, Exception):
+        raise bookings
+    subscriptions = None
+    if include_subscriptions and not isinstance(results[1], Exception):
+        subscriptions = results[1]
+    return {"profile": profile, "bookings": bookings, "subscriptions": subscriptions}
 
 
 async def fetch_bookings(*, tg_id: int) -> list[Booking]:
@@ -250,13 +578,88 @@ async def fetch_studio_addresses() -> StudioAddresses:
     return result
 
 
-async def download_media(path: str) -> bytes:
+class MediaTooLargeError(httpx.HTTPError):
+    """Raised when a media file exceeds the configured download size limit."""
+
+
+async def _download(client: httpx.AsyncClient, path: str, max_bytes: int) -> bytes:
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        async with client.stream(
+            "GET", _request_path(path), headers=_headers()
+        ) as response:
+            response.raise_for_status()
+            declared = response.headers.get("content-length", "")
+            if declared.isdigit() and int(declared) > max_bytes:
+                outcome = "too_large"
+                raise MediaTooLargeError(f"Media {path} is larger than {max_bytes} bytes")
+            buffer = bytearray()
+            async for chunk in response.aiter_bytes():
+                buffer.extend(chunk)
+                if len(buffer) > max_bytes:
+                    outcome = "too_large"
+                    raise MediaTooLargeError(
+                        f"Media {path} is larger than {max_bytes} bytes"
+                    )
+        outcome = "ok"
+        return bytes(buffer)
+    finally:
+        metrics.observe(
+            "bot_media_download_seconds", time.perf_counter() - started, outcome=outcome
+        )
+
+
+async def download_media(path: str, *, max_bytes: int | None = None) -> bytes:
+    limit = max_bytes if max_bytes is not None else _settings.media_max_bytes
     async with httpx.AsyncClient(
         base_url=_settings.api_base_url, timeout=10.0
     ) as client:
-        response = await client.get(_request_path(path), headers=_headers())
-        response.raise_for_status()
-        return response.content
+        return await _download(client, path, limit)
+
+
+async def download_media_many(
+    paths: Sequence[str],
+    *,
+    max_concurrency: int | None = None,
+    max_bytes: int | None = None,
+) -> list[bytes | None]:
+    """Download several media files concurrently over a shared connection pool.
+
+    Results keep the order of ``paths``; a file that failed to download or
+    exceeded ``max_bytes`` is returned as ``None``.
+    """
+
+    if not paths:
+        return []
+    limit = max_bytes if max_bytes is not None else _settings.media_max_bytes
+    concurrency = max(
+        1,
+        max_concurrency
+        if max_concurrency is not None
+        else _settings.media_download_concurrency,
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+
+    async with httpx.AsyncClient(
+        base_url=_settings.api_base_url,
+        timeout=10.0,
+        limits=httpx.Limits(max_connections=concurrency),
+    ) as client:
+
+        async def fetch(path: str) -> bytes | None:
+            async with semaphore:
+                try:
+                    return await _download(client, path, limit)
+                except httpx.HTTPError as error:
+                    logger.warning("Failed to download media %s: %s", path, error)
+                    return None
+
+        results = await asyncio.gather(*(fetch(path) for path in paths))
+
+    metrics.observe("bot_media_batch_download_seconds", time.perf_counter() - started)
+    return list(results)
 
 
 __all__ = [
@@ -267,17 +670,24 @@ __all__ = [
     "Subscription",
     "AddressMedia",
     "StudioAddresses",
+    "UserOverview",
     "PaymentResponse",
     "fetch_products",
     "fetch_directions",
     "fetch_slots",
+    "invalidate_catalogue",
     "fetch_bookings",
     "fetch_subscriptions",
     "create_booking",
     "cancel_booking",
     "sync_user",
+    "batch",
+    "fetch_user_overview",
     "create_subscription_payment",
     "confirm_payment",
     "fetch_studio_addresses",
     "download_media",
+    "download_media_many",
+    "MediaTooLargeError",
+    "CircuitOpenError",
 ]
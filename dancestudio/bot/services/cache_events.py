@@ -0,0 +1,73 @@
+"""Subscribe to backend change events and invalidate cached catalogue data."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+
+from dancestudio.bot.services import api_client
+from dancestudio.bot.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+_KNOWN_KINDS = frozenset({"directions", "products", "slots"})
+_RECONNECT_DELAY = 5.0
+
+
+def handle_event_message(raw: bytes | str) -> None:
+    """Apply one published batch of change events to the bot caches."""
+
+    try:
+        events = json.loads(raw)
+    except (TypeError, ValueError):
+        logger.warning("Ignoring malformed cache event: %r", raw)
+        api_client.invalidate_catalogue()
+        return
+    if isinstance(events, dict):
+        events = [events]
+    if not isinstance(events, list):
+        api_client.invalidate_catalogue()
+        return
+    for event in events:
+        kind = event.get("kind") if isinstance(event, dict) else None
+        if kind not in _KNOWN_KINDS:
+            api_client.invalidate_catalogue()
+            continue
+        direction_id = event.get("direction_id")
+        api_client.invalidate_catalogue(
+            kind, direction_id=direction_id if isinstance(direction_id, int) else None
+        )
+    metrics.increment("bot_cache_events_received_total", value=len(events))
+
+
+async def listen_for_cache_events(redis_url: str, channel: str) -> None:
+    """Listen to ``channel`` forever, reconnecting after failures.
+
+    Events may be missed while disconnected, so every (re)connect starts from an
+    empty cache.
+    """
+
+    from redis.asyncio import Redis
+
+    while True:
+        client = Redis.from_url(redis_url)
+        try:
+            async with client.pubsub() as pubsub:
+                await pubsub.subscribe(channel)
+                api_client.invalidate_catalogue()
+                logger.info("Subscribed to cache events on %s", channel)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        handle_event_message(message.get("data"))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Cache event subscription failed, reconnecting")
+            api_client.invalidate_catalogue()
+            await asyncio.sleep(_RECONNECT_DELAY)
+        finally:
+            await client.aclose()
+
+
+__all__ = ["handle_event_message", "listen_for_cache_events"]
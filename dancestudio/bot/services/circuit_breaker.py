@@ -0,0 +1,116 @@
+"""Circuit breaker guarding bot calls to the backend API."""
+
+from __future__ import annotations
+
+import logging
+import time
+from enum import Enum
+from typing import Callable
+
+from dancestudio.bot.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+_STATE_GAUGE_VALUES = {
+    CircuitState.closed: 0,
+    CircuitState.half_open: 1,
+    CircuitState.open: 2,
+}
+
+
+class CircuitBreaker:
+    """Fail fast while the backend keeps failing and probe it back to health.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and every
+    call is rejected for ``reset_timeout`` seconds. Then a single probe call is
+    let through (half-open): its success closes the circuit, its failure opens
+    it again. A probe that ends without an outcome, e.g. because the caller was
+    cancelled, must be handed back with :meth:`release` so another one can go.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be positive")
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = CircuitState.closed
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        metrics.set_gauge("bot_circuit_state", 0, circuit=name)
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state == CircuitState.open
+            and self._clock() - self._opened_at >= self._reset_timeout
+        ):
+            self._transition(CircuitState.half_open)
+        return self._state
+
+    def allow(self) -> bool:
+        """Return ``True`` when a call may be sent to the backend."""
+
+        state = self.state
+        if state == CircuitState.closed:
+            return True
+        if state == CircuitState.half_open and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._probe_in_flight = False
+        if self._state != CircuitState.closed:
+            self._transition(CircuitState.closed)
+
+    def release(self) -> None:
+        """Give back an allowed call that finished without a result."""
+
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_in_flight = False
+        if self._state == CircuitState.half_open or (
+            self._state == CircuitState.closed
+            and self._failures >= self._failure_threshold
+        ):
+            self._opened_at = self._clock()
+            self._transition(CircuitState.open)
+
+    def _transition(self, state: CircuitState) -> None:
+        previous = self._state
+        self._state = state
+        logger.warning(
+            "Circuit %s changed state: %s -> %s", self.name, previous.value, state.value
+        )
+        metrics.increment(
+            "bot_circuit_transitions_total",
+            circuit=self.name,
+            from_state=previous.value,
+            to_state=state.value,
+        )
+        metrics.set_gauge(
+            "bot_circuit_state", _STATE_GAUGE_VALUES[state], circuit=self.name
+        )
+
+
+__all__ = ["CircuitBreaker", "CircuitState"]
@@ -0,0 +1,59 @@
+"""Cache of Telegram ``file_id`` values for media uploaded by the bot."""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+from aiogram.types import Message
+
+
+class MediaFileIdCache:
+    """Remember the ``file_id`` Telegram assigned to an uploaded media item.
+
+    Entries are keyed by the backend media id and store the content version the
+    file was uploaded from, so a replaced file is never served from the cache.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[int, tuple[str, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, media_id: int, version: str) -> str | None:
+        entry = self._entries.get(media_id)
+        if entry is None or entry[0] != version:
+            return None
+        return entry[1]
+
+    def store(self, media_id: int, version: str, file_id: str) -> None:
+        self._entries[media_id] = (version, file_id)
+
+    def discard(self, media_id: int) -> None:
+        self._entries.pop(media_id, None)
+
+    def retain(self, media_ids: Iterable[int]) -> None:
+        """Drop entries for media that is no longer published by the backend."""
+
+        keep = set(media_ids)
+        for media_id in [key for key in self._entries if key not in keep]:
+            del self._entries[media_id]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def extract_file_id(message: Message) -> str | None:
+    """Return the ``file_id`` of the photo or video contained in ``message``."""
+
+    if message.photo:
+        return message.photo[-1].file_id
+    if message.video:
+        return message.video.file_id
+    return None
+
+
+file_id_cache = MediaFileIdCache()
+
+
+__all__ = ["MediaFileIdCache", "extract_file_id", "file_id_cache"]
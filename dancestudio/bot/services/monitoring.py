@@ -0,0 +1,49 @@
+"""Expose bot metrics over HTTP and in periodic log summaries."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from aiohttp import web
+
+from dancestudio.bot.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+async def _metrics_view(request: web.Request) -> web.Response:
+    response = web.Response(text=metrics.render_prometheus())
+    response.headers["Content-Type"] = _CONTENT_TYPE
+    return response
+
+
+def create_metrics_app() -> web.Application:
+    app = web.Application()
+    app.router.add_get("/metrics", _metrics_view)
+    return app
+
+
+async def start_metrics_server(host: str, port: int) -> web.AppRunner:
+    """Serve ``/metrics`` in the Prometheus text format and return the runner."""
+
+    runner = web.AppRunner(create_metrics_app())
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    logger.info("Serving bot metrics on %s:%s/metrics", host, port)
+    return runner
+
+
+async def log_metrics_periodically(interval: float) -> None:
+    """Log p50/p95/p99 of every latency series each ``interval`` seconds."""
+
+    while True:
+        await asyncio.sleep(interval)
+        for line in metrics.format_summary():
+            logger.info("latency %s", line)
+
+
+__all__ = ["create_metrics_app", "start_metrics_server", "log_metrics_periodically"]
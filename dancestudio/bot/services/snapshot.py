@@ -0,0 +1,95 @@
+"""Last-known-good copies of catalogue data used while the backend is down."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class StaleList(list):
+    """A list served from a snapshot instead of a live backend response."""
+
+    stale = True
+
+    def __init__(self, items: list[Any], saved_at: float) -> None:
+        super().__init__(items)
+        self.saved_at = saved_at
+
+
+def is_stale(data: object) -> bool:
+    """Return ``True`` when ``data`` came from a snapshot."""
+
+    return bool(getattr(data, "stale", False))
+
+
+class SnapshotStore:
+    """Keep the latest successful response per key, optionally mirrored to disk."""
+
+    def __init__(self, path: str | os.PathLike[str] | None = None) -> None:
+        self._path = Path(path) if path else None
+        self._entries: dict[str, tuple[float, list[Any]]] = {}
+        self._loaded = False
+
+    def _load(self) -> None:
+        self._loaded = True
+        if self._path is None or not self._path.exists():
+            return
+        try:
+            raw = json.loads(self._path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as error:
+            logger.warning("Failed to read schedule snapshot %s: %s", self._path, error)
+            return
+        if not isinstance(raw, dict):
+            return
+        for key, entry in raw.items():
+            if (
+                isinstance(entry, dict)
+                and isinstance(entry.get("saved_at"), (int, float))
+                and isinstance(entry.get("data"), list)
+            ):
+                self._entries.setdefault(key, (float(entry["saved_at"]), entry["data"]))
+
+    def _persist(self) -> None:
+        if self._path is None:
+            return
+        payload = {
+            key: {"saved_at": saved_at, "data": data}
+            for key, (saved_at, data) in self._entries.items()
+        }
+        tmp_path = self._path.with_suffix(self._path.suffix + ".tmp")
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, self._path)
+        except OSError as error:
+            logger.warning("Failed to write schedule snapshot %s: %s", self._path, error)
+
+    def remember(self, key: str, data: list[Any]) -> None:
+        if not self._loaded:
+            self._load()
+        previous = self._entries.get(key)
+        self._entries[key] = (time.time(), list(data))
+        if previous is None or previous[1] != data:
+            self._persist()
+
+    def recall(self, key: str) -> StaleList | None:
+        if not self._loaded:
+            self._load()
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        saved_at, data = entry
+        return StaleList(data, saved_at)
+
+    def forget(self, key: str) -> None:
+        if self._entries.pop(key, None) is not None:
+            self._persist()
+
+
+__all__ = ["SnapshotStore", "StaleList", "is_stale"]
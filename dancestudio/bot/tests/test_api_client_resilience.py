@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import asyncio
+import os
+
+import httpx
+import pytest
+
+os.environ.setdefault("PAYMENT_PROVIDER", "telegram")
+os.environ.setdefault("PAYMENT_CURRENCY", "RUB")
+os.environ.setdefault("PAYMENT_PROVIDER_TOKEN", "test-token")
+
+from ..services import api_client
+from ..services.circuit_breaker import CircuitBreaker, CircuitState
+from ..utils import metrics
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def backend(monkeypatch: pytest.MonkeyPatch):
+    metrics.reset()
+    calls: list[tuple[str, str]] = []
+    responses: list[object] = []
+    original = httpx.AsyncClient
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append((request.method, request.url.path))
+        outcome = responses.pop(0) if responses else httpx.Response(200, json=[])
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome  # type: ignore[return-value]
+
+    def factory(*args, **kwargs):
+        kwargs["transport"] = httpx.MockTransport(handler)
+        return original(*args, **kwargs)
+
+    clock = _Clock()
+    monkeypatch.setattr(api_client.httpx, "AsyncClient", factory)
+    monkeypatch.setattr(api_client._settings, "api_retries", 2)
+    monkeypatch.setattr(api_client._settings, "api_retry_backoff", 0.0)
+    monkeypatch.setattr(api_client, "_profiles", {})
+    monkeypatch.setattr(
+        api_client,
+        "_breaker",
+        CircuitBreaker("test", failure_threshold=3, reset_timeout=10.0, clock=clock),
+    )
+    return calls, responses, clock
+
+
+@pytest.mark.asyncio()
+async def test_get_is_retried_on_gateway_errors(backend) -> None:
+    calls, responses, _ = backend
+    responses.extend([httpx.Response(503), httpx.ConnectError("down")])
+
+    assert await api_client.fetch_bookings(tg_id=1) == []
+    assert len(calls) == 3
+    retries = metrics.get_counter(
+        "bot_api_retries_total", endpoint="/bot/users/{id}/bookings"
+    )
+    assert retries == 2
+
+
+@pytest.mark.asyncio()
+async def test_post_is_not_retried(backend) -> None:
+    calls, responses, _ = backend
+    responses.append(httpx.Response(503))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await api_client.cancel_booking(tg_id=1, booking_id=5)
+    assert calls == [("POST", "/api/v1/bot/bookings/5/cancel")]
+
+
+@pytest.mark.asyncio()
+async def test_client_errors_are_not_retried(backend) -> None:
+    calls, responses, _ = backend
+    responses.append(httpx.Response(404))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await api_client.fetch_bookings(tg_id=1)
+    assert len(calls) == 1
+    assert api_client._breaker.state == CircuitState.closed
+
+
+@pytest.mark.asyncio()
+async def test_circuit_opens_and_recovers_after_probe(backend) -> None:
+    calls, responses, clock = backend
+    responses.extend([httpx.Response(500)] * 3)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await api_client.cancel_booking(tg_id=1, booking_id=1)
+    with pytest.raises(httpx.HTTPStatusError):
+        await api_client.cancel_booking(tg_id=1, booking_id=1)
+    with pytest.raises(httpx.HTTPStatusError):
+        await api_client.cancel_booking(tg_id=1, booking_id=1)
+    assert api_client._breaker.state == CircuitState.open
+
+    with pytest.raises(api_client.CircuitOpenError):
+        await api_client.fetch_bookings(tg_id=1)
+    assert len(calls) == 3
+
+    clock.now = 10.0
+    assert await api_client.fetch_bookings(tg_id=1) == []
+    assert api_client._breaker.state == CircuitState.closed
+    assert (
+        metrics.get_counter(
+            "bot_circuit_transitions_total",
+            circuit="test",
+            from_state="closed",
+            to_state="open",
+        )
+        == 1
+    )
+
+
+def test_half_open_allows_single_probe() -> None:
+    clock = _Clock()
+    breaker = CircuitBreaker(
+        "probe", failure_threshold=1, reset_timeout=5.0, clock=clock
+    )
+
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    clock.now = 5.0
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.open
+
+
+@pytest.mark.asyncio()
+async def test_sync_user_skips_backend_when_profile_is_known(backend) -> None:
+    calls, responses, _ = backend
+    profile = {"id": 7, "tg_id": 1, "full_name": "Anna", "age": 30, "phone": None}
+    responses.extend(
+        [
+            httpx.Response(200, json=profile),
+            httpx.Response(200, json={**profile, "full_name": "Anna K"}),
+        ]
+    )
+
+    assert (await api_client.sync_user(tg_id=1, full_name="Anna"))["age"] == 30
+    assert (await api_client.sync_user(tg_id=1, full_name="Anna"))["id"] == 7
+    assert (await api_client.sync_user(tg_id=1))["full_name"] == "Anna"
+    assert len(calls) == 1
+
+    updated = await api_client.sync_user(tg_id=1, full_name="Anna K")
+    assert updated["full_name"] == "Anna K"
+    assert len(calls) == 2
+    assert metrics.get_counter("bot_user_sync_skipped_total") == 2
+
+
+@pytest.mark.asyncio()
+async def test_user_overview_is_loaded_in_one_round_trip(backend) -> None:
+    calls, responses, _ = backend
+    profile = {"id": 7, "tg_id": 1, "full_name": "Anna", "age": None, "phone": None}
+    booking = {"id": 3, "status": "confirmed"}
+    responses.extend(
+        [
+            httpx.Response(
+                200,
+                json=[
+                    {"status": 200, "body": profile},
+                    {"status": 200, "body": [booking]},
+                    {"status": 500, "body": {"detail": "boom"}},
+                ],
+            ),
+            httpx.Response(200, json=[{"status": 404, "body": {"detail": "missing"}}]),
+        ]
+    )
+
+    overview = await api_client.fetch_user_overview(tg_id=1, full_name="Anna")
+
+    assert calls == [("POST", "/api/v1/bot/batch")]
+    assert overview == {
+        "profile": profile,
+        "bookings": [booking],
+        "subscriptions": None,
+    }
+
+    with pytest.raises(httpx.HTTPStatusError) as error:
+        await api_client.fetch_user_overview(
+            tg_id=1, full_name="Anna", include_subscriptions=False
+        )
+    assert error.value.response.status_code == 404
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio()
+async def test_cancelled_probe_does_not_block_the_circuit(
+    backend, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls, responses, clock = backend
+    responses.extend([httpx.Response(500)] * 3)
+    for _ in range(3):
+        with pytest.raises(httpx.HTTPStatusError):
+            await api_client.cancel_booking(tg_id=1, booking_id=1)
+    clock.now = 10.0
+    original_send = api_client._send
+
+    async def hanging_send(*args, **kwargs):
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(api_client, "_send", hanging_send)
+    probe = asyncio.create_task(api_client.fetch_bookings(tg_id=1))
+    await asyncio.sleep(0)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    monkeypatch.setattr(api_client, "_send", original_send)
+    assert await api_client.fetch_bookings(tg_id=1) == []
+    assert api_client._breaker.state == CircuitState.closed
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+import os
+
+import httpx
+import pytest
+
+os.environ.setdefault("PAYMENT_PROVIDER", "telegram")
+os.environ.setdefault("PAYMENT_CURRENCY", "RUB")
+os.environ.setdefault("PAYMENT_PROVIDER_TOKEN", "test-token")
+
+from ..services import api_client
+from ..services.cache_events import handle_event_message
+from ..services.circuit_breaker import CircuitBreaker
+from ..services.snapshot import SnapshotStore
+
+
+@pytest.fixture()
+def counting_backend(monkeypatch: pytest.MonkeyPatch):
+    calls: list[str] = []
+    original = httpx.AsyncClient
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        direction_id = request.url.params.get("direction_id")
+        calls.append(f"{request.url.path}:{direction_id}")
+        return httpx.Response(200, json=[{"id": 1, "is_active": True}])
+
+    def factory(*args, **kwargs):
+        kwargs["transport"] = httpx.MockTransport(handler)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(api_client.httpx, "AsyncClient", factory)
+    monkeypatch.setattr(api_client._settings, "catalogue_cache_ttl", 600.0)
+    monkeypatch.setattr(api_client, "_catalogue_cache", {})
+    monkeypatch.setattr(api_client, "_snapshots", SnapshotStore())
+    monkeypatch.setattr(api_client, "_breaker", CircuitBreaker("events-test"))
+    return calls
+
+
+@pytest.mark.asyncio()
+async def test_cached_catalogue_is_reused(counting_backend) -> None:
+    await api_client.fetch_directions()
+    await api_client.fetch_directions()
+    await api_client.fetch_products()
+    await api_client.fetch_products()
+
+    assert len(counting_backend) == 2
+
+
+@pytest.mark.asyncio()
+async def test_slot_event_invalidates_only_its_direction(counting_backend) -> None:
+    await api_client.fetch_slots(direction_id=1)
+    await api_client.fetch_slots(direction_id=2)
+    await api_client.fetch_directions()
+    counting_backend.clear()
+
+    handle_event_message(json.dumps([{"kind": "slots", "id": 10, "direction_id": 1}]))
+    await api_client.fetch_slots(direction_id=1)
+    await api_client.fetch_slots(direction_id=2)
+    await api_client.fetch_directions()
+
+    assert counting_backend == ["/api/v1/slots:1"]
+
+
+@pytest.mark.asyncio()
+async def test_unknown_or_malformed_events_clear_everything(counting_backend) -> None:
+    await api_client.fetch_directions()
+    await api_client.fetch_products()
+    counting_backend.clear()
+
+    handle_event_message(b"not json")
+    await api_client.fetch_directions()
+    await api_client.fetch_products()
+
+    assert len(counting_backend) == 2
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import os
+
+os.environ.setdefault("PAYMENT_PROVIDER", "telegram")
+os.environ.setdefault("PAYMENT_CURRENCY", "RUB")
+os.environ.setdefault("PAYMENT_PROVIDER_TOKEN", "test-token")
+
+from ..services.media_cache import MediaFileIdCache
+
+
+def test_cache_returns_file_id_for_matching_version() -> None:
+    cache = MediaFileIdCache()
+    cache.store(1, "v1", "file-1")
+
+    assert cache.get(1, "v1") == "file-1"
+    assert cache.get(1, "v2") is None
+    assert cache.get(2, "v1") is None
+
+
+def test_cache_replaces_outdated_version() -> None:
+    cache = MediaFileIdCache()
+    cache.store(1, "v1", "file-1")
+    cache.store(1, "v2", "file-2")
+
+    assert cache.get(1, "v1") is None
+    assert cache.get(1, "v2") == "file-2"
+    assert len(cache) == 1
+
+
+def test_retain_drops_removed_media() -> None:
+    cache = MediaFileIdCache()
+    cache.store(1, "v1", "file-1")
+    cache.store(2, "v1", "file-2")
+
+    cache.retain([2, 3])
+
+    assert cache.get(1, "v1") is None
+    assert cache.get(2, "v1") == "file-2"
+
+    cache.discard(2)
+    assert len(cache) == 0
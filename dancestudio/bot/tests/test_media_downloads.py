@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import os
+
+import httpx
+import pytest
+
+os.environ.setdefault("PAYMENT_PROVIDER", "telegram")
+os.environ.setdefault("PAYMENT_CURRENCY", "RUB")
+os.environ.setdefault("PAYMENT_PROVIDER_TOKEN", "test-token")
+
+from ..services import api_client
+from ..utils import metrics
+
+
+def _patch_transport(monkeypatch: pytest.MonkeyPatch, handler) -> None:
+    original = httpx.AsyncClient
+
+    def factory(*args, **kwargs):
+        kwargs["transport"] = httpx.MockTransport(handler)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(api_client.httpx, "AsyncClient", factory)
+
+
+@pytest.mark.asyncio()
+async def test_download_media_many_preserves_order(monkeypatch: pytest.MonkeyPatch) -> None:
+    metrics.reset()
+    running = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        name = request.url.path.rsplit("/", 1)[-1]
+        # Later files finish first to make sure ordering does not rely on timing.
+        await asyncio.sleep(0.01 * (5 - int(name)))
+        running -= 1
+        return httpx.Response(200, content=f"file-{name}".encode())
+
+    _patch_transport(monkeypatch, handler)
+
+    paths = [f"/media/{index}" for index in range(5)]
+    results = await api_client.download_media_many(paths, max_concurrency=2)
+
+    assert results == [f"file-{index}".encode() for index in range(5)]
+    assert peak <= 2
+    count, _ = metrics.get_observations("bot_media_download_seconds", outcome="ok")
+    assert count == 5
+
+
+@pytest.mark.asyncio()
+async def test_download_media_many_skips_failed_and_oversized(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    metrics.reset()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("missing"):
+            return httpx.Response(404)
+        if request.url.path.endswith("large"):
+            return httpx.Response(200, content=b"x" * 64)
+        return httpx.Response(200, content=b"ok")
+
+    _patch_transport(monkeypatch, handler)
+
+    results = await api_client.download_media_many(
+        ["/media/missing", "/media/large", "/media/small"], max_bytes=16
+    )
+
+    assert results == [None, None, b"ok"]
+    assert metrics.get_observations("bot_media_download_seconds", outcome="too_large")[0] == 1
+    assert metrics.get_observations("bot_media_download_seconds", outcome="error")[0] == 1
+
+
+@pytest.mark.asyncio()
+async def test_download_media_enforces_size_limit(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=b"x" * 32)
+
+    _patch_transport(monkeypatch, handler)
+
+    with pytest.raises(api_client.MediaTooLargeError):
+        await api_client.download_media("/media/file", max_bytes=8)
+    assert await api_client.download_media("/media/file", max_bytes=32) == b"x" * 32
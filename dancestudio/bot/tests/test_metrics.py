@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import os
+
+import httpx
+import pytest
+
+os.environ.setdefault("PAYMENT_PROVIDER", "telegram")
+os.environ.setdefault("PAYMENT_CURRENCY", "RUB")
+os.environ.setdefault("PAYMENT_PROVIDER_TOKEN", "test-token")
+
+from aiogram.types import CallbackQuery, User
+
+from ..middlewares.metrics import HandlerMetricsMiddleware
+from ..services import api_client
+from ..utils import feedback, metrics
+
+
+def test_quantiles_and_prometheus_rendering() -> None:
+    metrics.reset()
+    for value in range(1, 101):
+        metrics.observe("latency_seconds", value / 1000, handler="my_bookings")
+    metrics.increment("dropped_total", reason="full")
+    metrics.set_gauge("queue_depth", 3)
+
+    quantiles = metrics.get_quantiles("latency_seconds", handler="my_bookings")
+    assert quantiles == {0.5: 0.05, 0.95: 0.095, 0.99: 0.099}
+
+    text = metrics.render_prometheus()
+    assert '# TYPE latency_seconds summary' in text
+    assert 'latency_seconds{handler="my_bookings",quantile="0.95"} 0.095000' in text
+    assert 'latency_seconds_count{handler="my_bookings"} 100' in text
+    assert 'dropped_total{reason="full"} 1' in text
+    assert "queue_depth 3" in text
+
+    (line,) = metrics.format_summary()
+    assert "p50=50.0ms" in line and "p99=99.0ms" in line
+
+
+@pytest.mark.asyncio()
+async def test_handler_metrics_middleware_uses_handler_name() -> None:
+    metrics.reset()
+
+    async def my_bookings(event, data):
+        return "done"
+
+    class _Handler:
+        callback = my_bookings
+
+    middleware = HandlerMetricsMiddleware()
+    result = await middleware(my_bookings, object(), {"handler": _Handler()})  # type: ignore[arg-type]
+
+    assert result == "done"
+    count, _ = metrics.get_observations(
+        "bot_handler_duration_seconds", handler="my_bookings", outcome="ok"
+    )
+    assert count == 1
+
+
+def _callback() -> CallbackQuery:
+    user = User(id=1, is_bot=False, first_name="Anna")
+    return CallbackQuery(id="1", from_user=user, chat_instance="1", data="my_bookings")
+
+
+@pytest.mark.asyncio()
+async def test_time_to_first_feedback_is_recorded_once() -> None:
+    metrics.reset()
+
+    async def my_bookings(event, data):
+        assert not feedback.acknowledged()
+        feedback.mark_acknowledged()
+        feedback.mark_acknowledged()
+        assert feedback.acknowledged()
+
+    async def show_rules(event, data):
+        return None
+
+    middleware = HandlerMetricsMiddleware()
+    for callback in (my_bookings, show_rules):
+
+        class _Handler:
+            pass
+
+        _Handler.callback = callback
+        await middleware(callback, _callback(), {"handler": _Handler()})  # type: ignore[arg-type]
+
+    count, _ = metrics.get_observations(
+        "bot_time_to_first_feedback_seconds", handler="my_bookings"
+    )
+    assert count == 1
+    assert metrics.get_counter("bot_callbacks_unanswered_total", handler="show_rules") == 1
+    assert metrics.get_counter("bot_callbacks_unanswered_total", handler="my_bookings") == 0
+    assert not feedback.acknowledged()
+
+
+@pytest.mark.asyncio()
+async def test_api_calls_are_timed_per_endpoint(monkeypatch: pytest.MonkeyPatch) -> None:
+    metrics.reset()
+    original = httpx.AsyncClient
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/subscriptions"):
+            return httpx.Response(404)
+        return httpx.Response(200, json=[])
+
+    def factory(*args, **kwargs):
+        kwargs["transport"] = httpx.MockTransport(handler)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(api_client.httpx, "AsyncClient", factory)
+
+    assert await api_client.fetch_bookings(tg_id=123) == []
+    with pytest.raises(httpx.HTTPStatusError):
+        await api_client.fetch_subscriptions(tg_id=123)
+
+    ok_count, _ = metrics.get_observations(
+        "bot_api_request_duration_seconds",
+        method="GET",
+        endpoint="/bot/users/{id}/bookings",
+        status="200",
+    )
+    failed_count, _ = metrics.get_observations(
+        "bot_api_request_duration_seconds",
+        method="GET",
+        endpoint="/bot/users/{id}/subscriptions",
+        status="404",
+    )
+    assert ok_count == 1
+    assert failed_count == 1
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+os.environ.setdefault("PAYMENT_PROVIDER", "telegram")
+os.environ.setdefault("PAYMENT_CURRENCY", "RUB")
+os.environ.setdefault("PAYMENT_PROVIDER_TOKEN", "test-token")
+
+from aiogram import Bot, Router
+from aiogram.filters import StateFilter
+from aiogram.fsm.context import FSMContext
+from aiogram.types import Chat, Message, Update
+
+from ..config import get_settings
+from ..middlewares.ordering import ChatOrderingMiddleware
+from ..middlewares.setup import build_dispatcher
+from ..utils import metrics
+
+
+def _data(chat_id: int) -> dict[str, object]:
+    return {"event_chat": Chat(id=chat_id, type="private")}
+
+
+@pytest.mark.asyncio()
+async def test_updates_of_one_chat_run_in_order() -> None:
+    middleware = ChatOrderingMiddleware(max_concurrency=10, max_queue_size=10)
+    order: list[str] = []
+
+    async def handler(event: object, data: dict[str, object]) -> None:
+        order.append(f"start:{event}")
+        await asyncio.sleep(0.01 if event == "first" else 0)
+        order.append(f"end:{event}")
+
+    await asyncio.gather(
+        middleware(handler, "first", _data(1)),  # type: ignore[arg-type]
+        middleware(handler, "second", _data(1)),  # type: ignore[arg-type]
+    )
+
+    assert order == ["start:first", "end:first", "start:second", "end:second"]
+    assert middleware.queued == 0
+
+
+@pytest.mark.asyncio()
+async def test_different_chats_run_concurrently() -> None:
+    middleware = ChatOrderingMiddleware(max_concurrency=10, max_queue_size=10)
+    both_started = asyncio.Event()
+    started: set[int] = set()
+
+    async def handler(event: int, data: dict[str, object]) -> None:
+        started.add(event)
+        if len(started) == 2:
+            both_started.set()
+        await asyncio.wait_for(both_started.wait(), timeout=1)
+
+    await asyncio.gather(
+        middleware(handler, 1, _data(1)),  # type: ignore[arg-type]
+        middleware(handler, 2, _data(2)),  # type: ignore[arg-type]
+    )
+
+    assert started == {1, 2}
+
+
+@pytest.mark.asyncio()
+async def test_full_chat_queue_drops_updates() -> None:
+    metrics.reset()
+    middleware = ChatOrderingMiddleware(max_concurrency=10, max_queue_size=2)
+    release = asyncio.Event()
+    handled: list[int] = []
+
+    async def handler(event: int, data: dict[str, object]) -> int:
+        await release.wait()
+        handled.append(event)
+        return event
+
+    tasks = [
+        asyncio.create_task(
+            middleware(handler, index, _data(7))  # type: ignore[arg-type]
+        )
+        for index in range(3)
+    ]
+    await asyncio.sleep(0)
+    assert middleware.queue_depth(7) == 2
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert results == [0, 1, None]
+    assert handled == [0, 1]
+    dropped = metrics.get_counter("bot_updates_dropped_total", reason="chat_queue_full")
+    assert dropped == 1
+
+
+@pytest.mark.asyncio()
+async def test_global_concurrency_limit() -> None:
+    middleware = ChatOrderingMiddleware(max_concurrency=1, max_queue_size=10)
+    running = 0
+    peak = 0
+
+    async def handler(event: int, data: dict[str, object]) -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0)
+        running -= 1
+
+    await asyncio.gather(
+        *(
+            middleware(handler, chat_id, _data(chat_id))  # type: ignore[arg-type]
+            for chat_id in range(5)
+        )
+    )
+
+    assert peak == 1
+    assert middleware.in_flight == 0
+
+
+@pytest.mark.asyncio()
+async def test_queued_update_is_routed_by_state_set_before_it() -> None:
+    router = Router()
+    handled: list[str] = []
+
+    @router.message(StateFilter(None))
+    async def start(message: Message, state: FSMContext) -> None:
+        handled.append(f"start:{message.text}")
+        await asyncio.sleep(0.01)
+        await state.set_state("waiting")
+
+    @router.message(StateFilter("waiting"))
+    async def answer(message: Message) -> None:
+        handled.append(f"answer:{message.text}")
+
+    dp = build_dispatcher(get_settings(), router)
+    bot = Bot("42:TEST")
+
+    def update(update_id: int, text: str) -> Update:
+        return Update.model_validate(
+            {
+                "update_id": update_id,
+                "message": {
+                    "message_id": update_id,
+                    "date": datetime.now(timezone.utc),
+                    "chat": {"id": 1, "type": "private"},
+                    "from": {"id": 1, "is_bot": False, "first_name": "Test"},
+                    "text": text,
+                },
+            }
+        )
+
+    await asyncio.gather(
+        dp.feed_update(bot, update(1, "first")),
+        dp.feed_update(bot, update(2, "second")),
+    )
+
+    assert handled == ["start:first", "answer:second"]
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+
+os.environ.setdefault("PAYMENT_PROVIDER", "telegram")
+os.environ.setdefault("PAYMENT_CURRENCY", "RUB")
+os.environ.setdefault("PAYMENT_PROVIDER_TOKEN", "test-token")
+
+from aiogram.types import CallbackQuery, Chat, Message, Update, User
+
+from ..middlewares.shedding import LoadSheddingMiddleware, drop_pending_updates
+from ..utils import metrics
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _update(update_id: int, data: str = "my_bookings", user_id: int = 1) -> Update:
+    callback = CallbackQuery(
+        id=str(update_id),
+        from_user=User(id=user_id, is_bot=False, first_name="Anna"),
+        chat_instance="1",
+        data=data,
+    )
+    return Update(update_id=update_id, callback_query=callback)
+
+
+def _dropped(reason: str) -> float:
+    return metrics.get_counter("bot_updates_dropped_total", reason=reason)
+
+
+async def _dispatch(
+    middleware: LoadSheddingMiddleware, update: Update, handler
+) -> object:
+    async def to_callback(event: Update, data: dict) -> object:
+        return await middleware(handler, event.callback_query, dict(data))
+
+    return await middleware(to_callback, update, {})
+
+
+@pytest.mark.asyncio()
+async def test_duplicate_taps_are_collapsed_while_in_flight(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    metrics.reset()
+    answers: list[str] = []
+
+    async def fake_answer(self, text=None, **kwargs):
+        answers.append(self.id)
+
+    monkeypatch.setattr(CallbackQuery, "answer", fake_answer)
+    middleware = LoadSheddingMiddleware()
+    release = asyncio.Event()
+    handled: list[str] = []
+
+    async def handler(event: CallbackQuery, data: dict) -> None:
+        handled.append(event.id)
+        await release.wait()
+
+    first = asyncio.create_task(_dispatch(middleware, _update(1), handler))
+    await asyncio.sleep(0)
+    await _dispatch(middleware, _update(2), handler)
+    other_user = asyncio.create_task(
+        _dispatch(middleware, _update(3, user_id=2), handler)
+    )
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(first, other_user)
+
+    assert handled == ["1", "3"]
+    assert answers == ["2"]
+    assert middleware.in_flight == 0
+    assert _dropped("duplicate_callback") == 1
+
+
+@pytest.mark.asyncio()
+async def test_callbacks_that_waited_too_long_are_dropped() -> None:
+    metrics.reset()
+    clock = _Clock()
+    middleware = LoadSheddingMiddleware(max_callback_age=10.0, clock=clock)
+    handled: list[str] = []
+
+    async def handler(event: CallbackQuery, data: dict) -> None:
+        handled.append(event.id)
+
+    async def slow_queue(event: Update, data: dict) -> object:
+        clock.now += 11.0
+        return await middleware(handler, event.callback_query, dict(data))
+
+    await _dispatch(middleware, _update(1), handler)
+    await middleware(slow_queue, _update(2), {})
+
+    assert handled == ["1"]
+    assert _dropped("stale_callback") == 1
+
+
+@pytest.mark.asyncio()
+async def test_backlog_callbacks_are_dropped_after_restart() -> None:
+    metrics.reset()
+    middleware = LoadSheddingMiddleware(max_callback_age=10.0, pending_updates=2)
+    handled: list[str] = []
+
+    async def handler(event: CallbackQuery, data: dict) -> None:
+        handled.append(event.id)
+
+    def backlog_update(update_id: int) -> Update:
+        update = _update(update_id, data=f"slot:{update_id}")
+        menu = Message(
+            message_id=update_id,
+            date=datetime.now(timezone.utc) - timedelta(hours=1),
+            chat=Chat(id=1, type="private"),
+        )
+        callback = update.callback_query.model_copy(update={"message": menu})
+        return update.model_copy(update={"callback_query": callback})
+
+    # Received instantly by this process, but queued at Telegram for an hour.
+    for update_id in (500, 501):
+        await _dispatch(middleware, backlog_update(update_id), handler)
+    await _dispatch(middleware, _update(502), handler)
+
+    assert handled == ["502"]
+    assert _dropped("stale_callback") == 2
+
+
+@pytest.mark.asyncio()
+async def test_pending_updates_are_counted_when_skipped() -> None:
+    metrics.reset()
+    bot = AsyncMock()
+    bot.get_webhook_info.return_value.pending_update_count = 42
+
+    assert await drop_pending_updates(bot) == 42
+
+    bot.delete_webhook.assert_awaited_once_with(drop_pending_updates=True)
+    assert _dropped("startup_backlog") == 42
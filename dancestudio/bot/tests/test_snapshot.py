@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+os.environ.setdefault("PAYMENT_PROVIDER", "telegram")
+os.environ.setdefault("PAYMENT_CURRENCY", "RUB")
+os.environ.setdefault("PAYMENT_PROVIDER_TOKEN", "test-token")
+
+from ..services import api_client
+from ..services.circuit_breaker import CircuitBreaker
+from ..services.snapshot import SnapshotStore, is_stale
+from ..utils import metrics
+
+
+def test_snapshot_store_persists_to_disk(tmp_path) -> None:
+    path = tmp_path / "snapshot.json"
+    store = SnapshotStore(path)
+    store.remember("directions:active", [{"id": 1, "name": "Hip-hop"}])
+
+    restored = SnapshotStore(path).recall("directions:active")
+
+    assert restored == [{"id": 1, "name": "Hip-hop"}]
+    assert is_stale(restored)
+    assert SnapshotStore(path).recall("products") is None
+
+
+@pytest.fixture()
+def flaky_backend(monkeypatch: pytest.MonkeyPatch):
+    metrics.reset()
+    state = {"down": False}
+    now = datetime.now(timezone.utc)
+    slots = [
+        {"id": 1, "starts_at": (now - timedelta(hours=1)).isoformat()},
+        {"id": 2, "starts_at": (now + timedelta(days=1)).isoformat()},
+    ]
+    original = httpx.AsyncClient
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if state["down"]:
+            raise httpx.ConnectError("backend is down")
+        if request.url.path.endswith("/directions"):
+            return httpx.Response(200, json=[{"id": 1, "is_active": True}])
+        if request.url.path.endswith("/slots"):
+            return httpx.Response(200, json=slots)
+        return httpx.Response(404)
+
+    def factory(*args, **kwargs):
+        kwargs["transport"] = httpx.MockTransport(handler)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(api_client.httpx, "AsyncClient", factory)
+    monkeypatch.setattr(api_client._settings, "api_retries", 0)
+    monkeypatch.setattr(api_client, "_snapshots", SnapshotStore())
+    monkeypatch.setattr(api_client._settings, "catalogue_cache_ttl", 0.0)
+    monkeypatch.setattr(api_client, "_breaker", CircuitBreaker("snapshot-test"))
+    return state
+
+
+@pytest.mark.asyncio()
+async def test_catalogue_is_served_from_snapshot_when_backend_is_down(flaky_backend) -> None:
+    live_directions = await api_client.fetch_directions()
+    live_slots = await api_client.fetch_slots(direction_id=1)
+    assert not is_stale(live_directions)
+    assert [slot["id"] for slot in live_slots] == [2]
+
+    flaky_backend["down"] = True
+    directions = await api_client.fetch_directions()
+    slots = await api_client.fetch_slots(direction_id=1)
+
+    assert directions == live_directions
+    assert is_stale(directions)
+    assert is_stale(slots)
+    assert [slot["id"] for slot in slots] == [2]
+    assert metrics.get_counter("bot_snapshot_served_total", kind="slots") == 1
+
+    with pytest.raises(httpx.ConnectError):
+        await api_client.fetch_slots(direction_id=2)
+
+
+@pytest.mark.asyncio()
+async def test_client_errors_do_not_fall_back_to_snapshot(flaky_backend) -> None:
+    await api_client.fetch_directions()
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await api_client.fetch_products()
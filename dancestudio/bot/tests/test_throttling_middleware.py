@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from datetime import datetime
+
+import pytest
+
+os.environ.setdefault("PAYMENT_PROVIDER", "telegram")
+os.environ.setdefault("PAYMENT_CURRENCY", "RUB")
+os.environ.setdefault("PAYMENT_PROVIDER_TOKEN", "test-token")
+
+from aiogram import Bot, Router
+from aiogram.types import CallbackQuery, Chat, Message, Update, User
+
+from ..config import get_settings
+from ..middlewares.setup import build_dispatcher
+from ..middlewares.throttling import MemoryTokenBucketStorage, ThrottlingMiddleware
+from ..utils import metrics, texts
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+_USER = User(id=42, is_bot=False, first_name="Test")
+
+
+def _callback() -> CallbackQuery:
+    return CallbackQuery(id="1", from_user=_USER, chat_instance="1", data="my_bookings")
+
+
+def _message() -> Message:
+    return Message(
+        message_id=1,
+        date=datetime.now(),
+        chat=Chat(id=42, type="private"),
+        from_user=_USER,
+        text="hi",
+    )
+
+
+@pytest.mark.asyncio()
+async def test_memory_bucket_refills_over_time() -> None:
+    clock = _Clock()
+    storage = MemoryTokenBucketStorage(clock=clock)
+
+    results = [await storage.consume("u", rate=1.0, capacity=2) for _ in range(3)]
+    assert results == [True, True, False]
+
+    clock.now = 1.0
+    assert await storage.consume("u", rate=1.0, capacity=2)
+    assert not await storage.consume("u", rate=1.0, capacity=2)
+    assert await storage.consume("other", rate=1.0, capacity=2)
+
+
+@pytest.mark.asyncio()
+async def test_throttled_callbacks_are_answered_and_counted(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    metrics.reset()
+    answers: list[str | None] = []
+
+    async def fake_answer(self, text=None, **kwargs):
+        answers.append(text)
+
+    monkeypatch.setattr(CallbackQuery, "answer", fake_answer)
+    middleware = ThrottlingMiddleware(
+        MemoryTokenBucketStorage(clock=_Clock()), rate=1.0, burst=2
+    )
+    handled: list[int] = []
+
+    async def handler(event, data):
+        handled.append(1)
+        return "ok"
+
+    results = [
+        await middleware(handler, _callback(), {"event_from_user": _USER})
+        for _ in range(4)
+    ]
+
+    assert results == ["ok", "ok", None, None]
+    assert len(handled) == 2
+    assert answers == [texts.THROTTLED, texts.THROTTLED]
+    throttled = metrics.get_counter(
+        "bot_throttled_events_total", event_type="callback_query"
+    )
+    assert throttled == 2
+
+
+@pytest.mark.asyncio()
+async def test_throttled_messages_get_single_notice(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    metrics.reset()
+    notices: list[str] = []
+
+    async def fake_answer(self, text, **kwargs):
+        notices.append(text)
+
+    monkeypatch.setattr(Message, "answer", fake_answer)
+    middleware = ThrottlingMiddleware(
+        MemoryTokenBucketStorage(clock=_Clock()), rate=1.0, burst=1
+    )
+
+    async def handler(event, data):
+        return "ok"
+
+    for _ in range(3):
+        await middleware(handler, _message(), {"event_from_user": _USER})
+
+    assert notices == [texts.THROTTLED]
+    assert metrics.get_counter("bot_throttled_events_total", event_type="message") == 2
+
+
+@pytest.mark.asyncio()
+async def test_throttled_update_is_rejected_without_waiting_for_chat(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    notices: list[str] = []
+
+    async def fake_answer(self, text, **kwargs):
+        notices.append(text)
+
+    monkeypatch.setattr(Message, "answer", fake_answer)
+    release = asyncio.Event()
+    router = Router()
+
+    @router.message()
+    async def handler(message: Message) -> None:
+        await release.wait()
+
+    settings = get_settings()
+    settings.throttle_burst = 1
+    dp = build_dispatcher(settings, router)
+    bot = Bot("42:TEST")
+
+    def update(update_id: int) -> Update:
+        return Update(update_id=update_id, message=_message())
+
+    first = asyncio.create_task(dp.feed_update(bot, update(1)))
+    await asyncio.sleep(0)
+    await asyncio.wait_for(dp.feed_update(bot, update(2)), timeout=1)
+
+    assert not first.done()
+    assert notices == [texts.THROTTLED]
+    release.set()
+    await first
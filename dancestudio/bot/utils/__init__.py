@@ -1,2 +1,2 @@
-from . import texts
-__all__ = ["texts"]
+from . import feedback, metrics, texts
+__all__ = ["feedback", "metrics", "texts"]
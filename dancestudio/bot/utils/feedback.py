@@ -0,0 +1,64 @@
+"""Track when the user first got feedback for the callback being handled.
+
+Telegram keeps a spinner on the pressed button until the callback query is
+answered, and a query may only be answered once. Handlers acknowledge it as
+early as possible; this module remembers whether that already happened in the
+current handler task and measures the time it took.
+"""
+
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+
+from . import metrics
+
+
+@dataclass
+class _PendingFeedback:
+    handler: str
+    started: float = field(default_factory=time.perf_counter)
+    acknowledged: bool = False
+
+
+_current: ContextVar[_PendingFeedback | None] = ContextVar(
+    "callback_feedback", default=None
+)
+
+
+def begin(handler: str) -> Token:
+    """Start tracking feedback for a callback handled by ``handler``."""
+
+    return _current.set(_PendingFeedback(handler))
+
+
+def end(token: Token) -> None:
+    pending = _current.get()
+    if pending is not None and not pending.acknowledged:
+        metrics.increment("bot_callbacks_unanswered_total", handler=pending.handler)
+    _current.reset(token)
+
+
+def acknowledged() -> bool:
+    """Return ``True`` when the current callback has already been answered."""
+
+    pending = _current.get()
+    return pending is not None and pending.acknowledged
+
+
+def mark_acknowledged() -> None:
+    """Record the first answer to the current callback."""
+
+    pending = _current.get()
+    if pending is None or pending.acknowledged:
+        return
+    pending.acknowledged = True
+    metrics.observe(
+        "bot_time_to_first_feedback_seconds",
+        time.perf_counter() - pending.started,
+        handler=pending.handler,
+    )
+
+
+__all__ = ["acknowledged", "begin", "end", "mark_acknowledged"]
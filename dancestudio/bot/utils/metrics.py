@@ -0,0 +1,175 @@
+"""In-process metrics registry used by the bot middlewares and services."""
+
+from __future__ import annotations
+
+import math
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Mapping
+
+_LabelKey = tuple[tuple[str, str], ...]
+_SAMPLE_WINDOW = 1024
+QUANTILES: tuple[float, ...] = (0.5, 0.95, 0.99)
+
+
+@dataclass(slots=True)
+class _Histogram:
+    count: int = 0
+    total: float = 0.0
+    samples: deque[float] = field(default_factory=lambda: deque(maxlen=_SAMPLE_WINDOW))
+
+
+_lock = Lock()
+_counters: dict[str, dict[_LabelKey, float]] = defaultdict(dict)
+_gauges: dict[str, dict[_LabelKey, float]] = defaultdict(dict)
+_histograms: dict[str, dict[_LabelKey, _Histogram]] = defaultdict(dict)
+
+
+def _label_key(labels: Mapping[str, object]) -> _LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def increment(name: str, value: float = 1.0, **labels: object) -> None:
+    """Increase the counter ``name`` for the given label set."""
+
+    key = _label_key(labels)
+    with _lock:
+        series = _counters[name]
+        series[key] = series.get(key, 0.0) + value
+
+
+def set_gauge(name: str, value: float, **labels: object) -> None:
+    """Store the current value of the gauge ``name`` for the given label set."""
+
+    key = _label_key(labels)
+    with _lock:
+        _gauges[name][key] = float(value)
+
+
+def observe(name: str, value: float, **labels: object) -> None:
+    """Record a single observation (usually a duration in seconds)."""
+
+    key = _label_key(labels)
+    with _lock:
+        series = _histograms[name]
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = _Histogram()
+        histogram.count += 1
+        histogram.total += value
+        histogram.samples.append(value)
+
+
+def get_counter(name: str, **labels: object) -> float:
+    with _lock:
+        return _counters.get(name, {}).get(_label_key(labels), 0.0)
+
+
+def get_gauge(name: str, **labels: object) -> float:
+    with _lock:
+        return _gauges.get(name, {}).get(_label_key(labels), 0.0)
+
+
+def get_observations(name: str, **labels: object) -> tuple[int, float]:
+    """Return the number and the sum of observations recorded for a series."""
+
+    with _lock:
+        histogram = _histograms.get(name, {}).get(_label_key(labels))
+        if histogram is None:
+            return 0, 0.0
+        return histogram.count, histogram.total
+
+
+def _quantile(ordered: list[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+def get_quantiles(
+    name: str, quantiles: tuple[float, ...] = QUANTILES, **labels: object
+) -> dict[float, float]:
+    """Return quantiles over the most recent observations of a series."""
+
+    with _lock:
+        histogram = _histograms.get(name, {}).get(_label_key(labels))
+        ordered = sorted(histogram.samples) if histogram else []
+    return {q: _quantile(ordered, q) for q in quantiles}
+
+
+def _format_labels(key: _LabelKey, extra: tuple[tuple[str, str], ...] = ()) -> str:
+    pairs = [*key, *extra]
+    if not pairs:
+        return ""
+    rendered = ",".join(
+        '{}="{}"'.format(label, value.replace("\\", "\\\\").replace('"', '\\"'))
+        for label, value in pairs
+    )
+    return "{" + rendered + "}"
+
+
+def render_prometheus() -> str:
+    """Render every series in the Prometheus text exposition format."""
+
+    lines: list[str] = []
+    with _lock:
+        for name in sorted(_counters):
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(_counters[name].items()):
+                lines.append(f"{name}{_format_labels(key)} {value:g}")
+        for name in sorted(_gauges):
+            lines.append(f"# TYPE {name} gauge")
+            for key, value in sorted(_gauges[name].items()):
+                lines.append(f"{name}{_format_labels(key)} {value:g}")
+        for name in sorted(_histograms):
+            lines.append(f"# TYPE {name} summary")
+            for key, histogram in sorted(_histograms[name].items()):
+                ordered = sorted(histogram.samples)
+                for q in QUANTILES:
+                    labels = _format_labels(key, (("quantile", f"{q:g}"),))
+                    lines.append(f"{name}{labels} {_quantile(ordered, q):.6f}")
+                lines.append(f"{name}_sum{_format_labels(key)} {histogram.total:.6f}")
+                lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+    return "\n".join(lines) + "\n"
+
+
+def format_summary() -> list[str]:
+    """Return one human readable line per histogram series with p50/p95/p99."""
+
+    lines: list[str] = []
+    with _lock:
+        for name in sorted(_histograms):
+            for key, histogram in sorted(_histograms[name].items()):
+                ordered = sorted(histogram.samples)
+                p50, p95, p99 = (_quantile(ordered, q) * 1000 for q in QUANTILES)
+                lines.append(
+                    f"{name}{_format_labels(key)} count={histogram.count} "
+                    f"p50={p50:.1f}ms p95={p95:.1f}ms p99={p99:.1f}ms"
+                )
+    return lines
+
+
+def reset() -> None:
+    """Drop every recorded value. Intended for tests."""
+
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _histograms.clear()
+
+
+__all__ = [
+    "increment",
+    "set_gauge",
+    "observe",
+    "get_counter",
+    "get_gauge",
+    "get_observations",
+    "get_quantiles",
+    "render_prometheus",
+    "format_summary",
+    "QUANTILES",
+    "reset",
+]
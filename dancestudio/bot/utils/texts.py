@@ -6,6 +6,11 @@ NO_PRODUCTS = "Пока нет доступных абонементов"
 PRODUCTS_PROMPT = "Выберите абонемент:"
 NO_DIRECTIONS = "Пока нет активных направлений"
 API_ERROR = "Не удалось получить данные. Попробуйте позже."
+LOADING = "Загружаем…"
+BOOKING_IN_PROGRESS = "Записываем вас на занятие…"
+INVOICE_IN_PROGRESS = "Готовим счёт на оплату…"
+PURCHASE_IN_PROGRESS = "Оформляем абонемент…"
+THROTTLED = "Слишком много запросов. Подождите пару секунд и попробуйте снова."
 ITEM_NOT_FOUND = "Элемент не найден. Попробуйте обновить список."
 DIRECTIONS_PROMPT = "Выберите направление:"
 NO_BOOKINGS = "У вас пока нет записей."
@@ -59,6 +64,10 @@ PAYMENT_INVOICE_NOTE = (
 PROFILE_DETAILS_REQUIRED = "Пожалуйста, подтвердите ваши ФИО и возраст, чтобы продолжить."
 KEPT_FULL_NAME = "Оставляем текущее ФИО."
 KEPT_AGE = "Оставляем текущий возраст."
+STALE_DATA_NOTE = (
+    "⚠️ Сервис временно недоступен, показываем сохранённое расписание — "
+    "оно может быть неактуальным. Запись откроется, как только связь восстановится."
+)
 
 
 def _format_price(value: float | int | None) -> str:
@@ -304,3 +313,7 @@ def subscriptions_summary(items: Sequence[Mapping[str, object]]) -> str:
             parts.append(f"Действует до {valid_to}")
         lines.append(" · ".join(parts))
     return "\n".join(lines)
+
+
+def with_stale_note(text: str) -> str:
+    return f"{text}\n\n{STALE_DATA_NOTE}"